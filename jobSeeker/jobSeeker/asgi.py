@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jobSeeker.settings')
+# Async views for the read-heavy pages; set to 0 to serve the sync ones
+os.environ.setdefault('JOBSEEKER_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
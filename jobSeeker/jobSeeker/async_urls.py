@@ -0,0 +1,16 @@
+"""
+URL configuration with the read-heavy pages served by async views.
+
+``settings.ROOT_URLCONF`` points here when ``ASYNC_VIEWS`` is on. The async
+routes come first and shadow their sync counterparts under the same paths
+and names; every other URL falls through to ``jobSeeker.urls``.
+"""
+from django.urls import path, include
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('jobs/', include('job_postings.async_urls')),
+    path('profiles/', include('user_profiles.async_urls')),
+    *sync_urlpatterns,
+]
@@ -0,0 +1,148 @@
+"""
+Read/write splitting between the primary database and read replicas.
+
+``ReplicaRouter`` sends writes to ``default`` and, during a request, reads
+to one alias from ``DATABASE_REPLICAS``, chosen at random on the request's
+first read and kept for the rest of it, so a page never mixes rows from
+replicas at different lag points. Reads stay on the primary when any of
+the following holds, so users always see their own updates:
+
+* the current request has written, for the rest of that request;
+* the user wrote within the last ``REPLICA_PIN_SECONDS``, which
+  ``ReplicaPinningMiddleware`` records in their session;
+* the code runs inside ``use_primary()``;
+* the code runs outside a request (management commands, the shell).
+
+Sessions are always read from the primary, since a replica that has not
+caught up with a login would log the user out.
+
+Caches filled from the database and keyed by a version that writes bump
+(search results, skill choices, the skill index) are built inside
+``use_primary()``. Otherwise a lagging replica could store stale data
+under the new version.
+"""
+import contextlib
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+PRIMARY = 'default'
+PIN_SESSION_KEY = '_db_pinned_until'
+
+# Apps whose rows must never be read stale
+PRIMARY_ONLY_APPS = {'sessions'}
+
+
+class _RequestState:
+    __slots__ = ('pinned', 'wrote', 'replica')
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+        self.replica = None
+
+
+_state = ContextVar('db_routing', default=None)
+
+
+@contextlib.contextmanager
+def use_primary():
+    """Read from the primary inside this block, whatever the request state."""
+    state = _state.get()
+    if state is None:
+        # Outside requests reads go to the primary anyway
+        yield
+        return
+    pinned = state.pinned
+    state.pinned = True
+    try:
+        yield
+    finally:
+        state.pinned = pinned or state.wrote
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        available = replicas()
+        if (
+            state is None or state.pinned or not available
+            or model._meta.app_label in PRIMARY_ONLY_APPS
+        ):
+            return PRIMARY
+        if state.replica not in available:
+            state.replica = random.choice(available)
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = state.pinned = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas are copies of the primary, so any pairing is the same data
+        databases = {PRIMARY, *replicas()}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get the schema with the data from sync_replicas
+        return db == PRIMARY
+
+
+class ReplicaPinningMiddleware:
+    """
+    Tracks reads and writes per request for ``ReplicaRouter``. Put it after
+    ``SessionMiddleware``: it reads the pin from the session, and sets it
+    there when the request wrote.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replicas():
+            return self.get_response(request)
+        state = _RequestState(pinned=self._pinned(request.session.get(PIN_SESSION_KEY)))
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            request.session[PIN_SESSION_KEY] = self._pin_until()
+        return response
+
+    async def __acall__(self, request):
+        if not replicas():
+            return await self.get_response(request)
+        state = _RequestState(pinned=self._pinned(await request.session.aget(PIN_SESSION_KEY)))
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            await request.session.aset(PIN_SESSION_KEY, self._pin_until())
+        return response
+
+    @staticmethod
+    def _pinned(pinned_until):
+        return pinned_until is not None and pinned_until > time.time()
+
+    @staticmethod
+    def _pin_until():
+        return time.time() + getattr(settings, 'REPLICA_PIN_SECONDS', 5)
@@ -0,0 +1,34 @@
+"""
+SQLite tuning for running under several worker processes.
+
+Every new SQLite connection gets the PRAGMAs in ``SQLITE_PRAGMAS``. The
+defaults switch the database to WAL, so readers and the single writer no
+longer block each other, and make a writer wait ``busy_timeout``
+milliseconds for the lock instead of failing with "database is locked".
+
+Settings pair this with ``transaction_mode = 'IMMEDIATE'``: transactions
+take the write lock when they begin, where the busy timeout applies, rather
+than when their first write needs it. In WAL a deferred transaction that
+read before another writer committed cannot be upgraded, and fails at
+once whatever the timeout.
+
+Registered from ``JobPostingsConfig.ready()``, so management commands get
+it as well as the web servers.
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    if connection.is_in_memory_db() or connection.alias in getattr(settings, 'DATABASE_REPLICAS', []):
+        # Memory databases have no journal, and sync_replicas replaces the
+        # replica files whole, so a WAL file beside one would be stale
+        pragmas.pop('journal_mode', None)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,261 @@
+"""
+Per-request performance instrumentation.
+
+``InstrumentationMiddleware`` times each request, counts and times its SQL
+queries through an execute wrapper installed on every database connection,
+and picks up template render time from ``InstrumentedDjangoTemplates``, the
+template backend configured in settings. Both report to the current
+request's ``RequestTiming`` through a context variable, which also reaches
+the threads ``sync_to_async`` runs ORM calls in, so async views under ASGI
+are measured the same way as sync ones. The numbers go out in a
+``Server-Timing`` header and are folded into fixed-bucket histograms per URL
+name, which staff can read at ``request_stats``.
+
+The histograms have a fixed number of buckets and at most
+``INSTRUMENTATION_MAX_ROUTES`` URL names, so memory stays bounded however long
+the process runs.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import JsonResponse
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+# Upper bounds of the histogram buckets; the last bucket is open-ended
+TIME_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+OTHER_ROUTES = '<other>'
+UNRESOLVED = '<unresolved>'
+
+_current = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    __slots__ = ('queries', 'sql_seconds', 'template_seconds', 'template_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+def _execute(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    return timing(execute, sql, params, many, context)
+
+
+def _install(connection):
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _execute)
+
+
+@receiver(connection_created)
+def install_on_connect(sender, connection, **kwargs):
+    _install(connection)
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        timing = _current.get()
+        if timing is None:
+            return super().render(context, request)
+
+        # Only the outermost render counts, so nested renders are not added twice
+        timing.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.template_depth -= 1
+            if not timing.template_depth:
+                timing.template_seconds += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with render time reported to the middleware."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class Histogram:
+    __slots__ = ('bounds', 'buckets', 'count', 'total', 'max')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples."""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self):
+        labels = [f'<={bound}' for bound in self.bounds] + [f'>{self.bounds[-1]}']
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'max': self.max,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'buckets': dict(zip(labels, self.buckets)),
+        }
+
+
+class RouteStats:
+    __slots__ = ('total_ms', 'sql_ms', 'template_ms', 'queries', 'bytes')
+
+    def __init__(self):
+        self.total_ms = Histogram(TIME_BUCKETS_MS)
+        self.sql_ms = Histogram(TIME_BUCKETS_MS)
+        self.template_ms = Histogram(TIME_BUCKETS_MS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.bytes = Histogram(SIZE_BUCKETS)
+
+
+class RequestStats:
+    def __init__(self, max_routes=None):
+        self.max_routes = max_routes
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, total_ms, sql_ms, template_ms, queries, size):
+        max_routes = self.max_routes or getattr(settings, 'INSTRUMENTATION_MAX_ROUTES', 200)
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                if len(self._routes) >= max_routes:
+                    route = OTHER_ROUTES
+                stats = self._routes.setdefault(route, RouteStats())
+            stats.total_ms.add(total_ms)
+            stats.sql_ms.add(sql_ms)
+            stats.template_ms.add(template_ms)
+            stats.queries.add(queries)
+            if size is not None:
+                stats.bytes.add(size)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                route: {name: getattr(stats, name).as_dict() for name in RouteStats.__slots__}
+                for route, stats in sorted(self._routes.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+request_stats = RequestStats()
+
+
+class InstrumentationMiddleware:
+    """
+    Put this first in ``MIDDLEWARE`` so the total includes every other
+    middleware. Set ``SERVER_TIMING_HEADER = False`` to keep the numbers
+    out of responses while still collecting them.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing, token, started = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timing, started)
+
+    async def __acall__(self, request):
+        timing, token, started = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timing, started)
+
+    def _start(self):
+        # Connections opened before this module was imported missed the signal
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+        timing = RequestTiming()
+        return timing, _current.set(timing), time.perf_counter()
+
+    def _finish(self, request, response, timing, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        sql_ms = timing.sql_seconds * 1000
+        template_ms = timing.template_seconds * 1000
+
+        if getattr(settings, 'SERVER_TIMING_HEADER', True):
+            response['Server-Timing'] = (
+                f'db;dur={sql_ms:.2f};desc="SQL ({timing.queries} queries)", '
+                f'tpl;dur={template_ms:.2f};desc="Templates", '
+                f'total;dur={total_ms:.2f}'
+            )
+
+        if response.streaming:
+            size = None
+        else:
+            size = len(response.content)
+        match = request.resolver_match
+        route = (match.view_name or UNRESOLVED) if match else UNRESOLVED
+        request_stats.record(route, total_ms, sql_ms, template_ms, timing.queries, size)
+        return response
+
+
+@staff_member_required
+def stats(request):
+    return JsonResponse(request_stats.snapshot())
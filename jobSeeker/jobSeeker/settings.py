@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 import os
 from pathlib import Path
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,8 +47,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'jobSeeker.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'jobSeeker.db_router.ReplicaPinningMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -54,11 +58,16 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'jobSeeker.urls'
+# Serve the read-heavy pages from async views (jobSeeker.async_urls). Only
+# worth it under ASGI, where asgi.py turns it on unless told otherwise
+ASYNC_VIEWS = os.environ.get('JOBSEEKER_ASYNC_VIEWS', '0') == '1'
+
+ROOT_URLCONF = 'jobSeeker.async_urls' if ASYNC_VIEWS else 'jobSeeker.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, reporting render time to InstrumentationMiddleware
+        'BACKEND': 'jobSeeker.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / 'jobSeeker' / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -82,9 +91,98 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open across requests, checked before each reuse
+        'CONN_MAX_AGE': int(os.environ.get('JOBSEEKER_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
 }
 
+if django.VERSION >= (5, 1):
+    # Take the write lock at BEGIN, where the busy timeout applies; see
+    # jobSeeker.db_tuning
+    DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+
+# Applied to every new SQLite connection by jobSeeker.db_tuning, in order
+SQLITE_PRAGMAS = {
+    'busy_timeout': 20000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative: in KiB rather than pages
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Read replicas of the primary, as comma-separated database files in
+# JOBSEEKER_DB_REPLICAS. jobSeeker.db_router sends reads to them, and the
+# sync_replicas command copies the primary over them
+DATABASE_REPLICAS = []
+for index, name in enumerate(filter(None, map(str.strip, os.environ.get('JOBSEEKER_DB_REPLICAS', '').split(','))), 1):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'NAME': name,
+        # Tests run against one database, seen through every alias
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+DATABASE_ROUTERS = ['jobSeeker.db_router.ReplicaRouter']
+
+# After a user writes, read their requests from the primary for this long
+REPLICA_PIN_SECONDS = int(os.environ.get('JOBSEEKER_REPLICA_PIN_SECONDS', '5'))
+
+
+# Cache: TieredCache keeps a short-lived in-process copy (L1) of entries in
+# the file cache all worker processes share (L2). See jobSeeker.tiered_cache
+CACHE_DIR = Path(os.environ.get('JOBSEEKER_CACHE_DIR', BASE_DIR / '.cache'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'jobSeeker.tiered_cache.TieredCache',
+        'LOCATION': 'default',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': 5,
+            'JITTER': 0.1,
+            # Version tokens, and entries deleted on change: every process
+            # must see those changes at once
+            'L1_BYPASS': [
+                'user_profiles:skills:version',
+                'user_profiles:snapshot:',
+                'job_postings:catalog_generation',
+                # Applicant fit scores: read in large batches, rarely twice
+                'job_postings:fit:',
+            ],
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR / 'shared',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Sessions are read from the shared cache and written through to the
+# database. Not through L1: a logout must end the session in every process
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'shared'
+
+# Write last_login at most this often per user; see user_accounts.signals
+LAST_LOGIN_UPDATE_INTERVAL = 60 * 60
+
+TEST_RUNNER = 'jobSeeker.test_runner.DiscoverRunner'
+
+# ProfileBackend loads the session's user with its profiles joined in.
+# ModelBackend stays listed so sessions it created keep working
+AUTHENTICATION_BACKENDS = [
+    'user_accounts.backends.ProfileBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -0,0 +1,16 @@
+from django.test.runner import DiscoverRunner as BaseDiscoverRunner
+
+from .tiered_cache import isolated_caches
+
+
+class DiscoverRunner(BaseDiscoverRunner):
+    """Django's test runner, with caches of its own rather than the shared on-disk ones."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._caches = isolated_caches()
+        self._caches.__enter__()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.__exit__(None, None, None)
+        super().teardown_test_environment(**kwargs)
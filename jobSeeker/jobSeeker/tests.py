@@ -0,0 +1,250 @@
+import os
+import re
+import tempfile
+import threading
+import time
+from importlib import import_module
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from job_postings.models import Job
+from . import db_router, instrumentation
+
+
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        instrumentation.request_stats.reset()
+
+    def test_server_timing_header(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('job_postings.index'))
+        header = response['Server-Timing']
+        self.assertRegex(header, r'db;dur=[\d.]+;desc="SQL \(1 queries\)"')
+        self.assertRegex(header, r'tpl;dur=[\d.]+;desc="Templates", total;dur=[\d.]+$')
+
+        sql_ms, template_ms, total_ms = map(float, re.findall(r'dur=([\d.]+)', header))
+        self.assertLessEqual(sql_ms + template_ms, total_ms)
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_can_be_turned_off(self):
+        response = self.client.get(reverse('job_postings.index'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(instrumentation.request_stats.snapshot()['job_postings.index']['total_ms']['count'], 1)
+
+    def test_stats_per_url_name(self):
+        for _ in range(3):
+            self.client.get(reverse('job_postings.index'))
+        self.client.get('/no-such-page/')
+        snapshot = instrumentation.request_stats.snapshot()
+        self.assertEqual(snapshot['job_postings.index']['queries']['count'], 3)
+        self.assertEqual(snapshot['job_postings.index']['queries']['max'], 1)
+        self.assertIn(instrumentation.UNRESOLVED, snapshot)
+
+    def test_stats_endpoint_is_for_staff(self):
+        url = reverse('instrumentation.stats')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.client.get(reverse('job_postings.index'))
+        self.assertIn('job_postings.index', self.client.get(url).json())
+
+    def test_routes_are_bounded(self):
+        stats = instrumentation.RequestStats(max_routes=2)
+        for route in ('a', 'b', 'c', 'd'):
+            stats.record(route, 1.0, 0.5, 0.2, 1, 100)
+        self.assertEqual(list(stats.snapshot()), [instrumentation.OTHER_ROUTES, 'a', 'b'])
+        self.assertEqual(stats.snapshot()[instrumentation.OTHER_ROUTES]['total_ms']['count'], 2)
+
+    def test_histogram_percentiles(self):
+        histogram = instrumentation.Histogram(instrumentation.TIME_BUCKETS_MS)
+        for value in [0.5] * 90 + [30] * 9 + [7000]:
+            histogram.add(value)
+        self.assertEqual(histogram.percentile(0.5), 1)
+        self.assertEqual(histogram.percentile(0.95), 50)
+        self.assertEqual(histogram.percentile(1.0), 7000)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = db_router.ReplicaRouter()
+        self.session = import_module(settings.SESSION_ENGINE).SessionStore()
+
+    def request(self, view):
+        """Run ``view`` through the middleware and return what it returned."""
+        request = RequestFactory().get('/')
+        request.session = self.session
+        result = []
+        db_router.ReplicaPinningMiddleware(lambda request: result.append(view()) or HttpResponse())(request)
+        return result[0]
+
+    def test_reads_outside_requests_use_the_primary(self):
+        self.assertEqual(self.router.db_for_read(Job), 'default')
+
+    def test_reads_in_requests_use_a_replica(self):
+        self.assertIn(self.request(lambda: self.router.db_for_read(Job)), ['replica1', 'replica2'])
+        self.assertEqual(self.request(lambda: self.router.db_for_read(Session)), 'default')
+
+    def test_one_replica_per_request(self):
+        def reads():
+            return {self.router.db_for_read(Job) for _ in range(20)}
+
+        with mock.patch('random.choice', side_effect=['replica1', 'replica2']) as choice:
+            self.assertEqual(self.request(reads), {'replica1'})
+            self.assertEqual(self.request(reads), {'replica2'})
+        self.assertEqual(choice.call_count, 2)
+
+    def test_a_write_pins_the_rest_of_the_request_and_the_session(self):
+        def write_then_read():
+            before = self.router.db_for_read(Job)
+            self.router.db_for_write(Job)
+            return before, self.router.db_for_read(Job)
+
+        before, after = self.request(write_then_read)
+        self.assertNotEqual(before, 'default')
+        self.assertEqual(after, 'default')
+        self.assertEqual(self.request(lambda: self.router.db_for_read(Job)), 'default')
+
+        with mock.patch('time.time', return_value=time.time() + settings.REPLICA_PIN_SECONDS + 1):
+            self.assertNotEqual(self.request(lambda: self.router.db_for_read(Job)), 'default')
+
+    def test_use_primary(self):
+        def read():
+            with db_router.use_primary():
+                inside = self.router.db_for_read(Job)
+            return inside, self.router.db_for_read(Job)
+
+        inside, after = self.request(read)
+        self.assertEqual(inside, 'default')
+        self.assertNotEqual(after, 'default')
+        self.assertNotIn(db_router.PIN_SESSION_KEY, self.session)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertEqual(self.request(lambda: self.router.db_for_read(Job)), 'default')
+
+
+class SQLiteTuningTests(TestCase):
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def file_connection(self, alias):
+        """A new connection to a database file in a temporary directory."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_dict = {**connection.settings_dict, 'NAME': os.path.join(directory.name, 'db.sqlite3')}
+        wrapper = DatabaseWrapper(settings_dict, alias=alias)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_pragmas_on_new_connections(self):
+        self.assertEqual(self.pragma(connection, 'busy_timeout'), 20000)
+        self.assertEqual(self.pragma(connection, 'synchronous'), 1)
+        self.assertEqual(self.pragma(connection, 'cache_size'), -64 * 1024)
+        self.assertEqual(self.pragma(connection, 'temp_store'), 2)
+        self.assertEqual(connection.settings_dict['OPTIONS'].get('transaction_mode'), 'IMMEDIATE')
+
+    def test_file_databases_use_wal(self):
+        self.assertEqual(self.pragma(self.file_connection('tuning'), 'journal_mode'), 'wal')
+
+    @override_settings(DATABASE_REPLICAS=['replica_under_test'])
+    def test_replicas_keep_their_journal(self):
+        self.assertEqual(self.pragma(self.file_connection('replica_under_test'), 'journal_mode'), 'delete')
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = caches['default']
+        self.shared = caches['shared']
+        self.cache.clear()
+
+    def test_l1_answers_until_it_expires(self):
+        self.cache.set('key', 'value')
+        self.shared.delete('key')
+        self.assertEqual(self.cache.get('key'), 'value')
+        with mock.patch('time.monotonic', return_value=time.monotonic() + 10):
+            self.assertIsNone(self.cache.get('key'))
+
+    def test_bypass_keys_are_read_from_l2(self):
+        for key in ('user_profiles:snapshot:1', 'job_postings:fit:1:2:3:4'):
+            self.cache.set(key, 'value')
+            self.shared.delete(key)
+            self.assertIsNone(self.cache.get(key))
+
+    def test_timeouts_are_jittered(self):
+        with mock.patch.object(self.shared, 'set') as l2_set:
+            for _ in range(20):
+                self.cache.set('key', 'value', 1000)
+        timeouts = {call.args[2] for call in l2_set.call_args_list}
+        self.assertGreater(len(timeouts), 1)
+        self.assertTrue(all(900 <= timeout <= 1100 for timeout in timeouts))
+
+    def test_get_many_makes_one_l2_call_for_the_misses(self):
+        self.cache.set('a', 1)
+        self.shared.set_many({'b': 2, 'c': 3})
+        with mock.patch.object(self.shared, 'get_many', wraps=self.shared.get_many) as l2_get_many:
+            self.assertEqual(self.cache.get_many(['a', 'b', 'c', 'd']), {'a': 1, 'b': 2, 'c': 3})
+            self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 2, 'c': 3})
+        l2_get_many.assert_called_once_with(['b', 'c', 'd'], version=None)
+
+    def test_large_batches_do_not_flush_l1(self):
+        store = self.cache._store
+        self.cache.set_many({f'key{i}': i for i in range(store.max_entries)})
+        self.assertEqual(len(store.entries), store.max_entries // 4)
+        self.cache.set_many({'job_postings:fit:1': 1, 'job_postings:fit:2': 2})
+        self.assertEqual(len(store.entries), store.max_entries // 4)
+
+    def test_set_many_and_delete_many_reach_both_levels(self):
+        self.cache.set_many({'a': 1, 'b': 2})
+        self.assertEqual(self.shared.get_many(['a', 'b']), {'a': 1, 'b': 2})
+        self.cache.delete_many(['a', 'b'])
+        self.assertEqual(self.cache.get_many(['a', 'b']), {})
+        self.assertEqual(self.shared.get_many(['a', 'b']), {})
+
+    def test_get_or_set_computes_once_across_threads(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'value'
+
+        threads = [threading.Thread(target=lambda: caches['default'].get_or_set('key', compute)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+
+    def test_lock_file_is_exclusive(self):
+        release = self.cache._acquire('key', None)
+        self.assertIsNotNone(release)
+        self.assertIsNone(self.cache._acquire('key', None))
+        release()
+        self.cache._acquire('key', None)()
+
+    def test_stale_lock_is_broken(self):
+        self.cache._acquire('key', None)
+        path = self.cache._lock_path('key', None)
+        old = time.time() - self.cache._lock_timeout - 1
+        os.utime(path, (old, old))
+        release = self.cache._acquire('key', None)
+        self.assertIsNotNone(release)
+        release()
+        self.assertFalse(os.path.exists(path))
+
+    def test_waits_for_the_process_holding_the_lock(self):
+        release = self.cache._acquire('key', None)
+        threading.Timer(0.1, lambda: caches['shared'].set('key', 'theirs')).start()
+        self.assertEqual(self.cache.get_or_set('key', 'mine'), 'theirs')
+        release()
@@ -0,0 +1,296 @@
+"""
+Two-level cache backend for running under several worker processes.
+
+``TieredCache`` keeps a small in-process LRU (L1) in front of a cache that
+every process shares (L2, another alias in ``CACHES``). Reads try L1
+first and copy L2 hits into it. Writes go to both. An L1 entry lives at
+most ``L1_TIMEOUT`` seconds, since a write or delete in another process
+only reaches L2. Keys under an ``L1_BYPASS`` prefix skip L1 entirely:
+version tokens, and entries that are deleted when the data behind them
+changes, which every process has to see at once.
+
+Timeouts are jittered by ``JITTER`` (a fraction), so entries written
+together do not all expire together. ``get_or_set`` is single-flight:
+concurrent misses on one key compute the value once, with a lock per key
+within the process and a lock file across processes. The lock files are
+created with ``O_CREAT | O_EXCL`` in ``LOCK_DIR``, which defaults to a
+directory beside a file-based L2's. Other L2 backends lock with ``add``,
+which is only as atomic as their ``add`` is. A lock older than
+``LOCK_TIMEOUT`` is taken to belong to a process that died and is broken.
+
+``get_many`` reads L1 first and fetches all the misses with one L2
+``get_many``. A batch puts at most a quarter of ``L1_MAX_ENTRIES`` into L1,
+so one large read cannot evict everything else.
+"""
+import contextlib
+import hashlib
+import os
+import pickle
+import random
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_MISSING = object()
+
+# Lock stripes for single-flight misses within a process
+FLIGHT_LOCKS = 64
+
+
+class _LRU:
+    """A bounded, thread-safe map of key to pickled value and expiry time."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.flight_locks = [threading.Lock() for _ in range(FLIGHT_LOCKS)]
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires, data = entry
+            if expires <= time.monotonic():
+                del self.entries[key]
+                return _MISSING
+            self.entries.move_to_end(key)
+        return pickle.loads(data)
+
+    def set(self, key, value, timeout):
+        # Pickled, so callers never share (and mutate) one cached object
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            self.entries[key] = (time.monotonic() + timeout, data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def flight_lock(self, key):
+        return self.flight_locks[hash(key) % FLIGHT_LOCKS]
+
+
+# One L1 per LOCATION, shared by the per-thread backend instances
+_stores = {}
+
+
+class TieredCache(BaseCache):
+    def __init__(self, server, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options.get('L2', 'shared')
+        self._l1_timeout = options.get('L1_TIMEOUT', 5)
+        self._l1_bypass = tuple(options.get('L1_BYPASS', ()))
+        self._jitter = options.get('JITTER', 0.1)
+        self._lock_timeout = options.get('LOCK_TIMEOUT', 10)
+        self._lock_dir = options.get('LOCK_DIR')
+        self._store = _stores.setdefault(server, _LRU(options.get('L1_MAX_ENTRIES', 1000)))
+
+    @property
+    def _l2(self):
+        return caches[self._l2_alias]
+
+    def _lock_path(self, key, version):
+        lock_dir = self._lock_dir
+        if lock_dir is None:
+            l2_dir = getattr(self._l2, '_dir', None)
+            if l2_dir is None:
+                return None
+            lock_dir = f'{l2_dir}-locks'
+        os.makedirs(lock_dir, mode=0o700, exist_ok=True)
+        name = hashlib.md5(self.make_and_validate_key(key, version).encode(), usedforsecurity=False).hexdigest()
+        return os.path.join(lock_dir, f'{name}.lock')
+
+    def _acquire(self, key, version):
+        """
+        Take the cross-process lock for computing ``key``. Returns a function
+        that releases it, or None if another process holds it.
+        """
+        path = self._lock_path(key, version)
+        if path is None:
+            lock_key = f'{key}:lock'
+            if not self._l2.add(lock_key, os.getpid(), self._lock_timeout, version=version):
+                return None
+            return lambda: self._l2.delete(lock_key, version=version)
+
+        for _ in range(2):
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+            except FileExistsError:
+                try:
+                    stale = time.time() - os.path.getmtime(path) > self._lock_timeout
+                except FileNotFoundError:
+                    # Released in the meantime
+                    continue
+                if not stale:
+                    return None
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+                continue
+            return lambda: self._release(path)
+        return None
+
+    @staticmethod
+    def _release(path):
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+    def _jittered(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None or timeout <= 0 or not self._jitter:
+            return timeout
+        return max(1, round(timeout * random.uniform(1 - self._jitter, 1 + self._jitter)))
+
+    def _in_l1(self, key):
+        return not key.startswith(self._l1_bypass)
+
+    def _remember(self, key, value, timeout, version):
+        l1_key = self.make_and_validate_key(key, version)
+        if not self._in_l1(key) or (timeout is not None and timeout <= 0):
+            self._store.delete(l1_key)
+        else:
+            self._store.set(l1_key, value, self._l1_timeout if timeout is None else min(timeout, self._l1_timeout))
+
+    def _get(self, key, version):
+        if self._in_l1(key):
+            value = self._store.get(self.make_and_validate_key(key, version))
+            if value is not _MISSING:
+                return value
+        value = self._l2.get(key, _MISSING, version=version)
+        if value is not _MISSING and self._in_l1(key):
+            self._store.set(self.make_and_validate_key(key, version), value, self._l1_timeout)
+        return value
+
+    def get(self, key, default=None, version=None):
+        value = self._get(key, version)
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        misses = []
+        for key in keys:
+            value = self._store.get(self.make_and_validate_key(key, version)) if self._in_l1(key) else _MISSING
+            if value is _MISSING:
+                misses.append(key)
+            else:
+                found[key] = value
+        if misses:
+            fetched = self._l2.get_many(misses, version=version)
+            room = self._store.max_entries // 4
+            for key, value in fetched.items():
+                if room and self._in_l1(key):
+                    self._store.set(self.make_and_validate_key(key, version), value, self._l1_timeout)
+                    room -= 1
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._jittered(timeout)
+        self._l2.set(key, value, timeout, version=version)
+        self._remember(key, value, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        # One jittered timeout per batch, so L2 gets a single call
+        timeout = self._jittered(timeout)
+        failed = self._l2.set_many(data, timeout, version=version)
+        room = self._store.max_entries // 4
+        for key, value in data.items():
+            if key not in failed and room and self._in_l1(key):
+                room -= 1
+                self._remember(key, value, timeout, version)
+            else:
+                self._store.delete(self.make_and_validate_key(key, version))
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._jittered(timeout)
+        if not self._l2.add(key, value, timeout, version=version):
+            return False
+        self._remember(key, value, timeout, version)
+        return True
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self._get(key, version)
+        if value is not _MISSING:
+            return value
+        with self._store.flight_lock(self.make_and_validate_key(key, version)):
+            # Another thread may have filled it while this one waited
+            value = self._get(key, version)
+            if value is not _MISSING:
+                return value
+            release = self._acquire(key, version)
+            if release is None:
+                # Another process is computing it: wait for its value, and
+                # compute it here after all if that process never delivers
+                deadline = time.monotonic() + self._lock_timeout
+                while time.monotonic() < deadline:
+                    time.sleep(0.05)
+                    value = self._get(key, version)
+                    if value is not _MISSING:
+                        return value
+            try:
+                value = default() if callable(default) else default
+                self.set(key, value, timeout, version)
+            finally:
+                if release is not None:
+                    release()
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._store.delete(self.make_and_validate_key(key, version))
+        return self._l2.touch(key, self._jittered(timeout), version=version)
+
+    def delete(self, key, version=None):
+        self._store.delete(self.make_and_validate_key(key, version))
+        return self._l2.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        for key in keys:
+            self._store.delete(self.make_and_validate_key(key, version))
+        self._l2.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        return self._get(key, version) is not _MISSING
+
+    def incr(self, key, delta=1, version=None):
+        # Atomic where L2 is; the L1 copy is dropped rather than updated
+        value = self._l2.incr(key, delta, version=version)
+        self._store.delete(self.make_and_validate_key(key, version))
+        return value
+
+    def clear(self):
+        self._store.clear()
+        self._l2.clear()
+
+
+@contextlib.contextmanager
+def isolated_caches():
+    """
+    Give every alias in ``CACHES`` a fresh location in a temporary directory
+    for the duration: for tests and benchmarks, whose throwaway databases
+    must not share cached rows with the real one.
+    """
+    from django.test.utils import override_settings
+
+    with tempfile.TemporaryDirectory() as directory:
+        with override_settings(CACHES={
+            alias: {**config, 'LOCATION': os.path.join(directory, alias)}
+            for alias, config in settings.CACHES.items()
+        }):
+            yield
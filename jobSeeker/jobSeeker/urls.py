@@ -20,12 +20,15 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from . import instrumentation
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('homepage.urls')),
     path('jobs/', include('job_postings.urls')),
     path('accounts/', include('user_accounts.urls')),
     path('profiles/', include('user_profiles.urls')),
+    path('stats/requests/', instrumentation.stats, name='instrumentation.stats'),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class JobPostingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'job_postings'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        # Project-wide, but jobSeeker itself is not an installed app
+        from jobSeeker import db_tuning  # noqa: F401
@@ -0,0 +1,8 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('', async_views.index, name='job_postings.index'),
+    path('search/', async_views.search, name='job_postings.search'),
+    path('<int:id>/', async_views.show, name='job_postings.show'),
+]
@@ -0,0 +1,86 @@
+"""
+Async versions of the read-heavy job pages, served by ``jobSeeker.async_urls``
+when ``ASYNC_VIEWS`` is on and the site runs under ASGI.
+
+Data is fetched with the async ORM interface and fully loaded before the
+template renders, so rendering runs on the event loop without touching the
+database. The few sync-only pieces are wrapped with ``sync_to_async`` on
+purpose: form validation, the skill index and the facet counts, which
+query the database, and the search page render, whose skill widget may
+load the skill choices.
+"""
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, render
+
+from .forms import JobApplicationForm, JobSearchForm
+from .models import Job, JobApplication
+from . import selectors
+from .pagination import KeysetPaginator, IdListPaginator, get_page_size
+from .result_cache import search_result_cache
+from .utils import filter_by_ids
+from .views import _facet_panel, _filter_jobs, _pagination_query
+
+
+async def index(request):
+    user = await selectors.aviewer(request)
+    jobs = selectors.job_cards(user)
+    page = await KeysetPaginator(jobs, page_size=get_page_size(request)).apage(request.GET.get('cursor'))
+    return render(request, 'job_postings/index.html', {
+        'jobs': page,
+        'page': page,
+        'pagination_query': _pagination_query(request),
+        **selectors.viewer_context(user),
+    })
+
+
+async def _search_jobs(cleaned_data):
+    jobs, ordering = await sync_to_async(_filter_jobs)(Job.objects.filter(is_active=True), cleaned_data)
+    return [job_id async for job_id in jobs.order_by(*ordering).values_list('id', flat=True).aiterator()]
+
+
+async def search(request):
+    user = await selectors.aviewer(request)
+    form = JobSearchForm(request.GET)
+    search_performed = await sync_to_async(form.is_valid)() and form.has_filters()
+    page = None
+    facet_panel = None
+    if search_performed:
+        job_ids = await search_result_cache.aget_or_compute(
+            form.cleaned_data, lambda: _search_jobs(form.cleaned_data)
+        )
+        load = lambda page_ids: selectors.job_cards(
+            user, filter_by_ids(Job.objects.filter(is_active=True), page_ids)
+        )
+        page = await IdListPaginator(job_ids, load, page_size=get_page_size(request)).apage(request.GET.get('cursor'))
+        facet_panel = await sync_to_async(_facet_panel)(request, form.cleaned_data)
+
+    return await sync_to_async(render)(request, 'job_postings/search.html', {
+        'form': form,
+        'jobs': page,
+        'page': page,
+        'facets': facet_panel,
+        'pagination_query': _pagination_query(request),
+        'search_performed': search_performed,
+        **selectors.viewer_context(user),
+    })
+
+
+async def show(request, id):
+    user = await selectors.aviewer(request)
+    job = await aget_object_or_404(selectors.job_detail(user), id=id)
+    viewer = selectors.viewer_context(user)
+    user_application = None
+    application_form = None
+
+    if user.is_authenticated:
+        user_application = await JobApplication.objects.filter(job=job, applicant=user).afirst()
+        if user_application is None and viewer['is_job_seeker']:
+            application_form = JobApplicationForm()
+
+    return render(request, 'job_postings/show.html', {
+        'job': job,
+        'user_has_applied': user_application is not None,
+        'user_application': user_application,
+        'application_form': application_form,
+        **viewer,
+    })
@@ -0,0 +1,101 @@
+"""
+Maintenance of the denormalized application counters on ``Job``.
+
+``Job.application_count`` holds the total and ``Job.<status>_count`` the
+number of applications in each ``JobApplication.STATUS_CHOICES`` status.
+Every change is a single ``UPDATE`` with F-expressions, so concurrent writers
+never lose increments; callers run it in the same transaction as the write
+it describes. Creates and deletes are counted by the ``JobApplication``
+signal handlers in ``job_postings.signals``; writes that skip signals
+(``bulk_create``, raw fixtures) are left to ``reconcile()``, and decrements
+stop at zero so deleting such rows can't break the counters' constraints.
+"""
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+
+from .models import Job, JobApplication
+
+TOTAL_FIELD = 'application_count'
+
+
+def status_field(status):
+    return f'{status}_count'
+
+
+COUNTER_FIELDS = Job.counter_fields()
+
+
+def _apply(job_id, deltas):
+    updates = {
+        field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, Value(0))
+        for field, delta in deltas.items()
+        if delta
+    }
+    if updates:
+        Job.objects.filter(pk=job_id).update(**updates)
+
+
+def record_application(job_id, status):
+    _apply(job_id, {TOTAL_FIELD: 1, status_field(status): 1})
+
+
+def record_removal(job_id, status):
+    _apply(job_id, {TOTAL_FIELD: -1, status_field(status): -1})
+
+
+def record_status_change(job_id, old_status, new_status):
+    if old_status != new_status:
+        _apply(job_id, {status_field(old_status): -1, status_field(new_status): 1})
+
+
+def record_status_changes(changes, new_status):
+    """Apply ``(job_id, old_status)`` pairs moved to ``new_status``, one UPDATE per job."""
+    deltas = defaultdict(Counter)
+    for job_id, old_status in changes:
+        if old_status != new_status:
+            deltas[job_id][status_field(old_status)] -= 1
+            deltas[job_id][status_field(new_status)] += 1
+    for job_id, job_deltas in deltas.items():
+        _apply(job_id, job_deltas)
+
+
+def actual_counts(job_ids=None):
+    """Recount applications from scratch: ``{job_id: {field: count}}`` for jobs with applications."""
+    applications = JobApplication.objects.all()
+    if job_ids is not None:
+        applications = applications.filter(job_id__in=job_ids)
+
+    counts = defaultdict(Counter)
+    for job_id, status, count in applications.values_list('job_id', 'status').annotate(count=Count('id')).order_by():
+        counts[job_id][TOTAL_FIELD] += count
+        counts[job_id][status_field(status)] += count
+    return counts
+
+
+def reconcile(job_ids=None, dry_run=False):
+    """
+    Compare every job's counters with a fresh recount and fix the ones that
+    drifted. Returns ``{job_id: {field: (stored, actual)}}`` for those jobs.
+    """
+    counts = actual_counts(job_ids)
+    jobs = Job.objects.all()
+    if job_ids is not None:
+        jobs = jobs.filter(pk__in=job_ids)
+
+    drift = {}
+    for row in jobs.values('id', *COUNTER_FIELDS).iterator(chunk_size=2000):
+        actual = counts.get(row['id'], {})
+        differences = {
+            field: (row[field], actual.get(field, 0))
+            for field in COUNTER_FIELDS
+            if row[field] != actual.get(field, 0)
+        }
+        if differences:
+            drift[row['id']] = differences
+            if not dry_run:
+                Job.objects.filter(pk=row['id']).update(
+                    **{field: actual for field, (_, actual) in differences.items()}
+                )
+    return drift
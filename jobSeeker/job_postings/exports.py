@@ -0,0 +1,219 @@
+"""
+Streaming CSV and XLSX exports of job applications for recruiters.
+
+Applications are read with ``values_list()`` joined to the job, the applicant
+and their job seeker profile, through a chunked ``QuerySet.iterator()``. Each
+chunk's applicants get their skills in one extra query, and the chunk is
+written to the response before the next is read. The header goes out
+before the first query, so the download starts at once, and memory holds
+one chunk however many applications there are.
+
+XLSX files are written with the standard library's ``zipfile`` into a
+non-seekable buffer. Each entry's sizes go in a trailing data descriptor,
+so nothing needs to be rewound or kept whole.
+"""
+import csv
+import io
+import itertools
+import re
+import zipfile
+from collections import defaultdict
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.utils import timezone
+
+from user_profiles.models import JobSeekerProfile
+
+HEADER = (
+    'Job ID', 'Job Title', 'Company', 'Application ID', 'Status', 'Applied At',
+    'Status Updated At', 'Username', 'First Name', 'Last Name', 'Email',
+    'Headline', 'Skills', 'Cover Note',
+)
+
+_FIELDS = (
+    'job_id', 'job__title', 'job__company', 'id', 'status', 'applied_at',
+    'status_updated_at', 'applicant__username', 'applicant__jobseekerprofile__first_name',
+    'applicant__jobseekerprofile__last_name', 'applicant__email',
+    'applicant__jobseekerprofile__email', 'applicant__jobseekerprofile__headline',
+    'applicant_id', 'cover_note',
+)
+
+
+def _skills_by_user(user_ids):
+    """Skill names per applicant for a whole chunk, in one query."""
+    skills = defaultdict(list)
+    rows = (
+        JobSeekerProfile.skills.through.objects
+        .filter(jobseekerprofile__user_id__in=user_ids)
+        .order_by('skill__name')
+        .values_list('jobseekerprofile__user_id', 'skill__name')
+    )
+    for user_id, name in rows:
+        skills[user_id].append(name)
+    return skills
+
+
+def _format_datetime(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+def application_chunks(applications):
+    """Yield lists of export rows, matching ``HEADER``, one chunk at a time."""
+    chunk_size = getattr(settings, 'APPLICATION_EXPORT_CHUNK_SIZE', 2000)
+    statuses = dict(applications.model.STATUS_CHOICES)
+    iterator = applications.values_list(*_FIELDS).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        skills = _skills_by_user({row[13] for row in chunk})
+        yield [
+            (
+                job_id, title, company, application_id, statuses.get(status, status),
+                _format_datetime(applied_at), _format_datetime(status_updated_at),
+                username, first_name or '', last_name or '',
+                # The profile's contact email wins over the account's
+                profile_email or account_email or '', headline or '',
+                ', '.join(skills.get(applicant_id, ())), cover_note,
+            )
+            for (
+                job_id, title, company, application_id, status, applied_at, status_updated_at,
+                username, first_name, last_name, account_email, profile_email, headline,
+                applicant_id, cover_note,
+            ) in chunk
+        ]
+
+
+def _neutralize(value):
+    # Applicant-written text starting with these is run as a formula by
+    # spreadsheet programs; a leading quote keeps it plain text
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return f"'{value}"
+    return value
+
+
+def stream_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+    yield buffer.getvalue()
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_neutralize(value) for value in row] for row in chunk)
+        yield buffer.getvalue()
+
+
+class _StreamBuffer:
+    """Write-only file object for ``zipfile`` whose contents are drained as they arrive."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts.clear()
+        return data
+
+
+# Characters XML 1.0 does not allow, even escaped
+_INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Applications" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _column_letters(count):
+    letters = []
+    for index in range(count):
+        name = ''
+        index += 1
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            name = chr(65 + remainder) + name
+        letters.append(name)
+    return letters
+
+
+def _xlsx_row(number, values, columns):
+    cells = []
+    for column, value in zip(columns, values):
+        ref = f'{column}{number}'
+        if isinstance(value, int) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        elif value:
+            text = escape(_INVALID_XML.sub('', str(value)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+def stream_xlsx(chunks):
+    """
+    A one-sheet workbook with inline strings, so it needs no shared string
+    table or styles. Entries are not written as ZIP64, so one sheet must
+    stay under 4 GiB; use CSV beyond that.
+    """
+    buffer = _StreamBuffer()
+    columns = _column_letters(len(HEADER))
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(1, HEADER, columns).encode())
+            yield buffer.drain()
+            number = 1
+            for chunk in chunks:
+                rows = []
+                for row in chunk:
+                    number += 1
+                    rows.append(_xlsx_row(number, row, columns))
+                sheet.write(''.join(rows).encode())
+                yield buffer.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.drain()
@@ -0,0 +1,137 @@
+"""
+Facet counts for job search.
+
+For each filter dimension the counts say how many results every value of
+it would give. They are disjunctive: a dimension's counts apply all of the
+search's other filters but not its own, so they stay useful after one of
+its values is picked. They take one grouped query, plus at most one for the
+skills, and are cached with the search's result ids (see
+``SearchResultCache.get_or_compute_facets``).
+"""
+from django.conf import settings
+from django.db.models import Count
+
+from user_profiles.skill_choices import skill_choices
+from .forms import JobSearchForm
+from .models import Job
+from .result_cache import search_result_cache
+from .skill_index import skill_index
+
+CHOICE_DIMENSIONS = (
+    ('job_type', 'Job Type', Job.JOB_TYPE_CHOICES),
+    ('experience_level', 'Experience Level', Job.EXPERIENCE_LEVEL_CHOICES),
+    ('work_location', 'Work Location', Job.WORK_LOCATION_CHOICES),
+)
+
+# The single-valued columns counted together in one grouped query
+COLUMNS = [dimension[0] for dimension in CHOICE_DIMENSIONS] + ['visa_sponsorship']
+
+
+def _cleared(cleaned_data, names):
+    """``cleaned_data`` with the filters in ``names`` switched off."""
+    return {**cleaned_data, **{name: False if name == 'visa_sponsorship' else [] for name in names}}
+
+
+def _selected(cleaned_data, name):
+    value = cleaned_data.get(name)
+    if name == 'visa_sponsorship':
+        return True if value else None
+    return value or None
+
+
+def counts(cleaned_data, filter_jobs):
+    """
+    ``{dimension: {value: count}}`` for a validated JobSearchForm, with
+    ``filter_jobs`` the view's ``_filter_jobs``. Values without results are
+    left out.
+
+    One query counts the jobs matching every filter but the column facets
+    per combination of those columns, which holds each column's counts under
+    the other columns' filters. Skills are counted by ``_skill_counts``.
+    """
+    jobs, _ = filter_jobs(Job.objects.filter(is_active=True), _cleared(cleaned_data, COLUMNS))
+    selected = {name: _selected(cleaned_data, name) for name in COLUMNS}
+    result = {name: {} for name in COLUMNS}
+    for *values, count in jobs.values_list(*COLUMNS).annotate(count=Count('id')).order_by():
+        row = dict(zip(COLUMNS, values))
+        for name in COLUMNS:
+            if all(selected[other] in (None, row[other]) for other in COLUMNS if other != name):
+                result[name][row[name]] = result[name].get(row[name], 0) + count
+
+    result['skills'] = _skill_counts(cleaned_data, filter_jobs)
+    return result
+
+
+def _skill_counts(cleaned_data, filter_jobs):
+    """
+    Skill counts from the skill index, over the jobs matching every filter
+    but skills. Those are all active jobs when skills are the only filter,
+    and otherwise the result of the same search without its skills, taken
+    from the result cache. That is the search itself when it has no skills,
+    so the usual case runs no query.
+    """
+    others = _cleared(cleaned_data, ['skills'])
+    if not any(value for name, value in others.items() if name not in JobSearchForm.OPTION_FIELDS):
+        return skill_index.counts()
+    # Ordered like the search's own ids, since the entry is shared with it
+    jobs, ordering = filter_jobs(Job.objects.filter(is_active=True), others)
+    job_ids = search_result_cache.get_or_compute(others, lambda: jobs.order_by(*ordering).values_list('id', flat=True))
+    return skill_index.counts(job_ids)
+
+
+def panel(facet_counts, cleaned_data, query):
+    """
+    The facet panel for ``search.html``: per dimension, its values with
+    their count, whether they are selected, and the query string that
+    toggles them. ``query`` is the search's ``request.GET``.
+    """
+    def toggle(name, value, selected):
+        params = query.copy()
+        params.pop('cursor', None)
+        if name == 'skills':
+            values = [v for v in params.getlist(name) if v != str(value)]
+            params.setlist(name, values if selected else values + [str(value)])
+        elif selected:
+            params.pop(name, None)
+        else:
+            params[name] = value
+        return params.urlencode()
+
+    def option(name, value, label, selected):
+        return {
+            'label': label,
+            'count': facet_counts[name].get(value, 0),
+            'selected': selected,
+            'query': toggle(name, 'on' if value is True else value, selected),
+        }
+
+    dimensions = [
+        {
+            'label': label,
+            'options': [
+                option(name, value, choice_label, cleaned_data.get(name) == value)
+                for value, choice_label in choices
+            ],
+        }
+        for name, label, choices in CHOICE_DIMENSIONS
+    ]
+    dimensions.append({
+        'label': 'Visa Sponsorship',
+        'options': [option('visa_sponsorship', True, 'Sponsorship available', bool(cleaned_data.get('visa_sponsorship')))],
+    })
+
+    # The most common skills among the results, plus any already picked
+    selected = {skill.pk for skill in cleaned_data.get('skills') or ()}
+    size = getattr(settings, 'SEARCH_SKILL_FACET_SIZE', 15)
+    top = sorted(facet_counts['skills'].items(), key=lambda item: (-item[1], item[0]))[:size]
+    shown = [skill_id for skill_id, _ in top]
+    shown += sorted(selected.difference(shown))
+    names = dict(skill_choices())
+    dimensions.append({
+        'label': 'Skills',
+        'options': sorted(
+            (option('skills', skill_id, names.get(skill_id, ''), skill_id in selected) for skill_id in shown),
+            key=lambda item: (not item['selected'], -item['count'], item['label'].lower()),
+        ),
+    })
+    return dimensions
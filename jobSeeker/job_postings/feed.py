@@ -0,0 +1,91 @@
+"""
+Read-only JSON feed of jobs for partner integrations.
+
+Rows are read with ``values()``, so no model instances are built. The NDJSON
+format streams the whole result through ``QuerySet.iterator()`` in chunks of
+``JOB_FEED_CHUNK_SIZE`` rows; the export holds one chunk at a time, so memory
+stays flat however many jobs match. The paged JSON format returns one keyset
+page per request, with a signed cursor for the next one.
+
+Rows come in ``(updated_at, id)`` order. For incremental sync, a client
+passes the largest ``updated_at`` it has seen as ``updated_since`` next time.
+"""
+import datetime
+import itertools
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Job
+
+FEED_ORDERING = ('updated_at', 'id')
+
+# Columns clients can pick with ?fields=; the ordering key is always sent
+COLUMNS = (
+    'id', 'updated_at', 'title', 'company', 'location', 'job_type', 'experience_level',
+    'work_location', 'salary_min', 'salary_max', 'visa_sponsorship', 'description',
+    'requirements', 'created_at', 'is_active',
+)
+# Skill names, looked up per chunk rather than joined into every row
+SKILLS = 'skills'
+FIELDS = COLUMNS + (SKILLS,)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = getattr(settings, 'JOB_FEED_MAX_PAGE_SIZE', 1000)
+
+
+def parse_fields(text):
+    """
+    The requested fields from a comma-separated ``?fields=`` value, in
+    ``FIELDS`` order, or all of them if ``text`` is empty. Raises
+    ``ValueError`` naming any unknown field.
+    """
+    requested = {name.strip() for name in (text or '').split(',') if name.strip()}
+    if not requested:
+        return FIELDS
+    unknown = requested.difference(FIELDS)
+    if unknown:
+        raise ValueError(', '.join(sorted(unknown)))
+    return tuple(name for name in FIELDS if name in requested or name in FEED_ORDERING)
+
+
+def rows(jobs, fields):
+    """``jobs`` as ordered dicts of the requested columns."""
+    columns = [name for name in fields if name != SKILLS]
+    return jobs.order_by(*FEED_ORDERING).values(*columns)
+
+
+def attach_skills(chunk, fields):
+    """Add each row's skill names, with one query for the whole chunk."""
+    if SKILLS not in fields or not chunk:
+        return chunk
+    names = defaultdict(list)
+    through = Job.skills_required.through.objects.filter(job_id__in=[row['id'] for row in chunk])
+    for job_id, name in through.order_by('skill__name').values_list('job_id', 'skill__name'):
+        names[job_id].append(name)
+    for row in chunk:
+        row[SKILLS] = names.get(row['id'], [])
+    return chunk
+
+
+def stream_ndjson(jobs, fields):
+    """Yield every row of ``jobs`` as newline-delimited JSON, one chunk per item."""
+    chunk_size = getattr(settings, 'JOB_FEED_CHUNK_SIZE', 2000)
+    iterator = rows(jobs, fields).iterator(chunk_size=chunk_size)
+    encode = FeedEncoder(separators=(',', ':')).encode
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        attach_skills(chunk, fields)
+        yield ''.join(f'{encode(row)}\n' for row in chunk)
+
+
+class FeedEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # Keep microseconds so an updated_at passed back as updated_since
+        # compares exactly with the row it came from
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
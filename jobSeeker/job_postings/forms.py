@@ -1,6 +1,8 @@
 from django import forms
 from .models import Job, JobApplication
-from user_profiles.models import Skill
+from user_profiles.skill_choices import SkillCheckboxSelectMultiple, SkillMultipleChoiceField
+from .skill_index import MATCH_ANY, MATCH_CHOICES
+from . import feed
 
 class JobForm(forms.ModelForm):
     class Meta:
@@ -8,6 +10,9 @@ class JobForm(forms.ModelForm):
         fields = ['title', 'company', 'location', 'job_type', 'experience_level', 
                  'work_location', 'salary_min', 'salary_max', 'visa_sponsorship', 
                  'skills_required', 'description', 'requirements']
+        field_classes = {
+            'skills_required': SkillMultipleChoiceField,
+        }
         
         widgets = {
             'title': forms.TextInput(attrs={
@@ -44,7 +49,7 @@ class JobForm(forms.ModelForm):
             'visa_sponsorship': forms.CheckboxInput(attrs={
                 'class': 'form-check-input'
             }),
-            'skills_required': forms.CheckboxSelectMultiple(attrs={
+            'skills_required': SkillCheckboxSelectMultiple(attrs={
                 'class': 'form-check-input'
             }),
             'description': forms.Textarea(attrs={
@@ -66,7 +71,6 @@ class JobForm(forms.ModelForm):
         self.fields['salary_max'].required = False
         # Make skills_required optional
         self.fields['skills_required'].required = False
-        self.fields['skills_required'].queryset = Skill.objects.all().order_by('name')
 
 
 class JobApplicationForm(forms.ModelForm):
@@ -92,7 +96,7 @@ class JobSearchForm(forms.Form):
         required=False,
         widget=forms.TextInput(attrs={
             'class': 'form-control',
-            'placeholder': 'Job title keywords'
+            'placeholder': 'Job title, company or keywords'
         })
     )
     
@@ -150,12 +154,58 @@ class JobSearchForm(forms.Form):
         widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
     )
     
-    skills = forms.ModelMultipleChoiceField(
-        queryset=Skill.objects.all().order_by('name'),
+    skills = SkillMultipleChoiceField(
         required=False,
-        widget=forms.CheckboxSelectMultiple(attrs={'class': 'form-check-input'})
+        widget=SkillCheckboxSelectMultiple(attrs={'class': 'form-check-input'})
     )
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['skills'].queryset = Skill.objects.all().order_by('name')
+    skill_match = forms.ChoiceField(
+        choices=MATCH_CHOICES,
+        required=False,
+        initial=MATCH_ANY,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    
+    skill_min_matches = forms.IntegerField(
+        min_value=1,
+        required=False,
+        initial=2,
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'N'
+        })
+    )
+    
+    # Options that change how filters apply but are not filters themselves
+    OPTION_FIELDS = ('skill_match', 'skill_min_matches')
+    
+    def has_filters(self):
+        return any(
+            value for name, value in self.cleaned_data.items()
+            if name not in self.OPTION_FIELDS
+        )
+
+
+class JobFeedForm(JobSearchForm):
+    """The search filters plus the feed's format, field selection and sync options."""
+    
+    FORMAT_JSON = 'json'
+    FORMAT_NDJSON = 'ndjson'
+    
+    format = forms.ChoiceField(
+        choices=[(FORMAT_JSON, 'Paged JSON'), (FORMAT_NDJSON, 'NDJSON')],
+        required=False
+    )
+    
+    fields = forms.CharField(required=False)
+    
+    updated_since = forms.DateTimeField(required=False)
+    
+    def clean_format(self):
+        return self.cleaned_data['format'] or self.FORMAT_JSON
+    
+    def clean_fields(self):
+        try:
+            return feed.parse_fields(self.cleaned_data['fields'])
+        except ValueError as e:
+            raise forms.ValidationError(f'Unknown fields: {e}')
@@ -0,0 +1,219 @@
+import asyncio
+import datetime
+import platform
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from asgiref.sync import ThreadSensitiveContext
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from jobSeeker.tiered_cache import isolated_caches
+from .benchmark_views import Command as ViewBenchmark
+
+# Handler and URLconf per mode: 'asgi' runs the sync views in the ASGI
+# handler's thread pool, 'asgi-async' the async views on the event loop
+MODES = {
+    'wsgi': ('wsgi', 'jobSeeker.urls'),
+    'asgi': ('asgi', 'jobSeeker.urls'),
+    'asgi-async': ('asgi', 'jobSeeker.async_urls'),
+}
+
+
+class Command(ViewBenchmark):
+    help = (
+        'Compare requests/sec and tail latency of the WSGI and ASGI request '
+        'paths under concurrent load, on one seeded data set in a throwaway '
+        'test database. Requests are driven in-process (threads for WSGI, '
+        'tasks on one event loop for ASGI), so the numbers cover Django and '
+        'the views but not a network server.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=10000, help='Jobs in the data set (default: 10000)')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the generated data (default: 0)')
+        parser.add_argument(
+            '--applications-per-job', type=int, default=5,
+            help='Applications generated per job (default: 5)'
+        )
+        parser.add_argument(
+            '--modes', default=','.join(MODES),
+            help=f'Comma-separated modes to compare (default: {",".join(MODES)})'
+        )
+        parser.add_argument(
+            '--concurrency', default='1,8,32',
+            help='Comma-separated numbers of concurrent clients (default: 1,8,32)'
+        )
+        parser.add_argument(
+            '--scenarios', default='index,search_keywords,show,profile',
+            help='Comma-separated views to load (default: the pages with async versions)'
+        )
+        parser.add_argument('--requests', type=int, default=400, help='Timed requests per run (default: 400)')
+        parser.add_argument('--warmup', type=int, default=20, help='Untimed requests per run first (default: 20)')
+        parser.add_argument('--output', default='concurrency-report.json', help='Where to write the JSON report')
+
+    def handle(self, *args, **options):
+        modes = self.parse_list(options['modes'], str)
+        unknown = set(modes).difference(MODES)
+        if unknown:
+            raise CommandError(f'Unknown modes: {", ".join(sorted(unknown))}.')
+        try:
+            levels = self.parse_list(options['concurrency'], int)
+        except ValueError:
+            raise CommandError('--concurrency must be a comma-separated list of integers.')
+        if not levels or min(levels) < 1:
+            raise CommandError('--concurrency needs at least one positive level.')
+        wanted = self.parse_list(options['scenarios'], str)
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1.')
+
+        old_name = connection.settings_dict['NAME']
+        with isolated_caches():
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                self.stdout.write(f'Generating data set with {options["size"]:,} jobs...')
+                self.load_data(options['size'], options)
+                scenarios = [scenario for scenario in self.scenarios() if scenario[0] in wanted]
+                results = {}
+                for name, url, user in scenarios:
+                    results[name] = {}
+                    for mode in modes:
+                        results[name][mode] = {}
+                        for level in levels:
+                            results[name][mode][str(level)] = self.run(mode, level, url, user, options)
+                    self.print_scenario(name, results[name])
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'meta': {
+                'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'size': options['size'],
+                'seed': options['seed'],
+                'requests': options['requests'],
+                'warmup': options['warmup'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'results': results,
+        }
+        self.write_json(options['output'], report)
+        self.stdout.write(f'Wrote report to {options["output"]}')
+
+    @staticmethod
+    def parse_list(value, convert):
+        return [convert(item.strip()) for item in value.split(',') if item.strip()]
+
+    def run(self, mode, level, url, user, options):
+        handler, urlconf = MODES[mode]
+        with override_settings(
+            DEBUG=False,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            ROOT_URLCONF=urlconf,
+        ):
+            # Log in once and share the session: concurrent logins would
+            # write the session table while other clients read it
+            cookies = None
+            if user is not None:
+                login = Client()
+                login.force_login(user)
+                cookies = login.cookies
+            if handler == 'wsgi':
+                run = self.run_wsgi
+            else:
+                run = lambda *args: asyncio.run(self.run_asgi(*args))
+            run(url, cookies, level, options['warmup'])
+            started = time.perf_counter()
+            latencies = run(url, cookies, level, options['requests'])
+            elapsed = time.perf_counter() - started
+        return self.summarize_run(latencies, elapsed)
+
+    def run_wsgi(self, url, cookies, level, count):
+        """``count`` requests spread over ``level`` threads, each with its own client."""
+        remaining = iter(range(count))
+        lock = threading.Lock()
+        latencies = []
+
+        def worker():
+            client = Client()
+            if cookies is not None:
+                client.cookies.load(cookies)
+            samples = []
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            break
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    samples.append(time.perf_counter() - started)
+                    self.check_response(response, url)
+            finally:
+                connections.close_all()
+            with lock:
+                latencies.extend(samples)
+
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            for future in [executor.submit(worker) for _ in range(level)]:
+                future.result()
+        return latencies
+
+    async def run_asgi(self, url, cookies, level, count):
+        """``count`` requests spread over ``level`` tasks on one event loop, each with its own client."""
+        remaining = iter(range(count))
+        latencies = []
+
+        async def worker():
+            client = AsyncClient()
+            if cookies is not None:
+                client.cookies.load(cookies)
+            while next(remaining, None) is not None:
+                started = time.perf_counter()
+                # As the ASGI handler does, so thread-sensitive sync code of
+                # one request shares a thread, apart from other requests
+                async with ThreadSensitiveContext():
+                    response = await client.get(url)
+                latencies.append(time.perf_counter() - started)
+                self.check_response(response, url)
+
+        await asyncio.gather(*(worker() for _ in range(level)))
+        return latencies
+
+    @staticmethod
+    def check_response(response, url):
+        if response.status_code != 200:
+            raise CommandError(f'GET {url} returned {response.status_code}.')
+
+    @staticmethod
+    def summarize_run(latencies, elapsed):
+        latencies = [latency * 1000 for latency in latencies]
+        if len(latencies) > 1:
+            cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = latencies[0]
+        return {
+            'requests_per_second': round(len(latencies) / elapsed, 1),
+            'p50_ms': round(p50, 3),
+            'p95_ms': round(p95, 3),
+            'p99_ms': round(p99, 3),
+            'max_ms': round(max(latencies), 3),
+        }
+
+    def print_scenario(self, name, results):
+        self.stdout.write(f'\n{name}')
+        self.stdout.write(f'{"mode":<12}{"clients":>8}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+        for mode, levels in results.items():
+            for level, result in levels.items():
+                self.stdout.write(
+                    f'{mode:<12}{level:>8}{result["requests_per_second"]:>10.1f}{result["p50_ms"]:>10.2f}'
+                    f'{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}'
+                )
+        self.stdout.write('')
@@ -0,0 +1,263 @@
+import datetime
+import io
+import json
+import platform
+import statistics
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from jobSeeker.tiered_cache import isolated_caches
+from job_postings.models import Job, JobApplication
+from job_postings.result_cache import search_result_cache
+from user_profiles.models import Skill
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'views-baseline.json'
+
+
+class QueryTimer:
+    """Database execute wrapper counting queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the main views against seeded data sets of several sizes in a '
+        'throwaway test database, and compare the results with a stored baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,10000',
+            help='Comma-separated job counts to benchmark at (default: 1000,10000)'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the generated data (default: 0)')
+        parser.add_argument(
+            '--applications-per-job', type=int, default=5,
+            help='Applications generated per job (default: 5)'
+        )
+        parser.add_argument('--iterations', type=int, default=30, help='Timed requests per view (default: 30)')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per view first (default: 3)')
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Clear the cache and search result cache before every request'
+        )
+        parser.add_argument('--output', default='benchmark-report.json', help='Where to write the JSON report')
+        parser.add_argument(
+            '--baseline', default=str(DEFAULT_BASELINE),
+            help=f'Baseline report to compare against (default: {DEFAULT_BASELINE})'
+        )
+        parser.add_argument(
+            '--update-baseline', action='store_true',
+            help='Store this run as the new baseline'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Allowed p95 slowdown over the baseline as a fraction (default: 0.25)'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Exit with an error if any view regressed'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError('--sizes must be a comma-separated list of integers.')
+        if not sizes or min(sizes) < 1:
+            raise CommandError('--sizes needs at least one positive job count.')
+
+        # Never touch the configured database or caches: build a test
+        # database, fill it per size, and drop it afterwards
+        old_name = connection.settings_dict['NAME']
+        with isolated_caches():
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                results = {}
+                for size in sizes:
+                    self.stdout.write(f'Generating data set with {size:,} jobs...')
+                    self.load_data(size, options)
+                    results[str(size)] = self.run_size(options)
+                    self.print_results(size, results[str(size)])
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'meta': {
+                'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'seed': options['seed'],
+                'applications_per_job': options['applications_per_job'],
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+                'cold': options['cold'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'results': results,
+        }
+        self.write_json(options['output'], report)
+        self.stdout.write(f'Wrote report to {options["output"]}')
+
+        baseline_path = Path(options['baseline'])
+        regressions = []
+        if baseline_path.exists():
+            with open(baseline_path) as f:
+                regressions = self.compare(report, json.load(f), options['tolerance'])
+        else:
+            self.stdout.write(f'No baseline at {baseline_path}; nothing to compare against.')
+
+        if options['update_baseline']:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            self.write_json(baseline_path, report)
+            self.stdout.write(f'Stored baseline at {baseline_path}')
+
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} regression(s) against the baseline.')
+
+    def load_data(self, size, options):
+        call_command('flush', interactive=False, verbosity=0)
+        call_command(
+            'populate_sample_data',
+            scale=True,
+            seed=options['seed'],
+            jobs=size,
+            seekers=size,
+            recruiters=max(size // 100, 1),
+            applications=size * options['applications_per_job'],
+            stdout=io.StringIO(),
+        )
+
+    def scenarios(self):
+        """``(name, url, user)`` for each request to time, with representative parameters."""
+        busiest = Job.objects.filter(is_active=True).order_by('-application_count', 'id').select_related('posted_by').first()
+        application = JobApplication.objects.filter(job=busiest).select_related('applicant').first()
+        seeker = application.applicant if application else None
+        popular_skills = list(
+            Skill.objects.order_by('id').values_list('id', flat=True)[:2]
+        )
+        skills_query = '&'.join(f'skills={skill_id}' for skill_id in popular_skills)
+
+        scenarios = [
+            ('index', reverse('job_postings.index'), None),
+            ('search_keywords', reverse('job_postings.search') + '?title=python', None),
+            ('search_filters', reverse('job_postings.search') + '?work_location=remote&experience_level=senior&salary_min=100000', None),
+            ('search_skills', reverse('job_postings.search') + f'?{skills_query}&skill_match=all', None),
+        ]
+        if busiest is not None:
+            scenarios.append(('show', reverse('job_postings.show', args=[busiest.id]), seeker))
+            scenarios.append(('manage_applications', reverse('job_postings.manage_applications', args=[busiest.id]), busiest.posted_by))
+        if seeker is not None:
+            scenarios.append(('profile', reverse('user_profiles.profile'), seeker))
+        return scenarios
+
+    def run_size(self, options):
+        results = {}
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name, url, user in self.scenarios():
+                client = Client()
+                if user is not None:
+                    client.force_login(user)
+                for _ in range(options['warmup']):
+                    self.request(client, url, options['cold'])
+                samples = [self.request(client, url, options['cold']) for _ in range(options['iterations'])]
+                results[name] = self.summarize(url, samples)
+        return results
+
+    def request(self, client, url, cold):
+        if cold:
+            cache.clear()
+            search_result_cache.clear()
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer):
+            started = time.perf_counter()
+            response = client.get(url)
+            content = b''.join(response.streaming_content) if response.streaming else response.content
+            elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            raise CommandError(f'GET {url} returned {response.status_code}.')
+        return {
+            'seconds': elapsed,
+            'queries': timer.count,
+            'sql_seconds': timer.seconds,
+            'bytes': len(content),
+        }
+
+    def summarize(self, url, samples):
+        latencies = [sample['seconds'] * 1000 for sample in samples]
+        if len(latencies) > 1:
+            cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = latencies[0]
+        return {
+            'url': url,
+            'p50_ms': round(p50, 3),
+            'p95_ms': round(p95, 3),
+            'p99_ms': round(p99, 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'queries': max(sample['queries'] for sample in samples),
+            'sql_ms': round(statistics.median(sample['sql_seconds'] for sample in samples) * 1000, 3),
+            'bytes': max(sample['bytes'] for sample in samples),
+        }
+
+    def print_results(self, size, results):
+        self.stdout.write(f'\n{size:,} jobs')
+        self.stdout.write(f'{"view":<22}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"queries":>9}{"sql ms":>10}{"bytes":>10}')
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<22}{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}'
+                f'{result["queries"]:>9}{result["sql_ms"]:>10.2f}{result["bytes"]:>10}'
+            )
+        self.stdout.write('')
+
+    def compare(self, report, baseline, tolerance):
+        """Print differences from ``baseline`` and return the regressed (size, view, reason) triples."""
+        regressions = []
+        for size, results in report['results'].items():
+            baseline_results = baseline.get('results', {}).get(size, {})
+            for name, result in results.items():
+                previous = baseline_results.get(name)
+                if previous is None:
+                    continue
+                reasons = []
+                if result['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+                    reasons.append(f'p95 {previous["p95_ms"]:.2f} -> {result["p95_ms"]:.2f} ms')
+                if result['queries'] > previous['queries']:
+                    reasons.append(f'queries {previous["queries"]} -> {result["queries"]}')
+                if reasons:
+                    regressions.append((size, name, reasons))
+                    self.stdout.write(self.style.ERROR(f'REGRESSION {size} jobs / {name}: {"; ".join(reasons)}'))
+                else:
+                    change = (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100 if previous['p95_ms'] else 0.0
+                    self.stdout.write(f'ok {size} jobs / {name}: p95 {change:+.0f}%, queries {result["queries"]}')
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
+        return regressions
+
+    @staticmethod
+    def write_json(path, data):
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
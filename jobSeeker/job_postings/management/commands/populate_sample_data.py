@@ -1,26 +1,95 @@
-from django.core.management.base import BaseCommand
+import datetime
+import random
+import time
+from itertools import accumulate
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
-from job_postings.models import Job
-from user_profiles.models import Skill
+from django.db import transaction
+from job_postings import counters, search
+from job_postings.models import Job, JobApplication
+from job_postings.result_cache import bump_catalog_generation
+from job_postings.skill_index import skill_index
+from user_profiles.models import Skill, JobSeekerProfile, WorkExperience, Education, Link
+from user_profiles.skill_choices import bump_skills_version
 from user_accounts.models import UserProfile
 from decimal import Decimal
 
+SKILL_NAMES = [
+    'Python', 'Django', 'JavaScript', 'React', 'Node.js', 'SQL', 'PostgreSQL',
+    'MongoDB', 'AWS', 'Docker', 'Kubernetes', 'Git', 'Linux', 'Machine Learning',
+    'Data Science', 'Java', 'Spring Boot', 'Angular', 'Vue.js', 'TypeScript',
+    'HTML', 'CSS', 'Bootstrap', 'REST API', 'GraphQL', 'Redis', 'Elasticsearch',
+    'Jenkins', 'CI/CD', 'Agile', 'Scrum', 'Project Management', 'Leadership',
+    'Communication', 'Problem Solving', 'Teamwork', 'Analytical Skills'
+]
+
+# Distributions for --scale mode, as (value, weight) pairs
+JOB_TYPES = [('full_time', 70), ('part_time', 10), ('contract', 15), ('internship', 5)]
+EXPERIENCE_LEVELS = [('entry', 25), ('mid', 40), ('senior', 28), ('executive', 7)]
+WORK_LOCATIONS = [('on_site', 45), ('hybrid', 35), ('remote', 20)]
+APPLICATION_STATUSES = [('applied', 55), ('review', 20), ('interview', 12), ('offer', 5), ('closed', 8)]
+LOCATIONS = [
+    ('San Francisco, CA', 12), ('New York, NY', 14), ('Seattle, WA', 8), ('Austin, TX', 7),
+    ('Chicago, IL', 6), ('Boston, MA', 6), ('Denver, CO', 4), ('Los Angeles, CA', 7),
+    ('Atlanta, GA', 4), ('Miami, FL', 3), ('Portland, OR', 3), ('Raleigh, NC', 2),
+    ('Remote', 18), ('Toronto, ON', 3), ('London, UK', 3),
+]
+# Median advertised minimum salary by experience level
+BASE_SALARY = {'entry': 60000, 'mid': 95000, 'senior': 135000, 'executive': 190000}
+LEVEL_TITLES = {'entry': 'Junior', 'mid': '', 'senior': 'Senior', 'executive': 'Head of'}
+ROLES = [
+    'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Full Stack Developer',
+    'Data Scientist', 'Data Engineer', 'DevOps Engineer', 'Site Reliability Engineer',
+    'Machine Learning Engineer', 'Product Manager', 'QA Engineer', 'Mobile Developer',
+    'Security Engineer', 'Solutions Architect', 'Engineering Manager',
+]
+COMPANY_WORDS = [
+    'Tech', 'Data', 'Cloud', 'Web', 'Net', 'Soft', 'Logic', 'Byte', 'Code', 'Stack',
+    'Quantum', 'Blue', 'Bright', 'Next', 'Prime', 'Apex', 'Nova', 'Core', 'Peak', 'Hyper',
+]
+COMPANY_SUFFIXES = ['Inc.', 'Labs', 'Solutions', 'Systems', 'Co.', 'Group', 'Ltd.', 'Technologies']
+FIRST_NAMES = [
+    'Alex', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn', 'Sam',
+    'Priya', 'Wei', 'Carlos', 'Fatima', 'Olga', 'Kenji', 'Amara', 'Luca', 'Noor', 'Diego',
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Lee', 'Garcia', 'Chen', 'Patel', 'Kim', 'Nguyen', 'Brown', 'Martinez',
+    'Okafor', 'Rossi', 'Novak', 'Tanaka', 'Silva', 'Cohen', 'Müller', 'Dubois', 'Singh', 'Ali',
+]
+SCHOOLS = ['State University', 'Institute of Technology', 'Community College', 'Polytechnic', 'University']
+DEGREES = [('Bachelor of Science', 60), ('Master of Science', 25), ('Bachelor of Arts', 10), ('PhD', 5)]
+FIELDS_OF_STUDY = ['Computer Science', 'Software Engineering', 'Mathematics', 'Statistics', 'Physics', 'Information Systems']
+LINK_NAMES = ['Portfolio', 'LinkedIn', 'GitHub', 'Blog']
+
+# Fixed reference date so a given seed always produces the same rows
+SCALE_EPOCH = datetime.date(2025, 1, 1)
+
+
 class Command(BaseCommand):
     help = 'Populate database with sample jobs and skills'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', action='store_true',
+            help='Generate a large synthetic data set instead of the hand-written samples'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for --scale (default: 0)')
+        parser.add_argument('--recruiters', type=int, default=200, help='Recruiters to create with --scale')
+        parser.add_argument('--seekers', type=int, default=20000, help='Job seekers to create with --scale')
+        parser.add_argument('--jobs', type=int, default=20000, help='Jobs to create with --scale')
+        parser.add_argument('--applications', type=int, default=100000, help='Applications to create with --scale')
+        parser.add_argument('--skills', type=int, default=len(SKILL_NAMES), help='Skills to use with --scale')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT and per transaction')
+
     def handle(self, *args, **options):
-        # Create sample skills
-        skills_data = [
-            'Python', 'Django', 'JavaScript', 'React', 'Node.js', 'SQL', 'PostgreSQL',
-            'MongoDB', 'AWS', 'Docker', 'Kubernetes', 'Git', 'Linux', 'Machine Learning',
-            'Data Science', 'Java', 'Spring Boot', 'Angular', 'Vue.js', 'TypeScript',
-            'HTML', 'CSS', 'Bootstrap', 'REST API', 'GraphQL', 'Redis', 'Elasticsearch',
-            'Jenkins', 'CI/CD', 'Agile', 'Scrum', 'Project Management', 'Leadership',
-            'Communication', 'Problem Solving', 'Teamwork', 'Analytical Skills'
-        ]
+        if options['scale']:
+            return self.handle_scale(options)
         
+        # Create sample skills
         skills = []
-        for skill_name in skills_data:
+        for skill_name in SKILL_NAMES:
             skill, created = Skill.objects.get_or_create(name=skill_name)
             skills.append(skill)
             if created:
@@ -164,3 +233,273 @@ class Command(BaseCommand):
         self.stdout.write(
             self.style.SUCCESS('Successfully populated database with sample data!')
         )
+    
+    # --scale mode: seeded synthetic data, written with bulk_create in
+    # chunked transactions. Signals do not fire for bulk inserts, so counters,
+    # the search index and in-process caches are brought up to date at the end.
+    
+    def handle_scale(self, options):
+        seed = options['seed']
+        batch_size = options['batch_size']
+        prefix = f'scale{seed}'
+        if options['recruiters'] < 1 or options['seekers'] < 1 or options['skills'] < 1:
+            raise CommandError('--scale needs at least one recruiter, seeker and skill.')
+        if options['applications'] > options['seekers'] * options['jobs']:
+            raise CommandError('Each seeker can apply to a job only once; lower --applications.')
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f'Data for seed {seed} already exists; choose another --seed.')
+        
+        rng = random.Random(seed)
+        started = time.perf_counter()
+        self.total_rows = 0
+        
+        skills = self.scale_skills(options['skills'])
+        # Zipf-like popularity: the first skills in the list are the most common
+        self.skill_ids = [skill_id for skill_id, _ in skills]
+        self.skill_names = dict(skills)
+        self.skill_weights = list(accumulate(1 / (rank + 1) for rank in range(len(skills))))
+        password = make_password('password123')
+        
+        recruiter_ids, _ = self.scale_users(rng, prefix, 'recruiter', options['recruiters'], password, batch_size)
+        seeker_ids, profile_ids = self.scale_users(rng, prefix, 'job_seeker', options['seekers'], password, batch_size)
+        self.scale_profile_details(rng, profile_ids, batch_size)
+        job_ids = self.scale_jobs(rng, recruiter_ids, options['jobs'], batch_size)
+        self.scale_applications(rng, seeker_ids, job_ids, options['applications'], batch_size)
+        
+        step = time.perf_counter()
+        search.rebuild_index()
+        skill_index.invalidate()
+        bump_catalog_generation()
+        bump_skills_version()
+        self.stdout.write(f'Rebuilt search index in {time.perf_counter() - step:.1f}s')
+        
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {self.total_rows:,} rows in {elapsed:.1f}s '
+            f'({self.total_rows / elapsed:,.0f} rows/sec) with seed {seed}.'
+        ))
+        self.stdout.write(
+            'Other running processes refresh their in-memory skill index within SKILL_INDEX_TTL seconds.'
+        )
+    
+    def report(self, label, rows, started):
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        self.total_rows += rows
+        self.stdout.write(f'{label}: {rows:,} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/sec)')
+    
+    def scale_skills(self, count):
+        started = time.perf_counter()
+        names = SKILL_NAMES[:count] + [f'Skill {i:04d}' for i in range(len(SKILL_NAMES), count)]
+        Skill.objects.bulk_create([Skill(name=name) for name in names], ignore_conflicts=True)
+        # Skill names are unique regardless of case, so an existing "python"
+        # stands in for "Python"
+        ids = {name.lower(): skill_id for name, skill_id in Skill.objects.values_list('name', 'id')}
+        self.report('Skills', len(names), started)
+        return [(ids[name.lower()], name) for name in names]
+    
+    def pick_skills(self, rng, count):
+        picked = dict.fromkeys(rng.choices(self.skill_ids, cum_weights=self.skill_weights, k=count * 2))
+        return list(picked)[:count]
+    
+    def scale_users(self, rng, prefix, user_type, count, password, batch_size):
+        """Create users with their UserProfile (and JobSeekerProfile for seekers)."""
+        started = time.perf_counter()
+        user_ids, profile_ids = [], []
+        rows = 0
+        for start in range(0, count, batch_size):
+            users = []
+            for i in range(start, min(start + batch_size, count)):
+                username = f'{prefix}_{user_type}{i}'
+                users.append(User(
+                    username=username,
+                    email=f'{username}@example.com',
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                    password=password,
+                ))
+            
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                # bulk_create skips the post_save handler that normally adds these
+                UserProfile.objects.bulk_create([UserProfile(user_id=user.pk, user_type=user_type) for user in users])
+                rows += 2 * len(users)
+                if user_type == 'job_seeker':
+                    profiles = JobSeekerProfile.objects.bulk_create([
+                        JobSeekerProfile(
+                            user_id=user.pk,
+                            first_name=user.first_name,
+                            last_name=user.last_name,
+                            email=user.email,
+                            headline=f'{rng.choice(ROLES)} with {rng.randint(1, 15)} years of experience',
+                        )
+                        for user in users
+                    ])
+                    profile_ids.extend(profile.pk for profile in profiles)
+                    rows += len(profiles)
+            user_ids.extend(user.pk for user in users)
+        
+        self.report('Recruiters' if user_type == 'recruiter' else 'Job seekers', rows, started)
+        return user_ids, profile_ids
+    
+    def scale_profile_details(self, rng, profile_ids, batch_size):
+        """Skills, work history, education and links for each seeker profile."""
+        started = time.perf_counter()
+        through = JobSeekerProfile.skills.through
+        rows = 0
+        for start in range(0, len(profile_ids), batch_size):
+            skills, experience, education, links = [], [], [], []
+            for profile_id in profile_ids[start:start + batch_size]:
+                for skill_id in self.pick_skills(rng, rng.randint(3, 10)):
+                    skills.append(through(jobseekerprofile_id=profile_id, skill_id=skill_id))
+                
+                # Consecutive positions going back from the most recent one
+                end = None if rng.random() < 0.6 else SCALE_EPOCH - datetime.timedelta(days=rng.randint(0, 365))
+                before = end or SCALE_EPOCH
+                for _ in range(rng.choices(range(5), weights=[10, 30, 30, 20, 10])[0]):
+                    begin = before - datetime.timedelta(days=rng.randint(180, 1800))
+                    experience.append(WorkExperience(
+                        profile_id=profile_id,
+                        company=self.company_name(rng),
+                        title=rng.choice(ROLES),
+                        location=weighted_choice(rng, LOCATIONS),
+                        start_date=begin,
+                        end_date=end,
+                    ))
+                    end = begin - datetime.timedelta(days=rng.randint(0, 120))
+                    before = end
+                
+                for _ in range(rng.choices(range(3), weights=[15, 65, 20])[0]):
+                    finished = before - datetime.timedelta(days=rng.randint(0, 365))
+                    education.append(Education(
+                        profile_id=profile_id,
+                        school=f'{rng.choice(LAST_NAMES)} {rng.choice(SCHOOLS)}',
+                        degree=weighted_choice(rng, DEGREES),
+                        field_of_study=rng.choice(FIELDS_OF_STUDY),
+                        start_date=finished - datetime.timedelta(days=rng.randint(700, 1500)),
+                        end_date=finished,
+                    ))
+                    before = finished
+                
+                for name in rng.sample(LINK_NAMES, rng.randint(0, 2)):
+                    links.append(Link(profile_id=profile_id, name=name, url=f'https://example.com/{profile_id}/{name.lower()}'))
+            
+            with transaction.atomic():
+                through.objects.bulk_create(skills)
+                WorkExperience.objects.bulk_create(experience)
+                Education.objects.bulk_create(education)
+                Link.objects.bulk_create(links)
+            rows += len(skills) + len(experience) + len(education) + len(links)
+        
+        self.report('Profile skills, experience, education and links', rows, started)
+    
+    def company_name(self, rng):
+        return f'{rng.choice(COMPANY_WORDS)}{rng.choice(COMPANY_WORDS).lower()} {rng.choice(COMPANY_SUFFIXES)}'
+    
+    def scale_jobs(self, rng, recruiter_ids, count, batch_size):
+        started = time.perf_counter()
+        through = Job.skills_required.through
+        on_site_locations = [location for location in LOCATIONS if location[0] != 'Remote']
+        job_ids = []
+        rows = 0
+        for start in range(0, count, batch_size):
+            jobs, job_skills = [], []
+            for _ in range(start, min(start + batch_size, count)):
+                level = weighted_choice(rng, EXPERIENCE_LEVELS)
+                work_location = weighted_choice(rng, WORK_LOCATIONS)
+                location = 'Remote' if work_location == 'remote' else weighted_choice(rng, on_site_locations)
+                title = f'{LEVEL_TITLES[level]} {rng.choice(ROLES)}'.strip()
+                company = self.company_name(rng)
+                skill_ids = self.pick_skills(rng, rng.randint(3, 8))
+                names = [self.skill_names[skill_id] for skill_id in skill_ids]
+                
+                salary_min = salary_max = None
+                if rng.random() < 0.85:
+                    base = BASE_SALARY[level] * rng.lognormvariate(0, 0.2)
+                    salary_min = Decimal(round(base, -3))
+                    salary_max = Decimal(round(base * rng.uniform(1.15, 1.4), -3))
+                
+                jobs.append(Job(
+                    title=title,
+                    company=company,
+                    location=location,
+                    job_type=weighted_choice(rng, JOB_TYPES),
+                    experience_level=level,
+                    work_location=work_location,
+                    salary_min=salary_min,
+                    salary_max=salary_max,
+                    visa_sponsorship=rng.random() < 0.3,
+                    description=(
+                        f'{company} is hiring a {title} in {location}. '
+                        f'You will build and run production systems with {", ".join(names)}.'
+                    ),
+                    requirements=(
+                        f'{rng.randint(0, 10)}+ years of professional experience. '
+                        f'Strong {names[0]} skills; experience with {", ".join(names[1:]) or names[0]} is a plus.'
+                    ),
+                    posted_by_id=rng.choice(recruiter_ids),
+                    is_active=rng.random() < 0.95,
+                ))
+                job_skills.append(skill_ids)
+            
+            with transaction.atomic():
+                Job.objects.bulk_create(jobs)
+                links = [
+                    through(job_id=job.pk, skill_id=skill_id)
+                    for job, skill_ids in zip(jobs, job_skills)
+                    for skill_id in skill_ids
+                ]
+                through.objects.bulk_create(links)
+            job_ids.extend(job.pk for job in jobs)
+            rows += len(jobs) + len(links)
+        
+        self.report('Jobs and required skills', rows, started)
+        return job_ids
+    
+    def scale_applications(self, rng, seeker_ids, job_ids, count, batch_size):
+        """
+        Spread ``count`` applications evenly over seekers, choosing jobs with
+        a heavy-tailed popularity so a few postings draw most applicants.
+        """
+        if not count or not job_ids:
+            return
+        started = time.perf_counter()
+        popularity = list(accumulate(rng.paretovariate(1.2) for _ in job_ids))
+        per_seeker, extra = divmod(count, len(seeker_ids))
+        
+        def generate():
+            for index, seeker_id in enumerate(seeker_ids):
+                wanted = per_seeker + (index < extra)
+                if not wanted:
+                    continue
+                chosen = dict.fromkeys(rng.choices(job_ids, cum_weights=popularity, k=wanted * 2))
+                while len(chosen) < wanted:
+                    chosen[rng.choice(job_ids)] = None
+                for job_id in list(chosen)[:wanted]:
+                    yield JobApplication(
+                        job_id=job_id,
+                        applicant_id=seeker_id,
+                        status=weighted_choice(rng, APPLICATION_STATUSES),
+                        cover_note=f'I would love to bring my experience to this role. (Application {seeker_id}-{job_id})',
+                    )
+        
+        applications = generate()
+        rows = 0
+        while True:
+            batch = [application for _, application in zip(range(batch_size), applications)]
+            if not batch:
+                break
+            with transaction.atomic():
+                JobApplication.objects.bulk_create(batch)
+            rows += len(batch)
+        
+        # Set the denormalized counters that record_application() would have
+        # kept: one grouped recount, then an UPDATE for each job that changed
+        with transaction.atomic():
+            counters.reconcile()
+        
+        self.report('Applications', rows, started)
+
+
+def weighted_choice(rng, pairs):
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights=weights)[0]
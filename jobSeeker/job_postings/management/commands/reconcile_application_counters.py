@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from job_postings import counters
+
+
+class Command(BaseCommand):
+    help = 'Recount applications per job and fix any drift in the denormalized counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', type=int, help='Only check these jobs')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def handle(self, *args, **options):
+        drift = counters.reconcile(job_ids=options['job_ids'] or None, dry_run=options['dry_run'])
+
+        for job_id, differences in sorted(drift.items()):
+            details = ', '.join(
+                f'{field} {stored} -> {actual}'
+                for field, (stored, actual) in differences.items()
+            )
+            self.stdout.write(f'Job {job_id}: {details}')
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('All application counters are accurate.'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} job(s) have drifted counters.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Fixed counters on {len(drift)} job(s).'))
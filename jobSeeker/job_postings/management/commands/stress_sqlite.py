@@ -0,0 +1,237 @@
+import datetime
+import json
+import multiprocessing
+import platform
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection, transaction
+
+from jobSeeker.tiered_cache import isolated_caches
+
+PROFILES = ('default', 'tuned')
+
+
+def _worker(profile, name, worker, options, barrier, results):
+    """
+    One worker process: requests for ``options['duration']`` seconds, each
+    an application (as ``apply_to_job`` writes it) or a listing page read.
+    Connections are opened and closed around each request as Django's
+    request handling does, so ``CONN_MAX_AGE`` has the same effect.
+
+    Runs in a fresh spawned interpreter, so this module imports no models
+    at the top.
+    """
+    django.setup()
+    from django.contrib.auth.models import AnonymousUser
+
+    from job_postings import selectors
+    from job_postings.models import JobApplication
+    from job_postings.pagination import JOB_ORDERING
+
+    settings_dict = connection.settings_dict
+    settings_dict['NAME'] = name
+    if profile == 'default':
+        # Django's own SQLite behaviour: a connection per request, deferred
+        # transactions, rollback journal and a 5 second timeout
+        settings_dict.update(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False, OPTIONS={})
+        settings.SQLITE_PRAGMAS = {}
+
+    rng = random.Random(options['seed'] + worker)
+    applicant_id = options['applicant_ids'][worker]
+    job_ids = options['job_ids'][:]
+    rng.shuffle(job_ids)
+    next_job = 0
+    latencies, writes, lock_errors = [], 0, 0
+
+    # Keep the throwaway rows out of the shared on-disk cache
+    with isolated_caches():
+        barrier.wait()
+        deadline = time.perf_counter() + options['duration']
+        while time.perf_counter() < deadline:
+            close_old_connections()
+            write = rng.random() < options['write_ratio']
+            started = time.perf_counter()
+            try:
+                if write:
+                    if next_job == len(job_ids):
+                        # Applied everywhere: withdraw them all and go round again
+                        JobApplication.objects.filter(applicant_id=applicant_id).delete()
+                        next_job = 0
+                    else:
+                        # The post_save handler adds to the counters in the same transaction
+                        with transaction.atomic():
+                            JobApplication.objects.create(
+                                job_id=job_ids[next_job], applicant_id=applicant_id, cover_note='Stress test',
+                            )
+                        next_job += 1
+                else:
+                    list(selectors.job_cards(AnonymousUser()).order_by(*JOB_ORDERING)[:20])
+            except OperationalError as exc:
+                if 'locked' not in str(exc):
+                    raise
+                lock_errors += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+                writes += write
+            close_old_connections()
+    connection.close()
+    results.put({'latencies': latencies, 'writes': writes, 'lock_errors': lock_errors})
+
+
+class Command(BaseCommand):
+    help = (
+        'Load a throwaway SQLite database from several processes at once, '
+        'first with Django\'s default SQLite settings and then with the tuned '
+        'ones (SQLITE_PRAGMAS, IMMEDIATE transactions, persistent '
+        'connections), and compare throughput and "database is locked" errors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=8, help='Concurrent worker processes (default: 8)')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds each run lasts (default: 10)')
+        parser.add_argument(
+            '--write-ratio', type=float, default=0.3,
+            help='Fraction of requests that apply to a job (default: 0.3)'
+        )
+        parser.add_argument('--jobs', type=int, default=2000, help='Jobs in the data set (default: 2000)')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the request mix (default: 0)')
+        parser.add_argument(
+            '--profiles', default=','.join(PROFILES),
+            help=f'Comma-separated profiles to run (default: {",".join(PROFILES)})'
+        )
+        parser.add_argument('--output', default='sqlite-stress-report.json', help='Where to write the JSON report')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('stress_sqlite only runs against SQLite.')
+        profiles = [profile.strip() for profile in options['profiles'].split(',') if profile.strip()]
+        unknown = set(profiles).difference(PROFILES)
+        if unknown:
+            raise CommandError(f'Unknown profiles: {", ".join(sorted(unknown))}.')
+        if options['processes'] < 1 or options['duration'] <= 0:
+            raise CommandError('--processes and --duration must be positive.')
+        if not 0 <= options['write_ratio'] <= 1:
+            raise CommandError('--write-ratio must be between 0 and 1.')
+
+        # The workers need a database file they can all open, so the test
+        # database lives in a temporary directory rather than in memory
+        old_name = connection.settings_dict['NAME']
+        with tempfile.TemporaryDirectory() as directory:
+            connection.settings_dict['TEST'] = {
+                **connection.settings_dict.get('TEST', {}),
+                'NAME': str(Path(directory) / 'stress.sqlite3'),
+            }
+            with isolated_caches():
+                name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                try:
+                    self.stdout.write(f'Generating data set with {options["jobs"]:,} jobs...')
+                    options.update(self.load_stress_data(options))
+                    results = {}
+                    for profile in profiles:
+                        self.reset(profile)
+                        results[profile] = self.run_profile(profile, name, options)
+                        self.print_profile(profile, results[profile])
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'meta': {
+                'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'processes': options['processes'],
+                'duration': options['duration'],
+                'write_ratio': options['write_ratio'],
+                'jobs': options['jobs'],
+                'seed': options['seed'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'sqlite': connection.Database.sqlite_version,
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        self.stdout.write(f'Wrote report to {options["output"]}')
+
+    def load_stress_data(self, options):
+        from django.contrib.auth.models import User
+
+        from job_postings.models import Job
+
+        recruiter = User.objects.create_user('stress-recruiter')
+        seekers = User.objects.bulk_create([
+            User(username=f'stress-seeker-{worker}') for worker in range(options['processes'])
+        ])
+        jobs = Job.objects.bulk_create([
+            Job(
+                title=f'Job {i}', company='Company', location='Remote', description='Description',
+                requirements='Requirements', posted_by=recruiter,
+            )
+            for i in range(options['jobs'])
+        ])
+        return {
+            'applicant_ids': [seeker.pk for seeker in seekers],
+            'job_ids': [job.pk for job in jobs],
+        }
+
+    def reset(self, profile):
+        from job_postings.counters import COUNTER_FIELDS
+        from job_postings.models import Job, JobApplication
+
+        JobApplication.objects.all().delete()
+        Job.objects.update(**{field: 0 for field in COUNTER_FIELDS})
+        with connection.cursor() as cursor:
+            # WAL is stored in the file, so put back the default journal for
+            # a run without tuning
+            cursor.execute(f'PRAGMA journal_mode = {"WAL" if profile == "tuned" else "DELETE"}')
+        connection.close()
+
+    def run_profile(self, profile, name, options):
+        context = multiprocessing.get_context('spawn')
+        barrier = context.Barrier(options['processes'])
+        results = context.Queue()
+        worker_options = {
+            key: options[key]
+            for key in ('duration', 'write_ratio', 'seed', 'applicant_ids', 'job_ids')
+        }
+        processes = [
+            context.Process(target=_worker, args=(profile, name, worker, worker_options, barrier, results))
+            for worker in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        # Read before joining: a process does not exit while its queue item is unread
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+            if process.exitcode:
+                raise CommandError(f'A {profile} worker failed with exit code {process.exitcode}.')
+
+        latencies = [latency * 1000 for outcome in outcomes for latency in outcome['latencies']]
+        requests = len(latencies)
+        if requests > 1:
+            p95 = statistics.quantiles(latencies, n=100, method='inclusive')[94]
+        else:
+            p95 = latencies[0] if latencies else 0
+        return {
+            'requests_per_second': round(requests / options['duration'], 1),
+            'writes_per_second': round(sum(outcome['writes'] for outcome in outcomes) / options['duration'], 1),
+            'lock_errors': sum(outcome['lock_errors'] for outcome in outcomes),
+            'p50_ms': round(statistics.median(latencies), 3) if latencies else 0,
+            'p95_ms': round(p95, 3),
+            'max_ms': round(max(latencies, default=0), 3),
+        }
+
+    def print_profile(self, profile, result):
+        self.stdout.write(
+            f'{profile:<8} {result["requests_per_second"]:>9.1f} req/s {result["writes_per_second"]:>9.1f} writes/s '
+            f'p50 {result["p50_ms"]:.2f} ms  p95 {result["p95_ms"]:.2f} ms  '
+            f'lock errors {result["lock_errors"]}'
+        )
@@ -0,0 +1,61 @@
+import contextlib
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the primary SQLite database over each read replica in '
+        'DATABASE_REPLICAS. It stands in for replication when trying the '
+        'replica router locally; real deployments use the database\'s own.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Keep syncing every INTERVAL seconds until interrupted (default: sync once)'
+        )
+
+    def handle(self, *args, **options):
+        aliases = getattr(settings, 'DATABASE_REPLICAS', [])
+        if not aliases:
+            raise CommandError('No replicas configured; set JOBSEEKER_DB_REPLICAS.')
+        primary = connections['default']
+        if primary.vendor != 'sqlite' or any(connections[alias].vendor != 'sqlite' for alias in aliases):
+            raise CommandError('sync_replicas only copies SQLite databases.')
+
+        try:
+            while True:
+                for alias in aliases:
+                    started = time.perf_counter()
+                    self.copy(primary.settings_dict['NAME'], connections[alias].settings_dict['NAME'])
+                    elapsed = (time.perf_counter() - started) * 1000
+                    self.stdout.write(f'Synced {alias} in {elapsed:.0f} ms')
+                if not options['interval']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+    def copy(self, source, target):
+        """
+        Snapshot ``source`` with SQLite's online backup, which is consistent
+        even while the primary takes writes, then swap it in with a rename
+        so replica readers never see a half-written file. Connections that
+        are already open keep reading the previous copy until they reconnect.
+        """
+        target = Path(target)
+        staging = target.with_name(f'.{target.name}.sync')
+        staging.unlink(missing_ok=True)
+        with contextlib.closing(sqlite3.connect(source)) as primary, \
+                contextlib.closing(sqlite3.connect(staging)) as replica:
+            primary.backup(replica)
+            # A WAL-mode copy could pick up the previous replica's -wal file
+            replica.execute('PRAGMA journal_mode=DELETE')
+        os.replace(staging, target)
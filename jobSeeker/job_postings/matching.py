@@ -0,0 +1,198 @@
+"""
+Skill-match scoring between a job seeker and every active job.
+
+Active jobs and their required skills are held as a sparse job x skill
+matrix in compressed-column form: for each skill, the array of job rows that
+require it. A seeker is a sparse row of skill ids, so scoring is a single
+weighted ``bincount`` over the postings of the seeker's skills, normalised to
+a cosine similarity, followed by a partial sort for the top k.
+
+Skills are weighted by inverse document frequency, so sharing a rare skill
+counts for more than sharing a ubiquitous one. The weights are fixed when the
+matrix is built; jobs patched in afterwards are scored with them until the
+next build. NumPy is used when installed; otherwise the same computation runs
+over plain Python containers.
+"""
+import heapq
+import math
+import threading
+import time
+from array import array
+
+from django.conf import settings
+
+from jobSeeker.db_router import use_primary
+from .skill_index import skill_index
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy
+    np = None
+
+
+class JobSkillMatrix:
+    def __init__(self, rows):
+        """Build from ``(job_id, skill_id)`` pairs for active jobs."""
+        job_rows = {}
+        postings = {}
+        for job_id, skill_id in rows:
+            row = job_rows.setdefault(job_id, len(job_rows))
+            postings.setdefault(skill_id, array('q')).append(row)
+
+        self.job_ids = array('q', job_rows)
+        self.rows = job_rows
+        job_count = len(self.job_ids)
+        self.weights = {
+            skill_id: math.log(1 + job_count / len(rows_for_skill))
+            for skill_id, rows_for_skill in postings.items()
+        }
+
+        squared_norms = [0.0] * job_count
+        self.row_skills = [[] for _ in range(job_count)]
+        for skill_id, rows_for_skill in postings.items():
+            weight_squared = self.weights[skill_id] ** 2
+            for row in rows_for_skill:
+                squared_norms[row] += weight_squared
+                self.row_skills[row].append(skill_id)
+
+        if np is not None:
+            self.postings = {skill_id: np.frombuffer(rows_for_skill, dtype=np.int64) for skill_id, rows_for_skill in postings.items()}
+            self.norms = np.sqrt(np.array(squared_norms))
+            self.job_ids = np.frombuffer(self.job_ids, dtype=np.int64)
+        else:
+            self.postings = postings
+            self.norms = [math.sqrt(value) for value in squared_norms]
+
+    def update_job(self, job_id, skill_ids):
+        """Patch one job's row to require ``skill_ids``; no skills takes it out of the results."""
+        skill_ids = set(skill_ids)
+        row = self.rows.get(job_id)
+        old = set(self.row_skills[row]) if row is not None else set()
+        if skill_ids == old:
+            return
+
+        # A skill new to the matrix is weighted as if this were its only job
+        for skill_id in skill_ids - self.weights.keys():
+            self.weights[skill_id] = math.log(1 + len(self.job_ids) + (row is None))
+        norm = math.sqrt(sum(self.weights[skill_id] ** 2 for skill_id in skill_ids))
+
+        if row is None:
+            row = self.rows[job_id] = len(self.job_ids)
+            self.row_skills.append([])
+            if np is not None:
+                self.job_ids = np.append(self.job_ids, job_id)
+                self.norms = np.append(self.norms, norm)
+            else:
+                self.job_ids.append(job_id)
+                self.norms.append(norm)
+        else:
+            self.norms[row] = norm
+        self.row_skills[row] = list(skill_ids)
+
+        for skill_id in old - skill_ids:
+            rows_for_skill = self.postings[skill_id]
+            if np is not None:
+                self.postings[skill_id] = rows_for_skill[rows_for_skill != row]
+            else:
+                self.postings[skill_id] = array('q', (other for other in rows_for_skill if other != row))
+        for skill_id in skill_ids - old:
+            if np is not None:
+                self.postings[skill_id] = np.append(self.postings.get(skill_id, np.empty(0, dtype=np.int64)), row)
+            else:
+                self.postings.setdefault(skill_id, array('q')).append(row)
+
+    def top_matches(self, skill_ids, k, exclude=()):
+        """
+        Return up to ``k`` ``(job_id, score)`` pairs, best first, where score
+        is the weighted cosine similarity in ``(0, 1]``.
+        """
+        skill_ids = [skill_id for skill_id in set(skill_ids) if skill_id in self.postings]
+        if not skill_ids or k <= 0:
+            return []
+
+        seeker_norm = math.sqrt(sum(self.weights[skill_id] ** 2 for skill_id in skill_ids))
+        exclude = set(exclude)
+
+        if np is not None:
+            rows = np.concatenate([self.postings[skill_id] for skill_id in skill_ids])
+            weights = np.repeat(
+                [self.weights[skill_id] for skill_id in skill_ids],
+                [len(self.postings[skill_id]) for skill_id in skill_ids],
+            )
+            overlap = np.bincount(rows, weights=weights, minlength=len(self.job_ids))
+            candidates = np.flatnonzero(overlap)
+            scores = overlap[candidates] / (self.norms[candidates] * seeker_norm)
+            if exclude:
+                keep = ~np.isin(self.job_ids[candidates], list(exclude))
+                candidates, scores = candidates[keep], scores[keep]
+            if len(candidates) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                candidates, scores = candidates[top], scores[top]
+            order = np.lexsort((-self.job_ids[candidates], -scores))
+            return [(int(self.job_ids[candidates[i]]), float(scores[i])) for i in order]
+
+        overlap = {}
+        for skill_id in skill_ids:
+            weight = self.weights[skill_id]
+            for row in self.postings[skill_id]:
+                overlap[row] = overlap.get(row, 0.0) + weight
+        scored = (
+            (value / (self.norms[row] * seeker_norm), self.job_ids[row])
+            for row, value in overlap.items()
+            if self.job_ids[row] not in exclude
+        )
+        return [(job_id, score) for score, job_id in heapq.nlargest(k, scored)]
+
+
+class MatchingEngine:
+    """
+    Keeps a ``JobSkillMatrix`` current with the skill index: the jobs the
+    index was patched for since the matrix last caught up are patched into
+    it, and it is built afresh every ``SKILL_INDEX_TTL`` seconds or when the
+    index itself was rebuilt.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._generation = None
+        self._built_at = 0.0
+
+    def _refresh(self):
+        ttl = getattr(settings, 'SKILL_INDEX_TTL', 60)
+        if self._matrix is not None and time.monotonic() - self._built_at <= ttl:
+            if self._generation == skill_index.generation:
+                return
+            job_ids, generation = skill_index.changes_since(self._generation)
+            if job_ids is not None:
+                for job_id, skill_ids in skill_index.job_skills(job_ids).items():
+                    self._matrix.update_job(job_id, skill_ids)
+                self._generation = generation
+                return
+
+        from .models import Job
+
+        generation = skill_index.generation
+        # Like the skill index, built from the primary: the patches it is
+        # kept current with would be undone by a lagging replica
+        with use_primary():
+            rows = (
+                Job.skills_required.through.objects
+                .filter(job__is_active=True)
+                .values_list('job_id', 'skill_id')
+                .iterator(chunk_size=10000)
+            )
+            self._matrix = JobSkillMatrix(rows)
+        self._generation = generation
+        self._built_at = time.monotonic()
+
+    def recommend(self, skill_ids, k=None, exclude=()):
+        if k is None:
+            k = getattr(settings, 'RECOMMENDATIONS_LIMIT', 20)
+        # Patches change the matrix in place, so score under the lock
+        with self._lock:
+            self._refresh()
+            return self._matrix.top_matches(skill_ids, k, exclude=exclude)
+
+
+matching_engine = MatchingEngine()
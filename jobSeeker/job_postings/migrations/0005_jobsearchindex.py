@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:15
+
+import django.db.models.deletion
+import job_postings.models
+from django.db import migrations, models
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE job_postings_jobsearchindex USING fts5("
+        "title, company, description, requirements, tokenize='porter unicode61')"
+    )
+    # Weight title and company matches above the long free-text columns
+    schema_editor.execute(
+        "INSERT INTO job_postings_jobsearchindex(job_postings_jobsearchindex, rank) "
+        "VALUES('rank', 'bm25(10.0, 5.0, 1.0, 2.0)')"
+    )
+    schema_editor.execute(
+        "INSERT INTO job_postings_jobsearchindex (rowid, title, company, description, requirements) "
+        "SELECT id, title, company, description, requirements FROM job_postings_job WHERE is_active"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS job_postings_jobsearchindex")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_postings', '0004_jobapplication_status_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSearchIndex',
+            fields=[
+                ('job', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='job_postings.job')),
+                ('title', models.TextField()),
+                ('company', models.TextField()),
+                ('description', models.TextField()),
+                ('requirements', models.TextField()),
+                ('document', job_postings.models.SearchDocumentField(db_column='job_postings_jobsearchindex', editable=False)),
+                ('rank', models.FloatField(editable=False)),
+            ],
+            options={
+                'db_table': 'job_postings_jobsearchindex',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:23
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    Job = apps.get_model('job_postings', 'Job')
+    JobApplication = apps.get_model('job_postings', 'JobApplication')
+
+    counts = {}
+    rows = JobApplication.objects.values_list('job_id', 'status').annotate(count=Count('id')).order_by()
+    for job_id, status, count in rows:
+        fields = counts.setdefault(job_id, {'application_count': 0})
+        fields['application_count'] += count
+        fields[f'{status}_count'] = count
+
+    for job_id, fields in counts.items():
+        Job.objects.filter(pk=job_id).update(**fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_postings', '0005_jobsearchindex'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='applied_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='closed_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='interview_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='offer_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -43,14 +43,106 @@ class Job(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     
+    # Denormalized application counters, maintained by job_postings.counters
+    # and checked by the reconcile_application_counters command
+    application_count = models.PositiveIntegerField(default=0, editable=False)
+    applied_count = models.PositiveIntegerField(default=0, editable=False)
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    interview_count = models.PositiveIntegerField(default=0, editable=False)
+    offer_count = models.PositiveIntegerField(default=0, editable=False)
+    closed_count = models.PositiveIntegerField(default=0, editable=False)
+    
     class Meta:
         ordering = ['-created_at']
+        # Listings and searches only ever read active jobs, newest first
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_recent_idx',
+            ),
+            models.Index(
+                fields=['job_type', '-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_type_idx',
+            ),
+            models.Index(
+                fields=['experience_level', '-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_level_idx',
+            ),
+            models.Index(
+                fields=['work_location', '-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_location_idx',
+            ),
+            # Incremental sync through the job feed
+            models.Index(fields=['updated_at', 'id'], name='job_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} at {self.company}"
     
+    def save(self, *args, **kwargs):
+        # The counters only change through job_postings.counters' UPDATEs.
+        # Writing back the values loaded with this instance would undo any
+        # made since, so saving an existing job leaves them out unless
+        # update_fields names them.
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            counter_fields = set(self.counter_fields())
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in counter_fields
+            ]
+        super().save(*args, **kwargs)
+    
     def get_absolute_url(self):
         return reverse('job_postings.show', kwargs={'id': self.pk})
+    
+    @staticmethod
+    def counter_fields():
+        """The denormalized counters: the total, then one per application status."""
+        return ['application_count'] + [f'{status}_count' for status, _ in JobApplication.STATUS_CHOICES]
+    
+    def status_counts(self):
+        """``(status, label, count)`` for every application status, from the counters."""
+        return [
+            (status, label, getattr(self, f'{status}_count'))
+            for status, label in JobApplication.STATUS_CHOICES
+        ]
+
+class SearchDocumentField(models.TextField):
+    """
+    The hidden FTS5 column that shares its name with the table. Filtering on
+    it with the ``match`` lookup runs a full-text query over every column.
+    """
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+class JobSearchIndex(models.Model):
+    """
+    Read-only view of the SQLite FTS5 table that mirrors the searchable text
+    of active jobs. Rows are written by ``job_postings.search``, never through
+    the ORM.
+    """
+    job = models.OneToOneField(Job, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_index')
+    title = models.TextField()
+    company = models.TextField()
+    description = models.TextField()
+    requirements = models.TextField()
+    document = SearchDocumentField(db_column='job_postings_jobsearchindex', editable=False)
+    rank = models.FloatField(editable=False)
+
+    class Meta:
+        managed = False
+        db_table = 'job_postings_jobsearchindex'
 
 class JobApplication(models.Model):
     STATUS_CHOICES = [
@@ -71,6 +163,12 @@ class JobApplication(models.Model):
     class Meta:
         unique_together = ('job', 'applicant')  # Prevent duplicate applications
         ordering = ['-applied_at']
+        indexes = [
+            # Manage applications filtered by status, newest first
+            models.Index(fields=['job', 'status', '-applied_at'], name='application_job_status_idx'),
+            # An applicant's own applications on the profile page
+            models.Index(fields=['applicant', '-applied_at'], name='application_applicant_idx'),
+        ]
     
     def __str__(self):
         return f"{self.applicant.username} applied to {self.job.title} at {self.job.company}"
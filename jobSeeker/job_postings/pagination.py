@@ -0,0 +1,272 @@
+"""
+Keyset (cursor) pagination for job listings.
+
+Pages are fetched with a ``WHERE (key) < (last key seen)`` condition instead of
+an OFFSET, so every page costs the same index range scan however deep the user
+goes. Cursors are signed, so clients cannot forge arbitrary filter values.
+"""
+import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+
+CURSOR_SALT = 'job_postings.pagination'
+
+# Job.Meta.ordering plus the primary key as a unique tie-breaker
+JOB_ORDERING = ('-created_at', '-id')
+
+DEFAULT_PAGE_SIZE = getattr(settings, 'JOB_PAGE_SIZE', 20)
+MAX_PAGE_SIZE = getattr(settings, 'JOB_MAX_PAGE_SIZE', 100)
+
+
+def get_page_size(request, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Read ``?page_size=`` from the request, clamped to ``1..maximum``."""
+    try:
+        page_size = int(request.GET.get('page_size', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, maximum))
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, count=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.count = count
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by the unique, totally ordered key ``ordering``
+    (e.g. ``('-created_at', '-id')``). The last field must be unique so ties
+    on the earlier fields still produce a strict order.
+
+    ``with_count`` runs a ``COUNT(*)`` and exposes it as ``page.count``; leave
+    it off unless the template actually shows an exact total.
+    """
+
+    def __init__(self, queryset, ordering=JOB_ORDERING, page_size=DEFAULT_PAGE_SIZE, with_count=False):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.page_size = page_size
+        self.with_count = with_count
+
+    def page(self, cursor=None):
+        position, queryset = self._page_queryset(cursor)
+        rows = list(queryset)
+        count = self.queryset.count() if self.with_count else None
+        return self._page(position, rows, count)
+
+    async def apage(self, cursor=None):
+        """``page()`` for async views, through the async ORM interface."""
+        position, queryset = self._page_queryset(cursor)
+        rows = [row async for row in queryset.aiterator(chunk_size=self.page_size + 1)]
+        count = await self.queryset.acount() if self.with_count else None
+        return self._page(position, rows, count)
+
+    def _page_queryset(self, cursor):
+        position = self.decode_cursor(cursor)
+        ordering = self.ordering
+        queryset = self.queryset
+        if position and position['direction'] == 'previous':
+            ordering = tuple(self._reverse(field) for field in ordering)
+        if position:
+            queryset = queryset.filter(self._after(ordering, position['values']))
+        return position, queryset.order_by(*ordering)[:self.page_size + 1]
+
+    def _page(self, position, rows, count):
+        backwards = bool(position) and position['direction'] == 'previous'
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or backwards:
+                next_cursor = self.encode_cursor(rows[-1], 'next')
+            if position and (has_more or not backwards):
+                previous_cursor = self.encode_cursor(rows[0], 'previous')
+        return CursorPage(rows, next_cursor, previous_cursor, count)
+
+    def encode_cursor(self, row, direction):
+        values = [self._value(row, field.lstrip('-')) for field in self.ordering]
+        payload = {'direction': direction, 'values': values}
+        return signing.dumps(payload, salt=CURSOR_SALT, serializer=_CursorSerializer, compress=True)
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            payload = signing.loads(cursor, salt=CURSOR_SALT, serializer=_CursorSerializer)
+        except signing.BadSignature:
+            return None
+        values = payload.get('values')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            return None
+        payload['values'] = [
+            self._to_python(field.lstrip('-'), value)
+            for field, value in zip(self.ordering, values)
+        ]
+        return payload
+
+    def _after(self, ordering, values):
+        """
+        Row-value comparison ``(a, b, c) > (x, y, z)`` in the direction of each
+        field, expanded to ``a > x OR (a = x AND b > y) OR ...``.
+        """
+        condition = Q()
+        equal_prefix = {}
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            operator = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal_prefix, **{f'{name}__{operator}': value})
+            equal_prefix[name] = value
+        return condition
+
+    def _value(self, row, name):
+        if isinstance(row, dict):
+            return row[name]
+        value = row
+        for part in name.split(LOOKUP_SEP):
+            value = getattr(value, part)
+        return getattr(value, 'pk', value)
+
+    def _to_python(self, name, value):
+        model = self.queryset.model
+        field = None
+        try:
+            for part in name.split(LOOKUP_SEP):
+                field = model._meta.get_field(part)
+                model = field.related_model
+        except FieldDoesNotExist:
+            # Annotations such as a search rank round-trip through JSON as-is
+            return value
+        if field.is_relation:
+            field = field.target_field
+        return field.to_python(value)
+
+    @staticmethod
+    def _reverse(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+
+class IdListPaginator:
+    """
+    Paginate a precomputed, ordered list of primary keys, such as a cached
+    search result. Cursors carry the id at the page boundary and its offset,
+    so finding the page costs one lookup when the list is unchanged. If the
+    list has changed, the id is searched for; if it has dropped out of the
+    list, paging restarts from the first page.
+
+    ``load`` is called with the ids of one page and must return their objects
+    in any order; they are put back into list order here.
+    """
+
+    def __init__(self, ids, load, page_size=DEFAULT_PAGE_SIZE):
+        self.ids = ids
+        self.load = load
+        self.page_size = page_size
+
+    def page(self, cursor=None):
+        start, end = self._bounds(cursor)
+        page_ids = list(self.ids[start:end])
+        objects = {obj.pk: obj for obj in self.load(page_ids)} if page_ids else {}
+        return self._page(start, end, page_ids, objects)
+
+    async def apage(self, cursor=None):
+        """``page()`` for async views; ``load`` must return a queryset, iterated with ``aiterator()``."""
+        start, end = self._bounds(cursor)
+        page_ids = list(self.ids[start:end])
+        objects = {}
+        if page_ids:
+            async for obj in self.load(page_ids).aiterator(chunk_size=len(page_ids)):
+                objects[obj.pk] = obj
+        return self._page(start, end, page_ids, objects)
+
+    def _bounds(self, cursor):
+        position = self.decode_cursor(cursor)
+        start = 0
+        if position:
+            index = self._index(position)
+            if index is not None:
+                if position['direction'] == 'previous':
+                    start = max(index - self.page_size, 0)
+                else:
+                    start = index + 1
+        return start, min(start + self.page_size, len(self.ids))
+
+    def _index(self, position):
+        """The cursor's offset in ``ids``, or None if its id is no longer listed."""
+        offset = position.get('offset')
+        if isinstance(offset, int) and 0 <= offset < len(self.ids) and self.ids[offset] == position['id']:
+            return offset
+        try:
+            return self.ids.index(position['id'])
+        except ValueError:
+            return None
+
+    def _page(self, start, end, page_ids, objects):
+        rows = [objects[pk] for pk in page_ids if pk in objects]
+
+        next_cursor = previous_cursor = None
+        if page_ids:
+            if end < len(self.ids):
+                next_cursor = self.encode_cursor(page_ids[-1], 'next', end - 1)
+            if start > 0:
+                previous_cursor = self.encode_cursor(page_ids[0], 'previous', start)
+        return CursorPage(rows, next_cursor, previous_cursor, len(self.ids))
+
+    def encode_cursor(self, pk, direction, offset):
+        return signing.dumps({'direction': direction, 'id': pk, 'offset': offset}, salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            payload = signing.loads(cursor, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            return None
+        if not isinstance(payload, dict) or 'id' not in payload:
+            return None
+        return payload
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder truncates microseconds, which would make the
+        # cursor compare unequal to the row it was taken from.
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class _CursorSerializer(signing.JSONSerializer):
+    def dumps(self, obj):
+        return _CursorEncoder(separators=(',', ':')).encode(obj).encode('latin-1')
@@ -0,0 +1,151 @@
+"""
+Applicant fit scoring for recruiters.
+
+Every application to a job gets a 0-100 fit score from the applicant's
+``JobSeekerProfile``: coverage of the job's required skills, years of work
+experience against the job's experience level, and whether any education is
+listed. Scores are computed for all applicants of a job in one batched pass
+and cached per (job version, profile version), so only applicants whose
+profile changed since the last view are rescored.
+"""
+import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+
+from user_profiles.models import JobSeekerProfile, WorkExperience, Education
+
+SKILLS_WEIGHT = 0.6
+EXPERIENCE_WEIGHT = 0.3
+EDUCATION_WEIGHT = 0.1
+
+# Years of experience that fully satisfy each experience level
+EXPECTED_YEARS = {
+    'entry': 0,
+    'mid': 3,
+    'senior': 5,
+    'executive': 10,
+}
+
+
+def _cache_key(job, profile):
+    return f'job_postings:fit:{job.pk}:{job.updated_at.timestamp()}:{profile.pk}:{profile.version}'
+
+
+def _years_of_experience(periods, today):
+    """Total years covered by ``(start, end)`` periods, counting overlaps once."""
+    total = datetime.timedelta()
+    current_start = current_end = None
+    for start, end in sorted((start, end or today) for start, end in periods):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total.days / 365.25
+
+
+def fit_score(required_skill_ids, matched_skill_count, years, has_education, experience_level):
+    if required_skill_ids:
+        skills = matched_skill_count / len(required_skill_ids)
+    else:
+        skills = 1.0
+
+    expected = EXPECTED_YEARS.get(experience_level, 0)
+    experience = min(years / expected, 1.0) if expected else 1.0
+
+    education = 1.0 if has_education else 0.0
+
+    return round(100 * (
+        SKILLS_WEIGHT * skills
+        + EXPERIENCE_WEIGHT * experience
+        + EDUCATION_WEIGHT * education
+    ))
+
+
+def score_applications(job, applications):
+    """
+    Set ``fit_score`` on each application. ``applications`` must have
+    ``applicant__jobseekerprofile`` selected; applicants without a profile
+    score as an empty profile would.
+    """
+    applications = list(applications)
+    required = set(job.skills_required.values_list('id', flat=True))
+    profiles = {}
+    for application in applications:
+        profile = getattr(application.applicant, 'jobseekerprofile', None)
+        if profile is not None:
+            profiles[profile.pk] = profile
+
+    keys = {profile_id: _cache_key(job, profile) for profile_id, profile in profiles.items()}
+    cached = cache.get_many(keys.values())
+    scores = {
+        profile_id: cached[key]
+        for profile_id, key in keys.items()
+        if key in cached
+    }
+
+    missing = [profile_id for profile_id in profiles if profile_id not in scores]
+    if missing:
+        scores.update(_compute_scores(job, required, missing))
+        cache.set_many(
+            {keys[profile_id]: scores[profile_id] for profile_id in missing},
+            getattr(settings, 'FIT_SCORE_CACHE_TIMEOUT', 60 * 60 * 24),
+        )
+
+    empty_profile_score = fit_score(required, 0, 0, False, job.experience_level)
+    for application in applications:
+        profile = getattr(application.applicant, 'jobseekerprofile', None)
+        application.fit_score = scores[profile.pk] if profile is not None else empty_profile_score
+    return applications
+
+
+def _compute_scores(job, required, profile_ids):
+    """
+    Score the given profiles for ``job`` in three queries. Rows are selected
+    through the job's applications rather than by long lists of profile ids.
+    """
+    wanted = set(profile_ids)
+
+    matched = dict.fromkeys(wanted, 0)
+    if required:
+        rows = (
+            JobSeekerProfile.skills.through.objects
+            .filter(skill_id__in=required, jobseekerprofile__user__job_applications__job=job)
+            .values_list('jobseekerprofile_id', flat=True)
+        )
+        for profile_id in rows:
+            if profile_id in matched:
+                matched[profile_id] += 1
+
+    periods = {}
+    rows = (
+        WorkExperience.objects
+        .filter(profile__user__job_applications__job=job)
+        .values_list('profile_id', 'start_date', 'end_date')
+    )
+    for profile_id, start, end in rows:
+        if profile_id in wanted:
+            periods.setdefault(profile_id, []).append((start, end))
+
+    educated = set(
+        Education.objects
+        .filter(profile__user__job_applications__job=job)
+        .values_list('profile_id', flat=True)
+        .distinct()
+    )
+
+    today = datetime.date.today()
+    return {
+        profile_id: fit_score(
+            required,
+            matched[profile_id],
+            _years_of_experience(periods.get(profile_id, ()), today),
+            profile_id in educated,
+            job.experience_level,
+        )
+        for profile_id in wanted
+    }
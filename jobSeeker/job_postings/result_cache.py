@@ -0,0 +1,243 @@
+"""
+Per-process LRU cache of job search results.
+
+Searches are keyed by a canonical form of ``JobSearchForm.cleaned_data``, so
+"Python" and "python " with the skills picked in a different order share one
+entry. Each entry is the ordered list of matching job ids, stored as a compact
+``array`` and bounded in total by ``SEARCH_RESULT_CACHE_MAX_BYTES``. The
+search's facet counts are kept in the same entry once computed.
+
+Entries are tagged with the catalog generation they were computed under. The
+generation lives in the Django cache so that every process sees a bump, and is
+bumped (see ``job_postings.signals``) whenever a job is created, edited,
+soft-deleted or has its skills changed; entries from an older generation are
+treated as misses and dropped.
+
+Skill filters and skill facet counts are answered from this process's skill
+index, which can lag behind changes made in other processes until it is
+rebuilt. Entries are therefore also tagged with the index's own generation, so
+results computed from a lagging index go when the index catches up rather than
+lasting until the next catalog bump.
+"""
+import json
+import sys
+import threading
+import uuid
+from array import array
+from collections import OrderedDict
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Model
+
+from jobSeeker.db_router import use_primary
+from .skill_index import MATCH_AT_LEAST, skill_index
+
+GENERATION_KEY = 'job_postings:catalog_generation'
+
+# Bookkeeping per entry beyond its id array: key string, list, dict slot
+ENTRY_OVERHEAD = 200
+
+# Rough size of one facet value and its count in a dict
+FACET_VALUE_SIZE = 100
+
+
+def catalog_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Missing or evicted: start a fresh generation rather than reusing an
+        # old value, so entries cached before the eviction can never match
+        cache.add(GENERATION_KEY, uuid.uuid4().hex, None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_catalog_generation():
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def _generation():
+    """What an entry computed now depends on: the shared catalog and this process's skill index."""
+    # Built first: building it later, to answer the search, would bump the
+    # generation and retire the entry straight away
+    return catalog_generation(), skill_index.current_generation()
+
+
+def _canonical(value):
+    if isinstance(value, str):
+        return ' '.join(value.lower().split())
+    if isinstance(value, Decimal):
+        return str(value.normalize())
+    if isinstance(value, Model):
+        return value.pk
+    if hasattr(value, '__iter__'):
+        return sorted(_canonical(item) for item in value)
+    return value
+
+
+def canonical_key(cleaned_data):
+    """
+    A stable string for a validated search: strings lowercased with
+    whitespace collapsed, multi-valued fields sorted by id, empty fields
+    dropped, and skill options kept only when they affect the result.
+    """
+    params = {}
+    for name, value in cleaned_data.items():
+        value = _canonical(value)
+        if value not in (None, '', [], False):
+            params[name] = value
+
+    if 'skills' not in params:
+        params.pop('skill_match', None)
+        params.pop('skill_min_matches', None)
+    elif params.get('skill_match') != MATCH_AT_LEAST:
+        params.pop('skill_min_matches', None)
+    return json.dumps(params, sort_keys=True, separators=(',', ':'))
+
+
+class SearchResultCache:
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stale = 0
+
+    @property
+    def capacity(self):
+        if self.max_bytes is not None:
+            return self.max_bytes
+        return getattr(settings, 'SEARCH_RESULT_CACHE_MAX_BYTES', 8 * 1024 * 1024)
+
+    @staticmethod
+    def _size(key, ids):
+        return sys.getsizeof(key) + ids.buffer_info()[1] * ids.itemsize + ENTRY_OVERHEAD
+
+    def get(self, key, generation):
+        """The cached id array for ``key``, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != generation:
+                self._discard(key)
+                self.stale += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_facets(self, key, generation):
+        """The facet counts cached with ``key``'s ids, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation:
+                return None
+            return entry[3]
+
+    def set_facets(self, key, generation, facets):
+        """Attach facet counts to ``key``'s entry, if it is cached and current."""
+        size = sum(len(values) for values in facets.values()) * FACET_VALUE_SIZE
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation or entry[3] is not None:
+                return
+            entry[2] += size
+            entry[3] = facets
+            self._bytes += size
+            while self._bytes > self.capacity and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                if oldest == key:
+                    self._entries.move_to_end(key)
+                    continue
+                self._discard(oldest)
+                self.evictions += 1
+
+    def set(self, key, generation, ids):
+        ids = array('q', ids)
+        size = self._size(key, ids)
+        with self._lock:
+            self._discard(key)
+            if size > self.capacity:
+                # Larger than the whole cache; caching it would only flush
+                # every other entry
+                return ids
+            while self._bytes + size > self.capacity:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+            self._entries[key] = [generation, ids, size, None]
+            self._bytes += size
+        return ids
+
+    def get_or_compute(self, cleaned_data, compute):
+        """
+        Return the ordered id list for a search, calling ``compute()`` for
+        an iterable of ids on a miss.
+        """
+        key = canonical_key(cleaned_data)
+        generation = _generation()
+        ids = self.get(key, generation)
+        if ids is None:
+            with use_primary():
+                ids = self.set(key, generation, compute())
+        return ids
+
+    def get_or_compute_facets(self, cleaned_data, compute):
+        """
+        Return the facet counts for a search, calling ``compute()`` on a
+        miss. Call it after ``get_or_compute``: counts are only cached
+        alongside a cached id list.
+        """
+        key = canonical_key(cleaned_data)
+        generation = _generation()
+        facets = self.get_facets(key, generation)
+        if facets is None:
+            with use_primary():
+                facets = compute()
+            self.set_facets(key, generation, facets)
+        return facets
+
+    async def aget_or_compute(self, cleaned_data, compute):
+        """``get_or_compute`` for async views, where ``compute()`` returns an awaitable."""
+        key = canonical_key(cleaned_data)
+        # Reading the skill index's generation may build the index
+        generation = await sync_to_async(_generation)()
+        ids = self.get(key, generation)
+        if ids is None:
+            with use_primary():
+                ids = self.set(key, generation, await compute())
+        return ids
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'stale': self.stale,
+                'evictions': self.evictions,
+            }
+
+
+search_result_cache = SearchResultCache()
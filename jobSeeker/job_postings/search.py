@@ -0,0 +1,101 @@
+"""
+Full-text search over job postings.
+
+On SQLite the ``job_postings_jobsearchindex`` FTS5 table mirrors the title,
+company, description and requirements of every active job, and results are
+ranked with BM25. Other database backends fall back to ``icontains`` filters.
+"""
+import re
+
+from django.db import connections
+from django.db.models import F, Q
+
+from .models import JobSearchIndex
+from .pagination import JOB_ORDERING
+
+SEARCH_FIELDS = ('title', 'company', 'description', 'requirements')
+INDEX_TABLE = JobSearchIndex._meta.db_table
+
+# Best match first (lowest BM25 rank), newest first among equal ranks
+RELEVANCE_ORDERING = ('search_rank', '-created_at', '-id')
+
+_TERM_RE = re.compile(r'\w+')
+
+
+def fts_enabled(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def search_terms(text):
+    """Split free text into lowercase search terms, dropping punctuation."""
+    return _TERM_RE.findall((text or '').lower())
+
+
+def build_match_query(terms):
+    """
+    Build an FTS5 query that requires every term, each as a prefix match.
+    Terms are quoted so user input can never inject FTS5 operators.
+    """
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def filter_by_keywords(queryset, text):
+    terms = search_terms(text)
+    if not terms:
+        return queryset
+
+    if fts_enabled(queryset.db):
+        return queryset.filter(search_index__document__match=build_match_query(terms))
+
+    for term in terms:
+        term_filter = Q()
+        for field in SEARCH_FIELDS:
+            term_filter |= Q(**{f'{field}__icontains': term})
+        queryset = queryset.filter(term_filter)
+    return queryset
+
+
+def rank_by_relevance(queryset):
+    """
+    Annotate a keyword-filtered queryset with its ``search_rank`` and return
+    it together with the ordering to paginate it by.
+    """
+    if fts_enabled(queryset.db):
+        return queryset.annotate(search_rank=F('search_index__rank')), RELEVANCE_ORDERING
+    return queryset, JOB_ORDERING
+
+
+def index_job(job, using='default'):
+    """Insert, refresh or drop a job's index row to match its current state."""
+    if not fts_enabled(using):
+        return
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {INDEX_TABLE} WHERE rowid = %s', [job.pk])
+        if job.is_active:
+            cursor.execute(
+                f'INSERT INTO {INDEX_TABLE} (rowid, {", ".join(SEARCH_FIELDS)}) VALUES (%s, %s, %s, %s, %s)',
+                [job.pk] + [getattr(job, field) for field in SEARCH_FIELDS]
+            )
+
+
+def unindex_job(job_id, using='default'):
+    if not fts_enabled(using):
+        return
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {INDEX_TABLE} WHERE rowid = %s', [job_id])
+
+
+def rebuild_index(using='default'):
+    """Repopulate the whole index from the job table, e.g. after bulk loads."""
+    if not fts_enabled(using):
+        return
+
+    columns = ', '.join(SEARCH_FIELDS)
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {INDEX_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {INDEX_TABLE} (rowid, {columns}) '
+            f'SELECT id, {columns} FROM job_postings_job WHERE is_active'
+        )
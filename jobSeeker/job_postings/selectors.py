@@ -0,0 +1,64 @@
+"""
+Queryset builders shared by the job views.
+
+Each builder loads everything its template touches up front (related rows,
+prefetched skills, per-viewer flags), so a page runs a fixed number of
+queries however many jobs it shows.
+"""
+from django.contrib.auth.models import User
+from django.db.models import BooleanField, ExpressionWrapper, Q, Value
+
+from user_accounts.models import UserProfile
+from user_accounts.roles import user_role
+from .models import Job
+
+
+def viewer_context(user):
+    """Per-request flags for templates, so they never read the profile per job."""
+    role = user_role(user)
+    return {
+        'is_job_seeker': role == 'job_seeker',
+        'is_recruiter': role == 'recruiter',
+    }
+
+
+async def aviewer(request):
+    """
+    The request's user for async views, loaded through the async auth API
+    with its ``userprofile`` cached. It replaces the lazy ``request.user``,
+    so templates and context processors never query from the event loop.
+    ``ProfileBackend`` joins the profile in already; users from sessions of
+    other backends get it loaded here.
+    """
+    user = await request.auser()
+    if user.is_authenticated and not User.userprofile.related.is_cached(user):
+        profile = await UserProfile.objects.filter(user=user).afirst()
+        User.userprofile.related.set_cached_value(user, profile)
+    request.user = user
+    return user
+
+
+def _annotate_is_owner(queryset, user):
+    if user.is_authenticated:
+        is_owner = ExpressionWrapper(Q(posted_by_id=user.pk), output_field=BooleanField())
+    else:
+        is_owner = Value(False, output_field=BooleanField())
+    return queryset.annotate(is_owner=is_owner)
+
+
+def job_cards(user, queryset=None):
+    """Active jobs as shown on listing cards: skills prefetched, ``is_owner`` annotated."""
+    if queryset is None:
+        queryset = Job.objects.filter(is_active=True)
+    queryset = queryset.prefetch_related('skills_required')
+    return _annotate_is_owner(queryset, user)
+
+
+def job_detail(user):
+    """Active jobs with poster, skills and ``is_owner`` loaded."""
+    queryset = (
+        Job.objects.filter(is_active=True)
+        .select_related('posted_by')
+        .prefetch_related('skills_required')
+    )
+    return _annotate_is_owner(queryset, user)
@@ -0,0 +1,131 @@
+from django.db import transaction
+from django.utils import timezone
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from user_profiles.models import Skill
+from user_profiles.snapshot import invalidate_snapshots
+from . import counters
+from . import result_cache
+from . import search
+from .models import Job, JobApplication
+from .skill_index import skill_index
+
+
+@receiver(post_save, sender=Job)
+def update_search_index(sender, instance, using, **kwargs):
+    # Inactive (soft-deleted) jobs are dropped from the index
+    search.index_job(instance, using=using)
+
+
+@receiver(post_delete, sender=Job)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    search.unindex_job(instance.pk, using=using)
+
+
+@receiver(post_save, sender=Job)
+def update_skill_index_active(sender, instance, using, **kwargs):
+    job_id, is_active = instance.pk, instance.is_active
+    transaction.on_commit(lambda: skill_index.set_active(job_id, is_active), using=using)
+
+
+@receiver(post_delete, sender=Job)
+def remove_from_skill_index(sender, instance, using, **kwargs):
+    job_id = instance.pk
+    transaction.on_commit(lambda: skill_index.set_active(job_id, False), using=using)
+
+
+@receiver(post_save, sender=Skill)
+def touch_jobs_on_skill_rename(sender, instance, created, using, **kwargs):
+    # Cached job cards show skill names and are keyed on Job.updated_at
+    if not created:
+        instance.jobs_requiring_skill.using(using).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Skill)
+def remove_skill_from_skill_index(sender, instance, using, **kwargs):
+    skill_id = instance.pk
+    transaction.on_commit(lambda: skill_index.clear_skill(skill_id), using=using)
+
+
+@receiver(m2m_changed, sender=Job.skills_required.through)
+def update_skill_index(sender, instance, action, reverse, pk_set, using, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    pk_set = set(pk_set or ())
+    if not reverse:
+        # instance is a Job, pk_set holds Skill ids
+        job_id = instance.pk
+        if action == 'post_add':
+            patch = lambda: skill_index.add([job_id], pk_set)
+        elif action == 'post_remove':
+            patch = lambda: skill_index.remove([job_id], pk_set)
+        else:
+            patch = lambda: skill_index.clear_job(job_id)
+    else:
+        # instance is a Skill, pk_set holds Job ids
+        skill_id = instance.pk
+        if action == 'post_add':
+            patch = lambda: skill_index.add(pk_set, [skill_id])
+        elif action == 'post_remove':
+            patch = lambda: skill_index.remove(pk_set, [skill_id])
+        else:
+            patch = lambda: skill_index.clear_skill(skill_id)
+
+    transaction.on_commit(patch, using=using)
+
+
+@receiver(m2m_changed, sender=Job.skills_required.through)
+def touch_job_on_skills_change(sender, instance, action, reverse, pk_set, using, **kwargs):
+    # Skill changes don't save the Job, but anything keyed on updated_at
+    # (cached fit scores, card fragments) must see them
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        Job.objects.using(using).filter(pk=instance.pk).update(updated_at=timezone.now())
+    elif pk_set:
+        Job.objects.using(using).filter(pk__in=pk_set).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+@receiver(post_delete, sender=Skill)
+def invalidate_search_results(sender, using, **kwargs):
+    # Creates, edits and soft deletes all go through Job.save()
+    transaction.on_commit(result_cache.bump_catalog_generation, using=using)
+
+
+@receiver(m2m_changed, sender=Job.skills_required.through)
+def invalidate_search_results_on_skills_change(sender, action, using, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(result_cache.bump_catalog_generation, using=using)
+
+
+@receiver(post_save, sender=JobApplication)
+def increment_application_counters(sender, instance, created, raw, using, **kwargs):
+    # Fixtures carry the job's counters with them
+    if created and not raw:
+        counters.record_application(instance.job_id, instance.status)
+
+
+@receiver(post_delete, sender=JobApplication)
+def decrement_application_counters(sender, instance, using, **kwargs):
+    counters.record_removal(instance.job_id, instance.status)
+
+
+@receiver(post_save, sender=JobApplication)
+@receiver(post_delete, sender=JobApplication)
+def invalidate_applicant_snapshot(sender, instance, using, **kwargs):
+    invalidate_snapshots([instance.applicant_id], using=using)
+
+
+@receiver(post_save, sender=Job)
+def invalidate_applicant_snapshots_on_job_edit(sender, instance, created, using, **kwargs):
+    # Applicants' profile pages show the job's title, company and location
+    if not created:
+        invalidate_snapshots(
+            JobApplication.objects.using(using).filter(job=instance).values_list('applicant_id', flat=True),
+            using=using,
+        )
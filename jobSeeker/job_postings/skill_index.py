@@ -0,0 +1,300 @@
+"""
+Per-process inverted index from skills to the jobs that require them.
+
+Each skill maps to a compressed bitmap of job ids, and a separate bitmap holds
+the ids of active jobs. Skill filters are answered with bitwise AND/OR over
+these bitmaps instead of joining the ``Job``-``Skill`` through table.
+
+The index is built lazily on first use, patched from signals (see
+``job_postings.signals``) as jobs and their skills change, and rebuilt after
+``SKILL_INDEX_TTL`` seconds so that processes which did not see a change
+catch up.
+"""
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+from jobSeeker.db_router import use_primary
+
+MATCH_ANY = 'any'
+MATCH_ALL = 'all'
+MATCH_AT_LEAST = 'at_least'
+
+MATCH_CHOICES = [
+    (MATCH_ANY, 'Any of the selected skills'),
+    (MATCH_ALL, 'All of the selected skills'),
+    (MATCH_AT_LEAST, 'At least N of the selected skills'),
+]
+
+# How many generations of patches the index remembers for derived
+# structures catching up (see ``changes_since``)
+CHANGE_LOG_SIZE = 1000
+
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+
+class Bitmap:
+    """
+    Set of non-negative integers stored as a dict of fixed-size chunks, each
+    chunk an int used as a bitset. Empty ranges of the id space take no
+    memory, and set operations run chunk by chunk in C.
+    """
+    __slots__ = ('chunks',)
+
+    def __init__(self, values=(), chunks=None):
+        self.chunks = chunks if chunks is not None else {}
+        for value in values:
+            self.add(value)
+
+    def add(self, value):
+        key = value >> CHUNK_BITS
+        self.chunks[key] = self.chunks.get(key, 0) | (1 << (value & CHUNK_MASK))
+
+    def discard(self, value):
+        key = value >> CHUNK_BITS
+        bits = self.chunks.get(key, 0) & ~(1 << (value & CHUNK_MASK))
+        if bits:
+            self.chunks[key] = bits
+        else:
+            self.chunks.pop(key, None)
+
+    def __contains__(self, value):
+        return bool(self.chunks.get(value >> CHUNK_BITS, 0) >> (value & CHUNK_MASK) & 1)
+
+    def __and__(self, other):
+        if len(other.chunks) < len(self.chunks):
+            self, other = other, self
+        chunks = {}
+        for key, bits in self.chunks.items():
+            bits &= other.chunks.get(key, 0)
+            if bits:
+                chunks[key] = bits
+        return Bitmap(chunks=chunks)
+
+    def __or__(self, other):
+        chunks = dict(self.chunks)
+        for key, bits in other.chunks.items():
+            chunks[key] = chunks.get(key, 0) | bits
+        return Bitmap(chunks=chunks)
+
+    def __len__(self):
+        return sum(bits.bit_count() for bits in self.chunks.values())
+
+    def __bool__(self):
+        return bool(self.chunks)
+
+    def __iter__(self):
+        for key in sorted(self.chunks):
+            base = key << CHUNK_BITS
+            # Scan the binary digits once rather than peeling bits off a
+            # potentially large int one at a time
+            digits = bin(self.chunks[key])[:1:-1]
+            position = digits.find('1')
+            while position != -1:
+                yield base + position
+                position = digits.find('1', position + 1)
+
+    @classmethod
+    def at_least(cls, bitmaps, n):
+        """Values present in at least ``n`` of ``bitmaps``."""
+        if n <= 1:
+            result = cls()
+            for bitmap in bitmaps:
+                result = result | bitmap
+            return result
+
+        chunks = {}
+        keys = set().union(*(bitmap.chunks for bitmap in bitmaps))
+        for key in keys:
+            # levels[j] holds the bits seen in at least j + 1 bitmaps so far
+            levels = [0] * n
+            for bitmap in bitmaps:
+                bits = bitmap.chunks.get(key, 0)
+                if not bits:
+                    continue
+                for j in range(n - 1, 0, -1):
+                    levels[j] |= levels[j - 1] & bits
+                levels[0] |= bits
+            if levels[-1]:
+                chunks[key] = levels[-1]
+        return cls(chunks=chunks)
+
+
+class SkillIndex:
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._skills = None
+        self._active = None
+        self._built_at = 0.0
+        # Bumped on every rebuild and patch so derived structures (see
+        # job_postings.matching) know when to refresh
+        self.generation = 0
+        # (generation, ids of the jobs it patched), or None for ids when the
+        # whole index changed
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)
+
+    def _ensure_built(self):
+        ttl = self.ttl if self.ttl is not None else getattr(settings, 'SKILL_INDEX_TTL', 60)
+        if self._skills is None or time.monotonic() - self._built_at > ttl:
+            self.rebuild()
+
+    def rebuild(self):
+        from .models import Job
+
+        skills = {}
+        through = Job.skills_required.through
+        # Signals patch the index as writes commit; a lagging replica would undo that
+        with use_primary():
+            for skill_id, job_id in through.objects.values_list('skill_id', 'job_id').iterator(chunk_size=10000):
+                skills.setdefault(skill_id, Bitmap()).add(job_id)
+            active = Bitmap(Job.objects.filter(is_active=True).values_list('id', flat=True).iterator(chunk_size=10000))
+
+        with self._lock:
+            self._skills = skills
+            self._active = active
+            self._built_at = time.monotonic()
+            self._changed(None)
+
+    def invalidate(self):
+        with self._lock:
+            self._skills = None
+            self._active = None
+            self._changed(None)
+
+    def _changed(self, job_ids):
+        """Bump the generation, logging the jobs patched (None: any of them). Call under the lock."""
+        self.generation += 1
+        self._changes.append((self.generation, None if job_ids is None else frozenset(job_ids)))
+
+    def current_generation(self):
+        """The generation once the index is built and within ``SKILL_INDEX_TTL``."""
+        with self._lock:
+            self._ensure_built()
+            return self.generation
+
+    def changes_since(self, generation):
+        """
+        ``(job_ids, generation)``: the ids of the jobs patched after
+        ``generation``, and the generation that brings them up to. The ids
+        are None when the index was rebuilt or invalidated since, or the
+        change log no longer reaches back that far.
+        """
+        with self._lock:
+            changes = [ids for changed_at, ids in self._changes if changed_at > generation]
+            if len(changes) != self.generation - generation or None in changes:
+                return None, self.generation
+            return set().union(*changes), self.generation
+
+    def job_skills(self, job_ids):
+        """``{job_id: skill ids}`` for ``job_ids``, with no skills for inactive jobs."""
+        with self._lock:
+            self._ensure_built()
+            return {
+                job_id: {
+                    skill_id for skill_id, bitmap in self._skills.items() if job_id in bitmap
+                } if job_id in self._active else set()
+                for job_id in job_ids
+            }
+
+    def match(self, skill_ids, mode=MATCH_ANY, min_matches=1):
+        """
+        Return the ids of active jobs requiring the given skills, newest id
+        first: any of them, all of them, or at least ``min_matches`` of them.
+        """
+        skill_ids = set(skill_ids)
+        if not skill_ids:
+            return []
+
+        if mode == MATCH_ALL:
+            n = len(skill_ids)
+        elif mode == MATCH_AT_LEAST:
+            n = min(max(min_matches or 1, 1), len(skill_ids))
+        else:
+            n = 1
+
+        # Patches mutate bitmaps in place, so combine them under the lock
+        with self._lock:
+            self._ensure_built()
+            bitmaps = [self._skills.get(skill_id, Bitmap()) for skill_id in skill_ids]
+            if n == len(bitmaps):
+                result = self._active
+                for bitmap in sorted(bitmaps, key=lambda bitmap: len(bitmap.chunks)):
+                    result = result & bitmap
+            else:
+                result = Bitmap.at_least(bitmaps, n) & self._active
+        return sorted(result, reverse=True)
+
+    def counts(self, job_ids=None):
+        """
+        ``{skill_id: count}`` of the jobs in ``job_ids``, or of all active
+        jobs, requiring each skill, leaving out zeros.
+        """
+        jobs = None if job_ids is None else Bitmap(job_ids)
+        with self._lock:
+            self._ensure_built()
+            if jobs is None:
+                jobs = self._active
+            counts = {skill_id: len(bitmap & jobs) for skill_id, bitmap in self._skills.items()}
+        return {skill_id: count for skill_id, count in counts.items() if count}
+
+    # Incremental updates, each logged for ``changes_since``. Until the index
+    # is first built they only bump the generation, since the build will read
+    # the current state anyway.
+
+    def add(self, job_ids, skill_ids):
+        """Record that every job in ``job_ids`` requires every skill in ``skill_ids``."""
+        with self._lock:
+            if self._skills is None:
+                self._changed(None)
+                return
+            self._changed(job_ids)
+            for skill_id in skill_ids:
+                bitmap = self._skills.setdefault(skill_id, Bitmap())
+                for job_id in job_ids:
+                    bitmap.add(job_id)
+
+    def remove(self, job_ids, skill_ids):
+        with self._lock:
+            if self._skills is None:
+                self._changed(None)
+                return
+            self._changed(job_ids)
+            for skill_id in skill_ids:
+                bitmap = self._skills.get(skill_id)
+                if bitmap is not None:
+                    for job_id in job_ids:
+                        bitmap.discard(job_id)
+
+    def clear_job(self, job_id):
+        with self._lock:
+            if self._skills is None:
+                self._changed(None)
+                return
+            self._changed([job_id])
+            for bitmap in self._skills.values():
+                bitmap.discard(job_id)
+
+    def clear_skill(self, skill_id):
+        with self._lock:
+            if self._skills is None:
+                self._changed(None)
+                return
+            self._changed(self._skills.pop(skill_id, ()))
+
+    def set_active(self, job_id, is_active):
+        with self._lock:
+            if self._active is None:
+                self._changed(None)
+                return
+            self._changed([job_id])
+            if is_active:
+                self._active.add(job_id)
+            else:
+                self._active.discard(job_id)
+
+
+skill_index = SkillIndex()
@@ -1,3 +1,993 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import re
+import unittest
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from jobSeeker import instrumentation
+from user_accounts.models import UserProfile
+from user_profiles.models import Education, JobSeekerProfile, Skill, WorkExperience
+from user_profiles.snapshot import _applications
+from .models import Job, JobApplication
+from .forms import JobSearchForm
+from .management.commands import benchmark_views
+from .pagination import IdListPaginator, JOB_ORDERING
+from .result_cache import canonical_key, search_result_cache
+from . import counters
+from . import exports
+from . import facets
+from . import matching
+from . import ranking
+from . import selectors
+from .skill_index import MATCH_ALL, MATCH_ANY, MATCH_AT_LEAST, Bitmap, skill_index
+from .views import _filter_jobs, _search_jobs
+
+def make_user(username, user_type):
+    """A user with the given role, and a job seeker profile for job seekers."""
+    user = User.objects.create_user(username, password='password')
+    UserProfile.objects.filter(user=user).update(user_type=user_type)
+    if user_type == 'job_seeker':
+        JobSeekerProfile.objects.create(user=user)
+    return User.objects.get(pk=user.pk)
+
+
+def make_jobs(recruiter, count, **fields):
+    """Bulk-create ``count`` active jobs; ``fields`` override the defaults."""
+    defaults = {
+        'company': 'Company', 'location': 'Remote', 'description': 'Description',
+        'requirements': 'Requirements', 'posted_by': recruiter,
+    }
+    return Job.objects.bulk_create([
+        Job(**{'title': f'Job {i}', **defaults, **fields}) for i in range(count)
+    ])
+
+
+# A plan line reading the whole table rather than an index: "SCAN <table>"
+# without "USING [COVERING] INDEX"
+FULL_SCAN = re.compile(r'\bSCAN (\w+)(?! USING)(?:\s|$)')
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite-specific')
+class QueryPlanTests(TestCase):
+    """The hot view queries must be answered from an index, never a full table scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter')
+        cls.seeker = User.objects.create_user('seeker')
+        jobs = Job.objects.bulk_create([
+            Job(
+                title=f'Job {i}', company='Company', location='Remote', description='Description',
+                requirements='Requirements', posted_by=cls.recruiter, is_active=i % 5 != 0,
+                job_type='contract' if i % 3 else 'full_time',
+            )
+            for i in range(200)
+        ])
+        cls.job = jobs[1]
+        JobApplication.objects.bulk_create([
+            JobApplication(job=job, applicant=cls.seeker, cover_note='Note', status='review' if i % 2 else 'applied')
+            for i, job in enumerate(jobs[:50])
+        ])
+
+    def assertNoFullScan(self, queryset):
+        plan = queryset.explain()
+        scans = [line for line in plan.splitlines() if FULL_SCAN.search(line)]
+        self.assertEqual(scans, [], f'Full table scan in:\n{plan}\nfor:\n{queryset.query}')
+
+    def test_index_listing(self):
+        self.assertNoFullScan(selectors.job_cards(AnonymousUser()).order_by(*JOB_ORDERING)[:21])
+
+    def test_search_choice_filters(self):
+        for name, value in (('job_type', 'contract'), ('experience_level', 'senior'), ('work_location', 'remote')):
+            with self.subTest(name):
+                self.assertNoFullScan(_search_jobs({name: value}))
+
+    def test_manage_applications_by_status(self):
+        self.assertNoFullScan(self.job.applications.filter(status='review').order_by('-applied_at'))
+
+    def test_profile_applications(self):
+        self.assertNoFullScan(_applications(self.seeker))
+
+    def test_feed_updated_since(self):
+        self.assertNoFullScan(
+            Job.objects.filter(updated_at__gte=timezone.now()).order_by('updated_at', 'id')[:100]
+        )
+
+
+class PaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter')
+        make_jobs(cls.recruiter, 45)
+        cls.ids = list(Job.objects.filter(is_active=True).order_by(*JOB_ORDERING).values_list('id', flat=True))
+
+    def setUp(self):
+        cache.clear()
+
+    def get_page(self, cursor=None):
+        params = {'page_size': 20}
+        if cursor:
+            params['cursor'] = cursor
+        return self.client.get(reverse('job_postings.index'), params).context['page']
+
+    def test_index_pages_cover_every_job_once(self):
+        seen = []
+        page = self.get_page()
+        while True:
+            seen += [job.id for job in page]
+            if not page.has_next:
+                break
+            page = self.get_page(page.next_cursor)
+        self.assertEqual(seen, self.ids)
+
+        previous = self.get_page(page.previous_cursor)
+        self.assertEqual([job.id for job in previous], self.ids[20:40])
+
+    def test_deep_page_costs_the_same_queries_as_the_first(self):
+        second = self.get_page().next_cursor
+        third = self.get_page(second).next_cursor
+        with CaptureQueriesContext(connection) as first_page:
+            self.get_page()
+        with self.assertNumQueries(len(first_page)):
+            page = self.get_page(third)
+        self.assertEqual([job.id for job in page], self.ids[40:])
+
+    def test_id_list_cursor_finds_its_page_without_searching(self):
+        class UnsearchableList(list):
+            def index(self, *args):
+                raise AssertionError('cursor position searched for')
+
+        paginator = IdListPaginator(UnsearchableList(self.ids), lambda ids: Job.objects.filter(id__in=ids), page_size=20)
+        page = paginator.page(paginator.page().next_cursor)
+        self.assertEqual([job.id for job in page], self.ids[20:40])
+        page = paginator.page(page.previous_cursor)
+        self.assertEqual([job.id for job in page], self.ids[:20])
+
+    def test_id_list_cursor_follows_its_id_when_the_list_changes(self):
+        load = lambda ids: Job.objects.filter(id__in=ids)
+        cursor = IdListPaginator(self.ids, load, page_size=20).page().next_cursor
+        # Two new results ahead of the cursor shift every offset
+        changed = [self.ids[-1], self.ids[-2]] + self.ids[:-2]
+        page = IdListPaginator(changed, load, page_size=20).page(cursor)
+        self.assertEqual([job.id for job in page], changed[22:42])
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Ranking comes from SQLite FTS5')
+class KeywordSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        recruiter = User.objects.create_user('recruiter')
+        fields = {
+            'company': 'Company', 'location': 'Remote', 'description': 'Description',
+            'requirements': 'Requirements', 'posted_by': recruiter,
+        }
+        # Created one by one so post_save indexes them
+        cls.in_description = Job.objects.create(**{**fields, 'title': 'Engineer', 'description': 'Mostly Python work'})
+        cls.in_title = Job.objects.create(**{**fields, 'title': 'Python Developer'})
+        cls.unrelated = Job.objects.create(**{**fields, 'title': 'Accountant'})
+
+    def search(self, text):
+        return list(_search_jobs({'title': text}))
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.search('python'), [self.in_title.id, self.in_description.id])
+
+    def test_terms_match_as_prefixes_and_all_are_required(self):
+        self.assertEqual(self.search('pyth'), [self.in_title.id, self.in_description.id])
+        self.assertEqual(self.search('python developer'), [self.in_title.id])
+
+    def test_query_syntax_in_input_is_searched_as_text(self):
+        self.assertEqual(self.search('"python"*'), [self.in_title.id, self.in_description.id])
+        # OR is one more required term, not a union
+        self.assertEqual(self.search('python OR accountant'), [])
+        self.assertEqual(self.search('NOT ('), [])
+
+    def test_index_follows_edits_and_soft_deletes(self):
+        self.in_title.title = 'Rust Developer'
+        self.in_title.save()
+        self.assertEqual(self.search('python'), [self.in_description.id])
+        self.assertEqual(self.search('rust'), [self.in_title.id])
+
+        self.in_description.is_active = False
+        self.in_description.save()
+        self.assertEqual(self.search('python'), [])
+
+
+class SkillIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = User.objects.create_user('recruiter')
+        cls.python, cls.django, cls.sql = Skill.objects.bulk_create(
+            [Skill(name='Python'), Skill(name='Django'), Skill(name='SQL')]
+        )
+        cls.jobs = make_jobs(cls.recruiter, 4)
+        requirements = [[cls.python], [cls.python, cls.django], [cls.python, cls.django, cls.sql], [cls.sql]]
+        for job, skills in zip(cls.jobs, requirements):
+            job.skills_required.set(skills)
+
+    def setUp(self):
+        skill_index.invalidate()
+
+    def match(self, skills, mode=MATCH_ANY, min_matches=1):
+        return skill_index.match([skill.pk for skill in skills], mode=mode, min_matches=min_matches)
+
+    def ids(self, *positions):
+        return sorted((self.jobs[position].id for position in positions), reverse=True)
+
+    def test_match_modes(self):
+        skills = [self.python, self.django, self.sql]
+        self.assertEqual(self.match(skills), self.ids(0, 1, 2, 3))
+        self.assertEqual(self.match(skills, MATCH_ALL), self.ids(2))
+        self.assertEqual(self.match(skills, MATCH_AT_LEAST, 2), self.ids(1, 2))
+
+    def test_bitmap_operations_span_chunks(self):
+        low, high = Bitmap([1, 5, 70000]), Bitmap([5, 70000, 200000])
+        self.assertEqual(list(low & high), [5, 70000])
+        self.assertEqual(list(low | high), [1, 5, 70000, 200000])
+        self.assertEqual(list(Bitmap.at_least([low, high, Bitmap([1])], 2)), [1, 5, 70000])
+        self.assertEqual(len(low), 3)
+
+    def test_skill_changes_patch_the_built_index(self):
+        self.match([self.sql])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.jobs[0].skills_required.add(self.sql)
+            self.jobs[3].skills_required.remove(self.sql)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.match([self.sql]), self.ids(0, 2))
+
+    def test_inactive_jobs_never_match(self):
+        self.match([self.python])
+        job = self.jobs[0]
+        job.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        self.assertEqual(self.match([self.python]), self.ids(1, 2))
+
+
+class ConstantQueryTests(TestCase):
+    """Job pages run the same queries however many jobs, skills and applications they show."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = make_user('recruiter', 'recruiter')
+        cls.seeker = make_user('seeker', 'job_seeker')
+        cls.skills = Skill.objects.bulk_create([Skill(name=f'Skill {i}') for i in range(6)])
+
+    def setUp(self):
+        cache.clear()
+        skill_index.invalidate()
+        self.client.force_login(self.recruiter)
+
+    def add_jobs(self, count):
+        jobs = make_jobs(self.recruiter, count, title='Engineer')
+        for job in jobs:
+            job.skills_required.set(self.skills[:3])
+        return jobs
+
+    def assertConstantQueries(self, url, grow, params=None):
+        self.client.get(url, params)
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(url, params)
+        # Read now: every request start empties the connection's query log
+        expected = len(before)
+        grow()
+        cache.clear()
+        self.client.get(url, params)
+        with self.assertNumQueries(expected):
+            self.client.get(url, params)
+
+    def test_index(self):
+        self.add_jobs(2)
+        self.assertConstantQueries(reverse('job_postings.index'), lambda: self.add_jobs(10))
+
+    def test_search(self):
+        self.add_jobs(2)
+        self.assertConstantQueries(
+            reverse('job_postings.search'), lambda: self.add_jobs(10), {'job_type': 'full_time'}
+        )
+
+    def test_detail(self):
+        job = self.add_jobs(1)[0]
+        seekers = [make_user(f'seeker{i}', 'job_seeker') for i in range(5)]
+
+        def grow():
+            job.skills_required.set(self.skills)
+            JobApplication.objects.bulk_create([
+                JobApplication(job=job, applicant=seeker, cover_note='Note') for seeker in seekers
+            ])
+
+        self.assertConstantQueries(reverse('job_postings.show', kwargs={'id': job.id}), grow)
+
+
+class MatchingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = make_user('recruiter', 'recruiter')
+        cls.python, cls.django, cls.rare = Skill.objects.bulk_create(
+            [Skill(name='Python'), Skill(name='Django'), Skill(name='Rare')]
+        )
+        cls.jobs = make_jobs(cls.recruiter, 5)
+        requirements = [[cls.python, cls.django], [cls.rare, cls.django], [cls.python], [cls.python], [cls.python]]
+        for job, skills in zip(cls.jobs, requirements):
+            job.skills_required.set(skills)
+
+    def setUp(self):
+        cache.clear()
+        skill_index.invalidate()
+
+    def recommend(self, engine, skills):
+        return [job_id for job_id, _ in engine.recommend([skill.pk for skill in skills])]
+
+    def test_rare_shared_skills_count_for_more(self):
+        ranked = self.recommend(matching.MatchingEngine(), [self.python, self.rare])
+        single_skill_jobs = sorted((job.id for job in self.jobs[2:]), reverse=True)
+        self.assertEqual(ranked, single_skill_jobs + [self.jobs[1].id, self.jobs[0].id])
+
+    def test_index_patches_are_applied_without_rebuilding(self):
+        for numpy in (matching.np, None):
+            with self.subTest(numpy=numpy is not None), mock.patch.object(matching, 'np', numpy):
+                skill_index.invalidate()
+                skill_index.match([self.python.pk])
+                engine = matching.MatchingEngine()
+                self.recommend(engine, [self.rare])
+
+                deactivated = self.jobs[2]
+                deactivated.is_active = False
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.jobs[0].skills_required.add(self.rare)
+                    deactivated.save()
+                    new_job = Job.objects.create(
+                        title='New', company='Company', location='Remote', description='Description',
+                        requirements='Requirements', posted_by=self.recruiter,
+                    )
+                    new_job.skills_required.set([self.rare])
+
+                with mock.patch.object(matching, 'JobSkillMatrix', side_effect=AssertionError('rebuilt')):
+                    with self.assertNumQueries(0):
+                        patched = self.recommend(engine, [self.python, self.rare])
+                self.assertNotIn(deactivated.id, patched)
+                self.assertCountEqual(patched, self.recommend(matching.MatchingEngine(), [self.python, self.rare]))
+                self.assertEqual(patched[0], self.jobs[0].id)
+
+                deactivated.is_active = True
+                with self.captureOnCommitCallbacks(execute=True):
+                    deactivated.save()
+                    self.jobs[0].skills_required.remove(self.rare)
+                    new_job.delete()
+
+    def test_recommendations_leave_out_applied_jobs(self):
+        seeker = make_user('seeker', 'job_seeker')
+        seeker.jobseekerprofile.skills.set([self.python])
+        JobApplication.objects.create(job=self.jobs[2], applicant=seeker, cover_note='Note')
+        self.client.force_login(seeker)
+        response = self.client.get(reverse('job_postings.recommendations'))
+        self.assertCountEqual(
+            [job.id for job in response.context['jobs']],
+            [self.jobs[0].id, self.jobs[3].id, self.jobs[4].id],
+        )
+
+
+class ApplicantRankingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = make_user('recruiter', 'recruiter')
+        cls.python, cls.django = Skill.objects.bulk_create([Skill(name='Python'), Skill(name='Django')])
+        cls.job = make_jobs(cls.recruiter, 1, experience_level='senior')[0]
+        cls.job.skills_required.set([cls.python, cls.django])
+
+        today = datetime.date.today()
+        cls.strong, cls.partial, cls.weak = [make_user(name, 'job_seeker') for name in ('strong', 'partial', 'weak')]
+        cls.strong.jobseekerprofile.skills.set([cls.python, cls.django])
+        WorkExperience.objects.create(
+            profile=cls.strong.jobseekerprofile, company='C', title='Dev',
+            start_date=today - datetime.timedelta(days=6 * 366),
+        )
+        Education.objects.create(
+            profile=cls.strong.jobseekerprofile, school='S', degree='BSc', field_of_study='CS',
+            start_date=today - datetime.timedelta(days=10 * 366),
+        )
+        cls.partial.jobseekerprofile.skills.set([cls.python])
+        WorkExperience.objects.create(
+            profile=cls.partial.jobseekerprofile, company='C', title='Dev',
+            start_date=today - datetime.timedelta(days=2 * 366), end_date=today,
+        )
+        for seeker in (cls.weak, cls.partial, cls.strong):
+            JobApplication.objects.create(job=cls.job, applicant=seeker, cover_note='Note')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.recruiter)
+
+    def applications(self, **params):
+        url = reverse('job_postings.manage_applications', kwargs={'id': self.job.id})
+        return [
+            (application.applicant, application.fit_score)
+            for application in self.client.get(url, params).context['applications']
+        ]
+
+    def test_overlapping_experience_counts_once(self):
+        today = datetime.date(2024, 1, 1)
+        periods = [
+            (datetime.date(2018, 1, 1), datetime.date(2021, 1, 1)),
+            (datetime.date(2020, 1, 1), datetime.date(2022, 1, 1)),
+            (datetime.date(2023, 1, 1), None),
+        ]
+        self.assertAlmostEqual(ranking._years_of_experience(periods, today), 5, places=1)
+
+    def test_sort_and_filter_by_fit(self):
+        self.assertEqual(
+            self.applications(sort='fit'),
+            [(self.strong, 100), (self.partial, 42), (self.weak, 0)],
+        )
+        self.assertEqual(self.applications(min_fit=50), [(self.strong, 100)])
+        # Most recent first by default
+        self.assertEqual([applicant for applicant, _ in self.applications()], [self.strong, self.partial, self.weak])
+
+    def test_filter_links_encode_the_parameters(self):
+        url = reverse('job_postings.manage_applications', kwargs={'id': self.job.id})
+        response = self.client.get(url, {'status': 'a&b#c', 'sort': 'fit&x=1'})
+        self.assertContains(response, '?sort=fit%26x%3D1&amp;min_fit=0"', count=2)
+        self.assertContains(response, '?status=review&amp;sort=fit%26x%3D1&amp;min_fit=0"')
+        self.assertContains(response, '?status=a%26b%23c&amp;format=xlsx"')
+
+    def test_scores_are_cached_until_the_profile_changes(self):
+        self.applications()
+        with mock.patch.object(ranking, '_compute_scores', wraps=ranking._compute_scores) as compute:
+            self.applications()
+            compute.assert_not_called()
+            self.weak.jobseekerprofile.skills.set([self.django])
+            self.assertIn((self.weak, 30), self.applications())
+            self.assertEqual(compute.call_args.args[2], [self.weak.jobseekerprofile.pk])
+
+
+class BulkStatusUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = make_user('recruiter', 'recruiter')
+        cls.other_recruiter = make_user('other', 'recruiter')
+        cls.job = make_jobs(cls.recruiter, 1)[0]
+        cls.other_job = make_jobs(cls.other_recruiter, 1)[0]
+        cls.seekers = [make_user(f'seeker{i}', 'job_seeker') for i in range(12)]
+        cls.applications = []
+        for seeker in cls.seekers:
+            cls.applications.append(JobApplication.objects.create(job=cls.job, applicant=seeker, cover_note='Note'))
+        cls.foreign = JobApplication.objects.create(job=cls.other_job, applicant=cls.seekers[0], cover_note='Note')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.recruiter)
+
+    def post(self, payload):
+        return self.client.post(
+            reverse('job_postings.bulk_update_application_status'),
+            json.dumps(payload), content_type='application/json',
+        )
+
+    def test_updates_only_the_recruiters_own_applications(self):
+        mine = [application.id for application in self.applications[:3]]
+        self.applications[2].status = 'review'
+        self.applications[2].save()
+        response = self.post({'application_ids': mine + [self.foreign.id, 999999], 'status': 'review'})
+
+        self.assertEqual(response.json()['results'], {
+            str(mine[0]): 'updated', str(mine[1]): 'updated', str(mine[2]): 'unchanged',
+            str(self.foreign.id): 'not_found', '999999': 'not_found',
+        })
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.status, 'applied')
+        self.assertEqual(
+            JobApplication.objects.filter(job=self.job, status='review').count(), 3
+        )
+
+    def test_keeps_counters_in_step(self):
+        self.post({'application_ids': [application.id for application in self.applications[:4]], 'status': 'interview'})
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.applied_count, self.job.interview_count, self.job.application_count), (8, 4, 12))
+        self.assertEqual(counters.reconcile(dry_run=True), {})
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        ids = [application.id for application in self.applications]
+        self.post({'application_ids': ids[:1], 'status': 'review'})
+        with CaptureQueriesContext(connection) as one:
+            self.post({'application_ids': ids[1:2], 'status': 'review'})
+        expected = len(one)
+        with self.assertNumQueries(expected):
+            self.post({'application_ids': ids[2:], 'status': 'review'})
+
+    def test_rejects_ids_that_are_not_integers(self):
+        application_id = self.applications[0].id
+        for raw_ids in (str(application_id), True, [True], [str(application_id)], [1.9], {'id': application_id}, None):
+            with self.subTest(raw_ids=raw_ids):
+                response = self.post({'application_ids': raw_ids, 'status': 'review'})
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(JobApplication.objects.filter(status='review').exists())
+
+    def test_form_post(self):
+        response = self.client.post(reverse('job_postings.bulk_update_application_status'), {
+            'application_ids': [str(self.applications[0].id)], 'status': 'offer', 'job_id': str(self.job.id),
+        })
+        self.assertRedirects(response, reverse('job_postings.manage_applications', kwargs={'id': self.job.id}))
+        self.applications[0].refresh_from_db()
+        self.assertEqual(self.applications[0].status, 'offer')
+
+
+class ApplicationCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = make_user('recruiter', 'recruiter')
+        cls.seeker = make_user('seeker', 'job_seeker')
+        cls.job = make_jobs(cls.recruiter, 1)[0]
+
+    def setUp(self):
+        cache.clear()
+
+    def counts(self):
+        self.job.refresh_from_db()
+        return {field: getattr(self.job, field) for field in counters.COUNTER_FIELDS if getattr(self.job, field)}
+
+    def test_apply_status_change_and_delete(self):
+        self.client.force_login(self.seeker)
+        self.client.post(reverse('job_postings.apply', kwargs={'id': self.job.id}), {'cover_note': 'Hello'})
+        self.assertEqual(self.counts(), {'application_count': 1, 'applied_count': 1})
+
+        application = JobApplication.objects.get(job=self.job)
+        self.client.force_login(self.recruiter)
+        self.client.post(
+            reverse('job_postings.update_application_status', kwargs={'application_id': application.id}),
+            {'status': 'interview'},
+        )
+        self.assertEqual(self.counts(), {'application_count': 1, 'interview_count': 1})
+
+        application.refresh_from_db()
+        application.delete()
+        self.assertEqual(self.counts(), {})
+
+    def test_orm_creates_and_deletes_are_counted(self):
+        application = JobApplication.objects.create(job=self.job, applicant=self.seeker, cover_note='Note')
+        self.assertEqual(self.counts(), {'application_count': 1, 'applied_count': 1})
+        application.delete()
+        self.assertEqual(self.counts(), {})
+
+        JobApplication.objects.create(job=self.job, applicant=self.seeker, cover_note='Note')
+        User.objects.filter(pk=self.seeker.pk).delete()
+        self.assertEqual(self.counts(), {})
+
+    def test_deleting_uncounted_applications_stops_at_zero(self):
+        JobApplication.objects.bulk_create([JobApplication(job=self.job, applicant=self.seeker, cover_note='Note')])
+        JobApplication.objects.filter(job=self.job).delete()
+        self.assertEqual(self.counts(), {})
+
+        JobApplication.objects.bulk_create([JobApplication(job=self.job, applicant=self.recruiter, cover_note='Note')])
+        self.job.delete()
+        self.assertFalse(Job.objects.filter(pk=self.job.pk).exists())
+
+    def test_saving_a_stale_job_keeps_the_counters(self):
+        stale = Job.objects.get(pk=self.job.pk)
+        counters.record_application(self.job.id, 'applied')
+        stale.title = 'Renamed'
+        stale.save()
+        self.assertEqual(self.counts(), {'application_count': 1, 'applied_count': 1})
+        self.assertEqual(self.job.title, 'Renamed')
+
+        # Soft deletes save the job too
+        stale.is_active = False
+        stale.save()
+        self.assertEqual(self.counts(), {'application_count': 1, 'applied_count': 1})
+
+    def test_counters_are_saved_when_named(self):
+        self.job.application_count = 7
+        self.job.save(update_fields=['application_count'])
+        self.assertEqual(self.counts(), {'application_count': 7})
+
+
+class JobCardCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = make_user('recruiter', 'recruiter')
+        cls.seeker = make_user('seeker', 'job_seeker')
+        cls.skill = Skill.objects.create(name='Pyhton')
+        cls.job = make_jobs(cls.recruiter, 1, title='Alpha')[0]
+        cls.job.skills_required.set([cls.skill])
+
+    def setUp(self):
+        cache.clear()
+
+    def index(self):
+        return self.client.get(reverse('job_postings.index')).content.decode()
+
+    def test_cards_are_reused_until_the_job_is_saved(self):
+        self.assertIn('Alpha', self.index())
+        # Not a save: updated_at stays, so the cached card is still served
+        Job.objects.filter(pk=self.job.pk).update(title='Beta')
+        self.assertIn('Alpha', self.index())
+
+        self.client.force_login(self.recruiter)
+        self.client.post(reverse('job_postings.edit', kwargs={'id': self.job.id}), {
+            'title': 'Gamma', 'company': 'Company', 'location': 'Remote', 'job_type': 'full_time',
+            'experience_level': 'entry', 'work_location': 'remote', 'description': 'Description',
+            'requirements': 'Requirements', 'skills_required': [self.skill.id],
+        })
+        html = self.index()
+        self.assertIn('Gamma', html)
+        self.assertNotIn('Alpha', html)
+
+    def test_skill_renames_reach_cached_cards(self):
+        # Search results show the skill badges
+        search = lambda: self.client.get(reverse('job_postings.search'), {'location': 'remote'}).content.decode()
+        self.assertIn('Pyhton', search())
+        self.skill.name = 'Python'
+        self.skill.save()
+        self.assertIn('>Python<', search())
+
+    def test_per_user_parts_stay_out_of_the_cache(self):
+        edit_url = reverse('job_postings.edit', kwargs={'id': self.job.id})
+        self.client.force_login(self.recruiter)
+        self.assertIn(edit_url, self.index())
+        self.client.force_login(self.seeker)
+        html = self.index()
+        self.assertNotIn(edit_url, html)
+        self.assertIn('Apply', html)
+
+
+class SearchResultCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = make_user('recruiter', 'recruiter')
+        cls.skill = Skill.objects.create(name='Python')
+        cls.jobs = make_jobs(cls.recruiter, 3, job_type='contract')
+        cls.jobs[0].skills_required.set([cls.skill])
+
+    def setUp(self):
+        cache.clear()
+        skill_index.invalidate()
+        search_result_cache.clear()
+
+    def cleaned(self, params):
+        form = JobSearchForm(params)
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.cleaned_data
+
+    def search(self, params):
+        cleaned_data = self.cleaned(params)
+        return list(search_result_cache.get_or_compute(cleaned_data, lambda: _search_jobs(cleaned_data)))
+
+    def test_equivalent_searches_share_a_key(self):
+        other = Skill.objects.create(name='Rust')
+        self.assertEqual(
+            canonical_key(self.cleaned({'title': ' Python  Dev', 'skills': [self.skill.id, other.id]})),
+            canonical_key(self.cleaned({'title': 'python dev', 'skills': [other.id, self.skill.id], 'skill_min_matches': 3})),
+        )
+        self.assertNotEqual(
+            canonical_key(self.cleaned({'job_type': 'contract'})),
+            canonical_key(self.cleaned({'job_type': 'full_time'})),
+        )
+
+    def test_repeated_searches_are_served_from_the_cache(self):
+        ids = self.search({'job_type': 'contract'})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search({'job_type': 'contract'}), ids)
+
+    def test_job_edits_invalidate_results(self):
+        self.assertEqual(len(self.search({'job_type': 'contract'})), 3)
+        job = self.jobs[1]
+        job.job_type = 'full_time'
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        self.assertEqual(self.search({'job_type': 'contract'}), [self.jobs[2].id, self.jobs[0].id])
+
+    def test_results_go_when_the_skill_index_changes(self):
+        params = {'skills': [self.skill.id]}
+        self.assertEqual(self.search(params), [self.jobs[0].id])
+        # Another process's change reaches this one's index only when it
+        # is rebuilt, which must retire results computed before
+        Job.skills_required.through.objects.create(job=self.jobs[1], skill=self.skill)
+        self.assertEqual(self.search(params), [self.jobs[0].id])
+        skill_index.rebuild()
+        self.assertEqual(self.search(params), [self.jobs[1].id, self.jobs[0].id])
+
+    async def test_async_lookup_builds_the_index_off_the_event_loop(self):
+        cleaned_data = await sync_to_async(self.cleaned)({'skills': [self.skill.id]})
+        compute = sync_to_async(lambda: list(_search_jobs(cleaned_data)))
+        self.assertEqual(list(await search_result_cache.aget_or_compute(cleaned_data, compute)), [self.jobs[0].id])
+
+
+class ScaleDataTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def populate(self, **options):
+        call_command(
+            'populate_sample_data', scale=True, seed=1, recruiters=2, seekers=5, jobs=10,
+            applications=20, skills=5, stdout=io.StringIO(), **options,
+        )
+
+    def test_counters_and_search_index_are_consistent(self):
+        self.populate()
+        self.assertEqual(Job.objects.filter(posted_by__username__startswith='scale1_').count(), 10)
+        self.assertEqual(JobApplication.objects.count(), 20)
+        self.assertEqual(counters.reconcile(dry_run=True), {})
+        if connection.vendor == 'sqlite':
+            title = Job.objects.filter(is_active=True).values_list('title', flat=True).first()
+            self.assertTrue(_search_jobs({'title': title}))
+
+    def test_reuses_skills_that_differ_only_in_case(self):
+        existing = Skill.objects.create(name='python')
+        self.populate()
+        self.assertFalse(Skill.objects.filter(name='Python').exists())
+        self.assertTrue(Job.objects.filter(skills_required=existing).exists())
+
+
+class BenchmarkReportTests(unittest.TestCase):
+    def command(self):
+        return benchmark_views.Command(stdout=io.StringIO(), no_color=True)
+
+    def report(self, p95_ms, queries):
+        return {'results': {'1000': {'index': {'p95_ms': p95_ms, 'queries': queries}}}}
+
+    def test_summary_percentiles(self):
+        samples = [{'seconds': ms / 1000, 'queries': 3, 'sql_seconds': 0.001, 'bytes': 10} for ms in range(1, 101)]
+        summary = self.command().summarize('/jobs/', samples)
+        self.assertAlmostEqual(summary['p50_ms'], 50.5)
+        self.assertAlmostEqual(summary['p95_ms'], 95.05)
+        self.assertEqual(summary['queries'], 3)
+
+    def test_regressions_against_the_baseline(self):
+        baseline = self.report(10.0, 3)
+        compare = lambda report: self.command().compare(report, baseline, tolerance=0.25)
+        self.assertEqual(compare(self.report(12.4, 3)), [])
+        self.assertEqual(compare(self.report(13.0, 3)), [('1000', 'index', ['p95 10.00 -> 13.00 ms'])])
+        self.assertEqual(compare(self.report(9.0, 4)), [('1000', 'index', ['queries 3 -> 4'])])
+
+
+class JobFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = make_user('recruiter', 'recruiter')
+        cls.jobs = make_jobs(cls.recruiter, 7, location='Atlanta')
+        cls.inactive = make_jobs(cls.recruiter, 1, is_active=False)[0]
+        cls.python = Skill.objects.create(name='Python')
+        cls.jobs[0].skills_required.add(cls.python)
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, **params):
+        return self.client.get(reverse('job_postings.feed'), params)
+
+    def test_pages_cover_every_active_job_once(self):
+        seen = []
+        response = self.get(page_size=3, fields='title')
+        while True:
+            data = response.json()
+            seen.extend(data['results'])
+            if not data['next']:
+                break
+            response = self.client.get(data['next'])
+        expected = Job.objects.filter(is_active=True).order_by('updated_at', 'id').values_list('id', flat=True)
+        self.assertEqual([row['id'] for row in seen], list(expected))
+        self.assertEqual(set(seen[0]), {'id', 'updated_at', 'title'})
+
+    def test_ndjson_streams_one_skill_query_per_chunk(self):
+        with self.settings(JOB_FEED_CHUNK_SIZE=3):
+            with self.assertNumQueries(1 + 3):
+                response = self.get(format='ndjson', fields='skills')
+                lines = b''.join(response.streaming_content).decode().splitlines()
+        skills = {row['id']: row['skills'] for row in map(json.loads, lines)}
+        self.assertEqual(len(skills), 7)
+        self.assertEqual(skills[self.jobs[0].id], ['Python'])
+        self.assertEqual(skills[self.jobs[1].id], [])
+
+    def test_updated_since_includes_deactivated_jobs(self):
+        updated_since = self.inactive.updated_at.isoformat()
+        ids = [row['id'] for row in self.get(updated_since=updated_since, fields='is_active').json()['results']]
+        self.assertIn(self.inactive.id, ids)
+
+        # updated_at keeps its microseconds, so it can be passed back as is
+        row = next(row for row in self.get(updated_since=updated_since).json()['results'] if row['id'] == self.inactive.id)
+        self.assertEqual(self.get(updated_since=row['updated_at'], fields='id').json()['results'][0]['id'], self.inactive.id)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.get(fields='title,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors']['fields'], ['Unknown fields: password'])
+
+
+class ApplicationExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = make_user('recruiter', 'recruiter')
+        cls.other_recruiter = make_user('other', 'recruiter')
+        cls.job, cls.second_job = make_jobs(cls.recruiter, 2)
+        cls.other_job = make_jobs(cls.other_recruiter, 1)[0]
+        cls.python = Skill.objects.create(name='Python')
+        cls.seekers = [make_user(f'seeker{i}', 'job_seeker') for i in range(4)]
+        cls.seekers[0].jobseekerprofile.skills.add(cls.python, Skill.objects.create(name='Django'))
+        for seeker in cls.seekers:
+            JobApplication.objects.create(job=cls.job, applicant=seeker, cover_note='Hello')
+        JobApplication.objects.create(job=cls.second_job, applicant=cls.seekers[0], cover_note='=HYPERLINK("x")', status='review')
+        JobApplication.objects.create(job=cls.other_job, applicant=cls.seekers[0], cover_note='Other')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.recruiter)
+
+    def export_csv(self, url, **params):
+        response = self.client.get(url, params)
+        return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_csv_covers_only_the_recruiters_jobs(self):
+        rows = self.export_csv(reverse('job_postings.export_all_applications'))
+        self.assertEqual(tuple(rows[0]), exports.HEADER)
+        self.assertEqual(sorted(int(row[0]) for row in rows[1:]), [self.job.id] * 4 + [self.second_job.id])
+        first = next(row for row in rows[1:] if row[7] == 'seeker0' and row[0] == str(self.job.id))
+        self.assertEqual(first[12], 'Django, Python')
+
+    def test_csv_neutralizes_formulas_and_honours_status(self):
+        rows = self.export_csv(reverse('job_postings.export_all_applications'), status='review')
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][13], '\'=HYPERLINK("x")')
+
+    def test_other_recruiters_jobs_are_refused(self):
+        response = self.client.get(reverse('job_postings.export_applications', args=[self.other_job.id]))
+        self.assertRedirects(response, reverse('job_postings.show', args=[self.other_job.id]), fetch_redirect_response=False)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        url = reverse('job_postings.export_applications', args=[self.second_job.id])
+        with CaptureQueriesContext(connection) as one:
+            self.assertEqual(len(self.export_csv(url)), 2)
+        expected = len(one)
+        url = reverse('job_postings.export_applications', args=[self.job.id])
+        with self.assertNumQueries(expected):
+            self.assertEqual(len(self.export_csv(url)), 5)
+
+    def test_xlsx_is_a_valid_workbook(self):
+        response = self.client.get(reverse('job_postings.export_applications', args=[self.job.id]), {'format': 'xlsx'})
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="applications-job-{self.job.id}.xlsx"')
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as workbook:
+            self.assertIsNone(workbook.testzip())
+            sheet = workbook.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row '), 5)
+        self.assertIn('Django, Python', sheet)
+
+
+@override_settings(ROOT_URLCONF='jobSeeker.async_urls')
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = make_user('recruiter', 'recruiter')
+        cls.seeker = make_user('seeker', 'job_seeker')
+        cls.jobs = make_jobs(cls.recruiter, 3, location='Atlanta')
+
+    def setUp(self):
+        cache.clear()
+        search_result_cache.clear()
+        instrumentation.request_stats.reset()
+
+    async def test_pages_match_the_sync_views(self):
+        await self.async_client.aforce_login(self.seeker)
+        await sync_to_async(self.client.force_login)(self.seeker)
+        without_csrf = lambda response: re.sub(rb'name="csrfmiddlewaretoken" value="\w+"', b'', response.content)
+        for name, args, params in (
+            ('job_postings.index', [], {}),
+            ('job_postings.search', [], {'location': 'Atlanta'}),
+            ('job_postings.show', [self.jobs[0].id], {}),
+            ('user_profiles.profile', [], {}),
+        ):
+            with self.subTest(name=name):
+                url = reverse(name, args=args)
+                response = await self.async_client.get(url, params)
+                self.assertTrue(iscoroutinefunction(response.resolver_match.func))
+                with self.settings(ROOT_URLCONF='jobSeeker.urls'):
+                    expected = await sync_to_async(self.client.get)(url, params)
+                self.assertEqual(without_csrf(response), without_csrf(expected))
+
+    async def test_queries_run_through_sync_to_async_are_counted(self):
+        response = await self.async_client.get(reverse('job_postings.search'), {'location': 'Atlanta'})
+        self.assertContains(response, self.jobs[0].title)
+        queries = int(re.search(r'SQL \((\d+) queries\)', response['Server-Timing']).group(1))
+        self.assertGreater(queries, 0)
+        snapshot = instrumentation.request_stats.snapshot()['job_postings.search']
+        self.assertEqual(snapshot['queries']['max'], queries)
+
+
+class FacetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = make_user('recruiter', 'recruiter')
+        cls.python, cls.django, cls.sql = (Skill.objects.create(name=name) for name in ('Python', 'Django', 'SQL'))
+        job_types = ['full_time', 'contract', 'part_time']
+        levels = ['entry', 'mid', 'senior']
+        work_locations = ['remote', 'on_site', 'hybrid']
+        cls.jobs = Job.objects.bulk_create([
+            Job(
+                title=f'Job {i}', company='Company', location='Atlanta' if i % 2 else 'Remote',
+                description='Description', requirements='Requirements', posted_by=cls.recruiter,
+                job_type=job_types[i % 3], experience_level=levels[i % 4 % 3],
+                work_location=work_locations[i // 2 % 3], visa_sponsorship=i % 5 == 0, is_active=i != 7,
+            )
+            for i in range(24)
+        ])
+        through = Job.skills_required.through
+        through.objects.bulk_create(
+            [through(job=job, skill=cls.python) for job in cls.jobs[::2]]
+            + [through(job=job, skill=cls.django) for job in cls.jobs[::3]]
+            + [through(job=job, skill=cls.sql) for job in cls.jobs[1::4]]
+        )
+
+    def setUp(self):
+        cache.clear()
+        skill_index.invalidate()
+        search_result_cache.clear()
+
+    def cleaned(self, params):
+        form = JobSearchForm(params)
+        self.assertTrue(form.is_valid(), form.errors)
+        return form.cleaned_data
+
+    def counts(self, cleaned_data):
+        search_result_cache.get_or_compute(cleaned_data, lambda: _search_jobs(cleaned_data))
+        return search_result_cache.get_or_compute_facets(cleaned_data, lambda: facets.counts(cleaned_data, _filter_jobs))
+
+    def brute_force(self, cleaned_data):
+        active = Job.objects.filter(is_active=True)
+        result = {}
+        for name in facets.COLUMNS:
+            jobs, _ = _filter_jobs(active, facets._cleared(cleaned_data, [name]))
+            result[name] = {value: jobs.filter(**{name: value}).count() for value in jobs.values_list(name, flat=True)}
+        jobs, _ = _filter_jobs(active, facets._cleared(cleaned_data, ['skills']))
+        result['skills'] = {
+            skill.id: count for skill in (self.python, self.django, self.sql)
+            if (count := jobs.filter(skills_required=skill).count())
+        }
+        return result
+
+    def test_counts_match_brute_force(self):
+        for params in (
+            {'location': 'Atlanta'},
+            {'job_type': 'contract', 'visa_sponsorship': 'on'},
+            {'skills': [self.python.id]},
+            {'skills': [self.python.id, self.sql.id], 'skill_match': 'all', 'experience_level': 'mid'},
+            {'title': 'Job', 'work_location': 'remote'},
+        ):
+            with self.subTest(params=params):
+                cleaned_data = self.cleaned(params)
+                self.assertEqual(self.counts(cleaned_data), self.brute_force(cleaned_data))
+
+    def test_skill_counts_need_no_id_query(self):
+        skill_index.rebuild()
+        for params in ({'location': 'Atlanta'}, {'skills': [self.python.id]}):
+            with self.subTest(params=params):
+                cleaned_data = self.cleaned(params)
+                search_result_cache.get_or_compute(cleaned_data, lambda: _search_jobs(cleaned_data))
+                # Only the grouped query for the column facets
+                with self.assertNumQueries(1):
+                    facets.counts(cleaned_data, _filter_jobs)
+
+    def test_searches_with_skills_share_the_search_without_them(self):
+        skill_index.rebuild()
+        self.counts(self.cleaned({'location': 'Atlanta', 'skills': [self.python.id]}))
+        cleaned_data = self.cleaned({'location': 'Atlanta', 'skills': [self.django.id]})
+        search_result_cache.get_or_compute(cleaned_data, lambda: _search_jobs(cleaned_data))
+        with self.assertNumQueries(1):
+            facets.counts(cleaned_data, _filter_jobs)
+
+    def test_counts_follow_the_skill_index(self):
+        cleaned_data = self.cleaned({'location': 'Remote'})
+        before = self.counts(cleaned_data)['skills'].get(self.sql.id, 0)
+        # A change made in another process reaches this one when its index is rebuilt
+        Job.skills_required.through.objects.create(job=self.jobs[0], skill=self.sql)
+        skill_index.rebuild()
+        self.assertEqual(self.counts(cleaned_data)['skills'][self.sql.id], before + 1)
@@ -4,11 +4,17 @@ from . import views
 urlpatterns = [
     path('', views.index, name='job_postings.index'),
     path('search/', views.search, name='job_postings.search'),
+    path('search/cache-stats/', views.search_cache_stats, name='job_postings.search_cache_stats'),
+    path('feed/', views.job_feed, name='job_postings.feed'),
+    path('recommended/', views.recommendations, name='job_postings.recommendations'),
     path('<int:id>/', views.show, name='job_postings.show'),
     path('<int:id>/apply/', views.apply_to_job, name='job_postings.apply'),
     path('create/', views.create, name='job_postings.create'),
     path('<int:id>/edit/', views.edit, name='job_postings.edit'),
     path('<int:id>/delete/', views.delete, name='job_postings.delete'),
     path('<int:id>/manage-applications/', views.manage_applications, name='job_postings.manage_applications'),
+    path('<int:id>/applications/export/', views.export_applications, name='job_postings.export_applications'),
+    path('applications/export/', views.export_applications, name='job_postings.export_all_applications'),
     path('update-application-status/<int:application_id>/', views.update_application_status, name='job_postings.update_application_status'),
+    path('update-application-status/bulk/', views.bulk_update_application_status, name='job_postings.bulk_update_application_status'),
 ] 
\ No newline at end of file
@@ -0,0 +1,16 @@
+import json
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+
+def filter_by_ids(queryset, ids):
+    """
+    Restrict ``queryset`` to primary keys in ``ids``. On SQLite the ids are
+    sent as a single JSON parameter so long lists never hit the bound
+    variable limit.
+    """
+    ids = list(ids)
+    if connections[queryset.db].vendor == 'sqlite':
+        return queryset.filter(pk__in=RawSQL('SELECT value FROM json_each(%s)', [json.dumps(ids)]))
+    return queryset.filter(pk__in=ids)
@@ -1,105 +1,252 @@
+import json
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.http import Http404, JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.db.models import Q
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_POST
 from .models import Job, JobApplication
-from .forms import JobForm, JobSearchForm, JobApplicationForm
+from .forms import JobForm, JobSearchForm, JobApplicationForm, JobFeedForm
+from . import search as job_search
+from . import counters
+from . import exports
+from . import facets
+from . import feed
+from . import ranking
+from . import selectors
+from .pagination import KeysetPaginator, IdListPaginator, JOB_ORDERING, get_page_size
+from .skill_index import skill_index, MATCH_ANY
+from .matching import matching_engine
+from .result_cache import search_result_cache
+from .utils import filter_by_ids
+from user_accounts.roles import job_seeker_required, recruiter_required, user_role
+from user_profiles.snapshot import invalidate_snapshots
+
+
+def _pagination_query(request):
+    """The current query string minus the cursor, for building page links."""
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    return params.urlencode()
+
+def _job_page(request, id, **kwargs):
+    """Where role checks on a job's own pages send users away to."""
+    return reverse('job_postings.show', kwargs={'id': id})
+
+def _application_job_page(request, application_id):
+    job_id = JobApplication.objects.filter(id=application_id).values_list('job_id', flat=True).first()
+    if job_id is None:
+        return reverse('job_postings.index')
+    return reverse('job_postings.show', kwargs={'id': job_id})
 
 def index(request):
-    jobs = Job.objects.filter(is_active=True)
-    return render(request, 'job_postings/index.html', {'jobs': jobs})
+    jobs = selectors.job_cards(request.user)
+    page = KeysetPaginator(jobs, page_size=get_page_size(request)).page(request.GET.get('cursor'))
+    return render(request, 'job_postings/index.html', {
+        'jobs': page,
+        'page': page,
+        'pagination_query': _pagination_query(request),
+        **selectors.viewer_context(request.user),
+    })
 
 
-def search(request):
-    form = JobSearchForm(request.GET)
-    jobs = Job.objects.filter(is_active=True)
+def _search_jobs(cleaned_data):
+    """Ids of active jobs matching a validated JobSearchForm, in result order."""
+    jobs, ordering = _filter_jobs(Job.objects.filter(is_active=True), cleaned_data)
+    return jobs.order_by(*ordering).values_list('id', flat=True)
+
+
+def _filter_jobs(jobs, cleaned_data):
+    """Narrow ``jobs`` by a validated JobSearchForm; returns the queryset and its result ordering."""
+    ordering = JOB_ORDERING
     
-    if form.is_valid():
-        # Title search
-        title = form.cleaned_data.get('title')
-        if title:
-            jobs = jobs.filter(title__icontains=title)
-        
-        # Location search
-        location = form.cleaned_data.get('location')
-        if location:
-            jobs = jobs.filter(location__icontains=location)
-        
-        # Job type filter
-        job_type = form.cleaned_data.get('job_type')
-        if job_type:
-            jobs = jobs.filter(job_type=job_type)
-        
-        # Experience level filter
-        experience_level = form.cleaned_data.get('experience_level')
-        if experience_level:
-            jobs = jobs.filter(experience_level=experience_level)
-        
-        # Work location filter
-        work_location = form.cleaned_data.get('work_location')
-        if work_location:
-            jobs = jobs.filter(work_location=work_location)
-        
-        # Salary range filter
-        salary_min = form.cleaned_data.get('salary_min')
-        if salary_min:
-            jobs = jobs.filter(
-                Q(salary_max__gte=salary_min) | Q(salary_max__isnull=True)
-            )
-        
-        salary_max = form.cleaned_data.get('salary_max')
-        if salary_max:
-            jobs = jobs.filter(
-                Q(salary_min__lte=salary_max) | Q(salary_min__isnull=True)
-            )
-        
-        # Visa sponsorship filter
-        visa_sponsorship = form.cleaned_data.get('visa_sponsorship')
-        if visa_sponsorship:
-            jobs = jobs.filter(visa_sponsorship=True)
-        
-        # Skills filter
-        skills = form.cleaned_data.get('skills')
-        if skills:
-            jobs = jobs.filter(skills_required__in=skills).distinct()
+    # Keyword search over title, company, description and requirements
+    title = cleaned_data.get('title')
+    if title:
+        jobs, ordering = job_search.rank_by_relevance(job_search.filter_by_keywords(jobs, title))
+    
+    # Location search
+    location = cleaned_data.get('location')
+    if location:
+        jobs = jobs.filter(location__icontains=location)
+    
+    # Job type filter
+    job_type = cleaned_data.get('job_type')
+    if job_type:
+        jobs = jobs.filter(job_type=job_type)
+    
+    # Experience level filter
+    experience_level = cleaned_data.get('experience_level')
+    if experience_level:
+        jobs = jobs.filter(experience_level=experience_level)
+    
+    # Work location filter
+    work_location = cleaned_data.get('work_location')
+    if work_location:
+        jobs = jobs.filter(work_location=work_location)
+    
+    # Salary range filter
+    salary_min = cleaned_data.get('salary_min')
+    if salary_min:
+        jobs = jobs.filter(
+            Q(salary_max__gte=salary_min) | Q(salary_max__isnull=True)
+        )
+    
+    salary_max = cleaned_data.get('salary_max')
+    if salary_max:
+        jobs = jobs.filter(
+            Q(salary_min__lte=salary_max) | Q(salary_min__isnull=True)
+        )
     
+    # Visa sponsorship filter
+    visa_sponsorship = cleaned_data.get('visa_sponsorship')
+    if visa_sponsorship:
+        jobs = jobs.filter(visa_sponsorship=True)
+    
+    # Skills filter, answered from the in-memory skill index
+    skills = cleaned_data.get('skills')
+    if skills:
+        job_ids = skill_index.match(
+            [skill.pk for skill in skills],
+            mode=cleaned_data.get('skill_match') or MATCH_ANY,
+            min_matches=cleaned_data.get('skill_min_matches') or 1,
+        )
+        jobs = filter_by_ids(jobs, job_ids)
+    
+    return jobs, ordering
+
+
+def _facet_panel(request, cleaned_data):
+    """The search's facet counts, cached with its results, laid out for search.html."""
+    facet_counts = search_result_cache.get_or_compute_facets(
+        cleaned_data, lambda: facets.counts(cleaned_data, _filter_jobs)
+    )
+    return facets.panel(facet_counts, cleaned_data, request.GET)
+
+
+def search(request):
+    form = JobSearchForm(request.GET)
+    search_performed = form.is_valid() and form.has_filters()
+    page = None
+    facet_panel = None
+    if search_performed:
+        # Identical searches share one cached, ordered id list; only the
+        # jobs on the requested page are loaded
+        job_ids = search_result_cache.get_or_compute(
+            form.cleaned_data, lambda: _search_jobs(form.cleaned_data)
+        )
+        load = lambda page_ids: selectors.job_cards(
+            request.user, filter_by_ids(Job.objects.filter(is_active=True), page_ids)
+        )
+        page = IdListPaginator(job_ids, load, page_size=get_page_size(request)).page(request.GET.get('cursor'))
+        facet_panel = _facet_panel(request, form.cleaned_data)
+
     return render(request, 'job_postings/search.html', {
         'form': form,
-        'jobs': jobs,
-        'search_performed': any(form.cleaned_data.values()) if form.is_valid() else False
+        'jobs': page,
+        'page': page,
+        'facets': facet_panel,
+        'pagination_query': _pagination_query(request),
+        'search_performed': search_performed,
+        **selectors.viewer_context(request.user),
     })
 
+@staff_member_required
+def search_cache_stats(request):
+    return JsonResponse(search_result_cache.stats())
+
+def job_feed(request):
+    """
+    Read-only job feed for partner integrations, taking the search page's
+    filters. ``?format=ndjson`` streams every matching job; the default
+    paged JSON returns ``page_size`` jobs and the URL of the next page.
+    ``fields`` picks columns and ``updated_since`` limits the feed to jobs
+    changed since then, including deactivated ones so they can be dropped.
+    """
+    form = JobFeedForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    
+    updated_since = form.cleaned_data.get('updated_since')
+    if updated_since:
+        jobs = Job.objects.filter(updated_at__gte=updated_since)
+    else:
+        jobs = Job.objects.filter(is_active=True)
+    jobs, _ = _filter_jobs(jobs, form.cleaned_data)
+    fields = form.cleaned_data['fields']
+    
+    if form.cleaned_data['format'] == JobFeedForm.FORMAT_NDJSON:
+        return StreamingHttpResponse(feed.stream_ndjson(jobs, fields), content_type='application/x-ndjson')
+    
+    page_size = get_page_size(request, feed.DEFAULT_PAGE_SIZE, feed.MAX_PAGE_SIZE)
+    page = KeysetPaginator(feed.rows(jobs, fields), ordering=feed.FEED_ORDERING, page_size=page_size).page(
+        request.GET.get('cursor')
+    )
+    next_url = None
+    if page.has_next:
+        params = request.GET.copy()
+        params['cursor'] = page.next_cursor
+        next_url = request.build_absolute_uri(f'?{params.urlencode()}')
+    return JsonResponse(
+        {'results': feed.attach_skills(page.object_list, fields), 'next': next_url},
+        encoder=feed.FeedEncoder,
+    )
+
 def show(request, id):
-    job = get_object_or_404(Job, id=id, is_active=True)
-    user_has_applied = False
+    job = get_object_or_404(selectors.job_detail(request.user), id=id)
+    viewer = selectors.viewer_context(request.user)
+    user_application = None
     application_form = None
     
     if request.user.is_authenticated:
         # Check if user has already applied
-        user_has_applied = JobApplication.objects.filter(job=job, applicant=request.user).exists()
+        user_application = JobApplication.objects.filter(job=job, applicant=request.user).first()
         # Only show form if user hasn't applied and is a job seeker
-        if not user_has_applied and hasattr(request.user, 'userprofile') and request.user.userprofile.user_type == 'job_seeker':
+        if user_application is None and viewer['is_job_seeker']:
             application_form = JobApplicationForm()
     
     return render(request, 'job_postings/show.html', {
         'job': job,
-        'user_has_applied': user_has_applied,
-        'application_form': application_form
+        'user_has_applied': user_application is not None,
+        'user_application': user_application,
+        'application_form': application_form,
+        **viewer,
     })
 
-@login_required
+@job_seeker_required('Only job seekers can view job recommendations.')
+def recommendations(request):
+    """
+    Active jobs ranked by how well their required skills match the job
+    seeker's profile skills, excluding jobs they have already applied to.
+    """
+    skill_ids = set()
+    if hasattr(request.user, 'jobseekerprofile'):
+        skill_ids = set(request.user.jobseekerprofile.skills.values_list('id', flat=True))
+    applied_job_ids = JobApplication.objects.filter(applicant=request.user).values_list('job_id', flat=True)
+    
+    matches = matching_engine.recommend(skill_ids, exclude=applied_job_ids)
+    scores = dict(matches)
+    jobs = selectors.job_cards(request.user, filter_by_ids(Job.objects.filter(is_active=True), scores))
+    jobs = sorted(jobs, key=lambda job: (-scores[job.id], -job.id))
+    for job in jobs:
+        job.match_percent = round(scores[job.id] * 100)
+        job.matched_skills = [skill for skill in job.skills_required.all() if skill.id in skill_ids]
+    
+    return render(request, 'job_postings/recommendations.html', {
+        'jobs': jobs,
+        'has_skills': bool(skill_ids),
+        **selectors.viewer_context(request.user),
+    })
+
+@job_seeker_required('Only job seekers can apply to jobs.', redirect_to=_job_page)
 def apply_to_job(request, id):
     job = get_object_or_404(Job, id=id, is_active=True)
     
-    # Only job seekers can apply
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'job_seeker':
-        if request.headers.get('Content-Type') == 'application/json':
-            return JsonResponse({'success': False, 'error': 'Only job seekers can apply to jobs.'})
-        messages.error(request, 'Only job seekers can apply to jobs.')
-        return redirect('job_postings.show', id=id)
-    
     if request.method == 'POST':
         form = JobApplicationForm(request.POST)
         if form.is_valid():
@@ -107,7 +254,8 @@ def apply_to_job(request, id):
                 application = form.save(commit=False)
                 application.job = job
                 application.applicant = request.user
-                application.save()
+                with transaction.atomic():
+                    application.save()
                 
                 if request.headers.get('Content-Type') == 'application/json':
                     return JsonResponse({'success': True, 'message': 'Application submitted successfully!'})
@@ -128,13 +276,8 @@ def apply_to_job(request, id):
     
     return redirect('job_postings.show', id=id)
 
-@login_required
+@recruiter_required('Only recruiters can post jobs.')
 def create(request):
-    # Check if user is a recruiter
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'recruiter':
-        messages.error(request, 'Only recruiters can post jobs.')
-        return redirect('job_postings.index')
-    
     if request.method == 'POST':
         form = JobForm(request.POST)
         if form.is_valid():
@@ -148,19 +291,15 @@ def create(request):
     
     return render(request, 'job_postings/create.html', {'form': form})
 
-@login_required
+@recruiter_required('Only recruiters can edit jobs.', redirect_to=_job_page)
 def edit(request, id):
     job = get_object_or_404(Job, id=id)
     
-    # Check if user is the owner of the job and is a recruiter
-    if job.posted_by != request.user:
+    # Check if user is the owner of the job
+    if job.posted_by_id != request.user.id:
         messages.error(request, 'You can only edit your own job postings.')
         return redirect('job_postings.show', id=id)
     
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'recruiter':
-        messages.error(request, 'Only recruiters can edit jobs.')
-        return redirect('job_postings.show', id=id)
-    
     if request.method == 'POST':
         form = JobForm(request.POST, instance=job)
         if form.is_valid():
@@ -172,19 +311,15 @@ def edit(request, id):
     
     return render(request, 'job_postings/edit.html', {'form': form, 'job': job})
 
-@login_required
+@recruiter_required('Only recruiters can delete jobs.', redirect_to=_job_page)
 def delete(request, id):
     job = get_object_or_404(Job, id=id)
     
-    # Check if user is the owner of the job and is a recruiter
-    if job.posted_by != request.user:
+    # Check if user is the owner of the job
+    if job.posted_by_id != request.user.id:
         messages.error(request, 'You can only delete your own job postings.')
         return redirect('job_postings.show', id=id)
     
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'recruiter':
-        messages.error(request, 'Only recruiters can delete jobs.')
-        return redirect('job_postings.show', id=id)
-    
     if request.method == 'POST':
         job.is_active = False  # Soft delete
         job.save()
@@ -193,65 +328,107 @@ def delete(request, id):
     
     return render(request, 'job_postings/delete.html', {'job': job})
 
-@login_required
+@recruiter_required('Only recruiters can manage applications.', redirect_to=_job_page)
 def manage_applications(request, id):
     """
     View for recruiters to manage applications for their job postings.
     """
     job = get_object_or_404(Job, id=id)
     
-    # Check if user is the owner of the job and is a recruiter
-    if job.posted_by != request.user:
+    # Check if user is the owner of the job
+    if job.posted_by_id != request.user.id:
         messages.error(request, 'You can only manage applications for your own job postings.')
         return redirect('job_postings.show', id=id)
     
-    if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'recruiter':
-        messages.error(request, 'Only recruiters can manage applications.')
-        return redirect('job_postings.show', id=id)
-    
     # Get status filter from request
     status_filter = request.GET.get('status', '')
-    applications = job.applications.all()
+    applications = job.applications.select_related('applicant', 'applicant__jobseekerprofile')
     
     if status_filter:
         applications = applications.filter(status=status_filter)
     
-    applications = applications.order_by('-applied_at')
+    applications = ranking.score_applications(job, applications.order_by('-applied_at'))
+    
+    # Fit filtering and sorting run over the scored list in memory
+    try:
+        min_fit = max(0, min(int(request.GET.get('min_fit', 0)), 100))
+    except ValueError:
+        min_fit = 0
+    if min_fit:
+        applications = [application for application in applications if application.fit_score >= min_fit]
+    
+    sort = request.GET.get('sort', 'recent')
+    if sort == 'fit':
+        # Stable sort keeps the most recent first among equal scores
+        applications.sort(key=lambda application: application.fit_score, reverse=True)
     
     return render(request, 'job_postings/manage_applications.html', {
         'job': job,
         'applications': applications,
         'status_filter': status_filter,
         'status_choices': JobApplication.STATUS_CHOICES,
+        'sort': sort,
+        'min_fit': min_fit,
     })
 
-@login_required
+@recruiter_required('Only recruiters can export applications.')
+def export_applications(request, id=None):
+    """
+    Streams a recruiter's applications as CSV, or XLSX with ``?format=xlsx``:
+    those for one job posting, or for all of their postings when no job is
+    given. Honours the manage applications page's status filter.
+    """
+    applications = JobApplication.objects.filter(job__posted_by=request.user)
+    filename = 'applications'
+    if id is not None:
+        job = get_object_or_404(Job, id=id)
+        if job.posted_by_id != request.user.id:
+            messages.error(request, 'You can only export applications for your own job postings.')
+            return redirect('job_postings.show', id=id)
+        applications = applications.filter(job=job)
+        filename = f'applications-job-{job.id}'
+    
+    status_filter = request.GET.get('status', '')
+    if status_filter:
+        applications = applications.filter(status=status_filter)
+    chunks = exports.application_chunks(applications.order_by('job_id', '-applied_at', '-id'))
+    
+    if request.GET.get('format') == 'xlsx':
+        response = StreamingHttpResponse(
+            exports.stream_xlsx(chunks),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+        filename += '.xlsx'
+    else:
+        response = StreamingHttpResponse(exports.stream_csv(chunks), content_type='text/csv; charset=utf-8')
+        filename += '.csv'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@recruiter_required('Only recruiters can update application status.', redirect_to=_application_job_page)
 def update_application_status(request, application_id):
     """
     Updates the status of a job application.
     Only the recruiter who posted the job can update application status.
     """
     if request.method == 'POST':
-        application = get_object_or_404(JobApplication, id=application_id)
+        application = get_object_or_404(JobApplication.objects.select_related('job'), id=application_id)
         
         # Check if user is the recruiter who posted the job
-        if application.job.posted_by != request.user:
+        if application.job.posted_by_id != request.user.id:
             if request.headers.get('Content-Type') == 'application/json':
                 return JsonResponse({'success': False, 'error': 'You can only update applications for your own job postings.'})
             messages.error(request, 'You can only update applications for your own job postings.')
             return redirect('job_postings.show', id=application.job.id)
         
-        if not hasattr(request.user, 'userprofile') or request.user.userprofile.user_type != 'recruiter':
-            if request.headers.get('Content-Type') == 'application/json':
-                return JsonResponse({'success': False, 'error': 'Only recruiters can update application status.'})
-            messages.error(request, 'Only recruiters can update application status.')
-            return redirect('job_postings.show', id=application.job.id)
-        
         new_status = request.POST.get('status')
         
         if new_status in dict(JobApplication.STATUS_CHOICES):
+            old_status = application.status
             application.status = new_status
-            application.save()
+            with transaction.atomic():
+                application.save()
+                counters.record_status_change(application.job_id, old_status, new_status)
             
             if request.headers.get('Content-Type') == 'application/json':
                 return JsonResponse({
@@ -268,3 +445,107 @@ def update_application_status(request, application_id):
             messages.error(request, 'Invalid status')
     
     return redirect('job_postings.manage_applications', id=application.job.id)
+
+@login_required
+@require_POST
+def bulk_update_application_status(request):
+    """
+    Moves many applications to one status at once. Accepts either a JSON body
+    ``{"application_ids": [...], "status": "..."}`` or the multi-select form on
+    the manage applications page, and reports an outcome per id: ``updated``,
+    ``unchanged`` (already in that status) or ``not_found`` (missing, or on
+    someone else's job posting). A JSON body that is not an object with a
+    list of integer ids gets a 400.
+    """
+    is_json = request.headers.get('Content-Type') == 'application/json'
+    if is_json:
+        try:
+            payload = json.loads(request.body)
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            return JsonResponse({'success': False, 'error': 'Invalid JSON body.'}, status=400)
+        raw_ids = payload.get('application_ids')
+        # JSON ids must already be integers: no strings, floats or booleans
+        if not isinstance(raw_ids, list) or not all(
+            isinstance(application_id, int) and not isinstance(application_id, bool)
+            for application_id in raw_ids
+        ):
+            return JsonResponse({'success': False, 'error': 'application_ids must be a list of integers.'}, status=400)
+        new_status = payload.get('status')
+    else:
+        raw_ids = request.POST.getlist('application_ids')
+        new_status = request.POST.get('status')
+    
+    def fail(error):
+        if is_json:
+            return JsonResponse({'success': False, 'error': error})
+        messages.error(request, error)
+        return _redirect_to_manage_applications(request)
+    
+    if user_role(request.user) != 'recruiter':
+        return fail('Only recruiters can update application status.')
+    
+    if new_status not in dict(JobApplication.STATUS_CHOICES):
+        return fail('Invalid status')
+    
+    try:
+        application_ids = list(dict.fromkeys(int(application_id) for application_id in raw_ids or ()))
+    except (TypeError, ValueError):
+        return fail('Application ids must be integers.')
+    if not application_ids:
+        return fail('Select at least one application.')
+    
+    with transaction.atomic():
+        # One query to find which of the ids belong to this recruiter's jobs
+        rows = filter_by_ids(
+            JobApplication.objects.select_for_update().filter(job__posted_by=request.user),
+            application_ids,
+        ).values_list('id', 'job_id', 'status', 'applicant_id')
+        owned = {}
+        applicants = {}
+        for application_id, job_id, status, applicant_id in rows:
+            owned[application_id] = (job_id, status)
+            applicants[application_id] = applicant_id
+        changed = [
+            application_id for application_id, (_, status) in owned.items()
+            if status != new_status
+        ]
+        if changed:
+            filter_by_ids(JobApplication.objects.all(), changed).update(
+                status=new_status,
+                status_updated_at=timezone.now(),
+            )
+            counters.record_status_changes([owned[application_id] for application_id in changed], new_status)
+            # The UPDATE skips post_save, which normally refreshes applicants' profile pages
+            invalidate_snapshots(applicants[application_id] for application_id in changed)
+    
+    results = {}
+    for application_id in application_ids:
+        if application_id not in owned:
+            results[application_id] = 'not_found'
+        elif owned[application_id][1] == new_status:
+            results[application_id] = 'unchanged'
+        else:
+            results[application_id] = 'updated'
+    
+    status_display = dict(JobApplication.STATUS_CHOICES)[new_status]
+    if is_json:
+        return JsonResponse({
+            'success': True,
+            'new_status': new_status,
+            'status_display': status_display,
+            'updated': len(changed),
+            'results': results,
+        })
+    
+    messages.success(request, f'{len(changed)} application{"s" if len(changed) != 1 else ""} moved to {status_display}.')
+    if len(owned) < len(application_ids):
+        messages.warning(request, 'Some selected applications could not be found.')
+    return _redirect_to_manage_applications(request)
+
+def _redirect_to_manage_applications(request):
+    job_id = request.POST.get('job_id', '')
+    if job_id.isdigit():
+        return redirect('job_postings.manage_applications', id=int(job_id))
+    return redirect('job_postings.index')
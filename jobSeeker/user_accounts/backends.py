@@ -0,0 +1,27 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+
+
+class ProfileBackend(ModelBackend):
+    """
+    ``ModelBackend`` that loads the session's user with ``userprofile`` and
+    ``jobseekerprofile`` joined in, so role checks and profile views read
+    them without another query. A missing profile is cached as missing too.
+    """
+
+    def _users(self):
+        return User._default_manager.select_related('userprofile', 'jobseekerprofile')
+
+    def get_user(self, user_id):
+        try:
+            user = self._users().get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        try:
+            user = await self._users().aget(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
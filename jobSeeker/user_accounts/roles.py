@@ -0,0 +1,50 @@
+"""
+The viewer's role, and view decorators that require one.
+
+Users authenticated through ``ProfileBackend`` arrive with their
+``userprofile`` loaded, so reading the role here costs no query.
+"""
+from functools import wraps
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import redirect
+
+
+def user_role(user):
+    """The user's user_type, or None for anonymous users and users without a profile."""
+    if not user.is_authenticated or not hasattr(user, 'userprofile'):
+        return None
+    return user.userprofile.user_type
+
+
+def role_required(role, message, redirect_to='job_postings.index'):
+    """
+    Require a logged-in user with ``role``. Anyone else gets ``message``,
+    as JSON for JSON requests and otherwise flashed on a redirect to
+    ``redirect_to``: a URL or URL name, or a callable taking the view's
+    arguments and returning one.
+    """
+    def decorator(view):
+        @login_required
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if user_role(request.user) != role:
+                if request.headers.get('Content-Type') == 'application/json':
+                    return JsonResponse({'success': False, 'error': message})
+                messages.error(request, message)
+                if callable(redirect_to):
+                    return redirect(redirect_to(request, *args, **kwargs))
+                return redirect(redirect_to)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def recruiter_required(message='Only recruiters can do that.', redirect_to='job_postings.index'):
+    return role_required('recruiter', message, redirect_to)
+
+
+def job_seeker_required(message='Only job seekers can do that.', redirect_to='job_postings.index'):
+    return role_required('job_seeker', message, redirect_to)
@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+from django.utils import timezone
+
+# Replace django.contrib.auth's receiver, which saves the user on every login
+user_logged_in.disconnect(dispatch_uid='update_last_login')
+
+
+@receiver(user_logged_in, dispatch_uid='update_last_login')
+def update_last_login(sender, user, **kwargs):
+    """
+    Record ``last_login`` at most once per ``LAST_LOGIN_UPDATE_INTERVAL``
+    seconds, with a single UPDATE rather than ``user.save()`` and the
+    profile save it triggers. Password reset tokens hash ``last_login``, so
+    add reset views with a short interval or none.
+    """
+    now = timezone.now()
+    interval = timedelta(seconds=getattr(settings, 'LAST_LOGIN_UPDATE_INTERVAL', 60 * 60))
+    if user.last_login is None or now - user.last_login >= interval:
+        User.objects.filter(pk=user.pk).update(last_login=now)
+        user.last_login = now
@@ -1,3 +1,131 @@
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.cache import cache, caches
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from job_postings.models import Job, JobApplication
+from user_profiles.models import JobSeekerProfile
+from .backends import ProfileBackend
+from .models import UserProfile
+from .roles import user_role
+
+
+def make_user(username, user_type):
+    """A user with the given role, and a job seeker profile for job seekers."""
+    user = User.objects.create_user(username, password='password')
+    UserProfile.objects.filter(user=user).update(user_type=user_type)
+    if user_type == 'job_seeker':
+        JobSeekerProfile.objects.create(user=user)
+    return User.objects.get(pk=user.pk)
+
+
+class RoleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.recruiter = make_user('recruiter', 'recruiter')
+        cls.seeker = make_user('seeker', 'job_seeker')
+        cls.job = Job.objects.create(
+            title='Job', company='Company', location='Remote', description='Description',
+            requirements='Requirements', posted_by=cls.recruiter,
+        )
+        cls.application = JobApplication.objects.create(job=cls.job, applicant=cls.seeker, cover_note='Note')
+
+    def setUp(self):
+        cache.clear()
+
+    def last_message(self, response):
+        # Redirects are not followed, so earlier messages are still queued
+        return [str(message) for message in get_messages(response.wsgi_request)][-1]
+
+    def test_backend_joins_the_profiles(self):
+        user = ProfileBackend().get_user(self.recruiter.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(user_role(user), 'recruiter')
+            self.assertFalse(hasattr(user, 'jobseekerprofile'))
+        seeker = ProfileBackend().get_user(self.seeker.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(user_role(seeker), 'job_seeker')
+            self.assertEqual(seeker.jobseekerprofile.user_id, self.seeker.pk)
+
+    def test_anonymous_users_log_in_first(self):
+        response = self.client.get(reverse('job_postings.create'))
+        self.assertRedirects(
+            response, f"{reverse('user_accounts.login')}?next={reverse('job_postings.create')}",
+            fetch_redirect_response=False,
+        )
+
+    def test_wrong_role_is_redirected_with_the_views_message(self):
+        self.client.force_login(self.seeker)
+        response = self.client.get(reverse('job_postings.create'))
+        self.assertRedirects(response, reverse('job_postings.index'), fetch_redirect_response=False)
+        self.assertEqual(self.last_message(response), 'Only recruiters can post jobs.')
+
+        response = self.client.get(reverse('job_postings.edit', args=[self.job.id]))
+        self.assertRedirects(response, reverse('job_postings.show', args=[self.job.id]), fetch_redirect_response=False)
+        self.assertEqual(self.last_message(response), 'Only recruiters can edit jobs.')
+
+        self.client.force_login(self.recruiter)
+        response = self.client.get(reverse('job_postings.recommendations'))
+        self.assertEqual(self.last_message(response), 'Only job seekers can view job recommendations.')
+
+    def test_wrong_role_gets_json_for_json_requests(self):
+        self.client.force_login(self.seeker)
+        response = self.client.post(
+            reverse('job_postings.update_application_status', args=[self.application.id]),
+            '{"status": "review"}', content_type='application/json',
+        )
+        self.assertEqual(response.json(), {'success': False, 'error': 'Only recruiters can update application status.'})
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.status, 'applied')
+
+    def test_right_role_reaches_the_view(self):
+        self.client.force_login(self.recruiter)
+        self.assertEqual(self.client.get(reverse('job_postings.create')).status_code, 200)
+        self.client.force_login(self.seeker)
+        self.assertEqual(self.client.get(reverse('job_postings.recommendations')).status_code, 200)
+
+
+class LoginTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('seeker', 'job_seeker')
+
+    def test_last_login_is_written_at_most_once_per_interval(self):
+        profile_updated_at = self.user.userprofile.updated_at
+        self.assertTrue(self.client.login(username='seeker', password='password'))
+        self.user.refresh_from_db()
+        first = self.user.last_login
+        self.assertIsNotNone(first)
+        # One UPDATE of last_login, not a save of the user and its profile
+        self.assertEqual(UserProfile.objects.get(user=self.user).updated_at, profile_updated_at)
+
+        self.client.login(username='seeker', password='password')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, first)
+
+        later = first + timedelta(seconds=settings.LAST_LOGIN_UPDATE_INTERVAL)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.client.login(username='seeker', password='password')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, later)
+
+    def test_sessions_are_read_from_the_shared_cache(self):
+        self.client.login(username='seeker', password='password')
+        session = import_module(settings.SESSION_ENGINE).SessionStore(self.client.session.session_key)
+        self.assertIsNotNone(caches[settings.SESSION_CACHE_ALIAS].get(session.cache_key))
+
+        self.client.get(reverse('homepage.index'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('homepage.index'))
+        self.assertFalse([query for query in queries if 'django_session' in query['sql']])
 
-# Create your tests here.
+        self.client.post(reverse('user_accounts.logout'))
+        self.assertIsNone(caches[settings.SESSION_CACHE_ALIAS].get(session.cache_key))
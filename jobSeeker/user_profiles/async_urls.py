@@ -0,0 +1,6 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path('', async_views.profile, name='user_profiles.profile'),
+]
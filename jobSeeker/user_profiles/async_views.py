@@ -0,0 +1,15 @@
+"""
+Async version of the profile page, served by ``jobSeeker.async_urls`` when
+``ASYNC_VIEWS`` is on and the site runs under ASGI.
+"""
+from django.contrib.auth.decorators import login_required
+
+from job_postings import selectors
+from .snapshot import aload_profile_snapshot
+from .views import _render_profile
+
+
+@login_required
+async def profile(request):
+    user = await selectors.aviewer(request)
+    return _render_profile(request, await aload_profile_snapshot(user))
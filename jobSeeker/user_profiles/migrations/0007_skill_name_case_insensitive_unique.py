@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:35
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def merge_case_duplicates(apps, schema_editor):
+    """
+    Fold skills whose names differ only in case into the oldest one, moving
+    their profile and job links over, so the unique index can be created.
+    """
+    Skill = apps.get_model('user_profiles', 'Skill')
+    JobSeekerProfile = apps.get_model('user_profiles', 'JobSeekerProfile')
+    Job = apps.get_model('job_postings', 'Job')
+    db = schema_editor.connection.alias
+
+    keep = {}
+    duplicates = {}
+    for skill_id, lower_name in Skill.objects.using(db).annotate(lower_name=Lower('name')).order_by('id').values_list('id', 'lower_name'):
+        if lower_name in keep:
+            duplicates[skill_id] = keep[lower_name]
+        else:
+            keep[lower_name] = skill_id
+    if not duplicates:
+        return
+
+    for through, owner in (
+        (JobSeekerProfile.skills.through, 'jobseekerprofile_id'),
+        (Job.skills_required.through, 'job_id'),
+    ):
+        links = through.objects.using(db)
+        existing = set(links.values_list(owner, 'skill_id'))
+        moved = set()
+        for owner_id, skill_id in links.filter(skill_id__in=duplicates).values_list(owner, 'skill_id'):
+            target = (owner_id, duplicates[skill_id])
+            if target not in existing and target not in moved:
+                moved.add(target)
+        links.bulk_create([through(**{owner: owner_id, 'skill_id': skill_id}) for owner_id, skill_id in moved])
+        links.filter(skill_id__in=duplicates).delete()
+
+    Skill.objects.using(db).filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_profiles', '0006_jobseekerprofile_version'),
+        ('job_postings', '0006_job_application_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_case_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='skill',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='user_profiles_skill_name_ci_unique'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    """
+    Give every job seeker account a JobSeekerProfile, filled in from the user
+    the way signup does, so loading the profile page never has to create one.
+    """
+    UserProfile = apps.get_model('user_accounts', 'UserProfile')
+    JobSeekerProfile = apps.get_model('user_profiles', 'JobSeekerProfile')
+    db = schema_editor.connection.alias
+
+    accounts = (
+        UserProfile.objects.using(db)
+        .filter(user_type='job_seeker', user__jobseekerprofile__isnull=True)
+        .values_list('user_id', 'user__first_name', 'user__last_name', 'user__email')
+    )
+    JobSeekerProfile.objects.using(db).bulk_create([
+        JobSeekerProfile(user_id=user_id, first_name=first_name, last_name=last_name, email=email)
+        for user_id, first_name, last_name, email in accounts
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_accounts', '0001_initial'),
+        ('user_profiles', '0007_skill_name_case_insensitive_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,16 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 
 class Skill(models.Model):
     name = models.CharField(max_length=100, unique=True)
 
+    class Meta:
+        constraints = [
+            # "Python" and "python" are the same skill
+            models.UniqueConstraint(Lower('name'), name='user_profiles_skill_name_ci_unique'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -14,10 +21,29 @@ class JobSeekerProfile(models.Model):
     email = models.EmailField(max_length=254, blank=True, null=True)
     headline = models.CharField(max_length=255, blank=True, null=True)
     skills = models.ManyToManyField(Skill, blank=True)
+    # Bumped whenever the profile or anything hanging off it changes, so
+    # derived data (e.g. applicant fit scores) can be cached per version
+    version = models.PositiveIntegerField(default=0, editable=False)
     
     def __str__(self):
         return f"Job Seeker Profile for {self.user.username}"
 
+    def save(self, *args, **kwargs):
+        # version only changes through bump_version()'s UPDATE. Writing back
+        # the value loaded with this instance could move it backwards and
+        # reuse a number, so saving an existing profile leaves it out unless
+        # update_fields names it.
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'version'
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def bump_version(cls, profile_id):
+        cls.objects.filter(pk=profile_id).update(version=models.F('version') + 1)
+
 class Education(models.Model):
     profile = models.ForeignKey(JobSeekerProfile, on_delete=models.CASCADE, related_name='education')
     school = models.CharField(max_length=255)
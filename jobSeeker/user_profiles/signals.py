@@ -0,0 +1,84 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.db import models, transaction
+from django.dispatch import receiver
+
+from user_accounts.models import UserProfile
+from .models import JobSeekerProfile, Education, WorkExperience, Link, Skill
+from .skill_choices import bump_skills_version
+from .snapshot import invalidate_snapshots
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def bump_skills_version_on_change(sender, using, **kwargs):
+    transaction.on_commit(bump_skills_version, using=using)
+
+
+@receiver(post_save, sender=JobSeekerProfile)
+def bump_version_on_profile_save(sender, instance, created, **kwargs):
+    if not created:
+        JobSeekerProfile.bump_version(instance.pk)
+
+
+@receiver(post_save, sender=Education)
+@receiver(post_save, sender=WorkExperience)
+@receiver(post_save, sender=Link)
+@receiver(post_delete, sender=Education)
+@receiver(post_delete, sender=WorkExperience)
+@receiver(post_delete, sender=Link)
+def bump_version_on_entry_change(sender, instance, **kwargs):
+    JobSeekerProfile.bump_version(instance.profile_id)
+
+
+@receiver(m2m_changed, sender=JobSeekerProfile.skills.through)
+def bump_version_on_skills_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        JobSeekerProfile.bump_version(instance.pk)
+    elif pk_set:
+        JobSeekerProfile.objects.filter(pk__in=pk_set).update(version=models.F('version') + 1)
+
+
+# Profile page snapshots (see user_profiles.snapshot)
+
+def _profile_user_ids(profile_ids):
+    return JobSeekerProfile.objects.filter(pk__in=profile_ids).values_list('user_id', flat=True)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=JobSeekerProfile)
+@receiver(post_delete, sender=JobSeekerProfile)
+def invalidate_snapshot_on_profile_change(sender, instance, using, **kwargs):
+    invalidate_snapshots([instance.user_id], using=using)
+
+
+@receiver(post_save, sender=Education)
+@receiver(post_save, sender=WorkExperience)
+@receiver(post_save, sender=Link)
+@receiver(post_delete, sender=Education)
+@receiver(post_delete, sender=WorkExperience)
+@receiver(post_delete, sender=Link)
+def invalidate_snapshot_on_entry_change(sender, instance, using, **kwargs):
+    invalidate_snapshots(_profile_user_ids([instance.profile_id]), using=using)
+
+
+@receiver(m2m_changed, sender=JobSeekerProfile.skills.through)
+def invalidate_snapshot_on_skills_change(sender, instance, action, reverse, pk_set, using, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        invalidate_snapshots([instance.user_id], using=using)
+    elif pk_set:
+        invalidate_snapshots(_profile_user_ids(pk_set), using=using)
+
+
+@receiver(post_save, sender=Skill)
+def invalidate_snapshots_on_skill_rename(sender, instance, created, using, **kwargs):
+    if not created:
+        invalidate_snapshots(
+            JobSeekerProfile.objects.filter(skills=instance).values_list('user_id', flat=True),
+            using=using,
+        )
@@ -0,0 +1,182 @@
+"""
+Cached skill choices for forms.
+
+The ordered ``(id, name)`` list of all skills is cached per skill-table
+version: a token in the Django cache that ``user_profiles.signals`` bumps
+whenever a ``Skill`` is saved or deleted. ``SkillMultipleChoiceField`` reads
+its choices from that list instead of querying ``Skill`` on every form, and
+``SkillCheckboxSelectMultiple`` renders each option's HTML once per version.
+
+Above ``SKILL_PICKER_THRESHOLD`` skills the widget switches to a searchable
+picker that renders only the selected skills and loads the rest on demand
+from ``user_profiles.skill_search``.
+"""
+import threading
+import uuid
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.choices import BaseChoiceIterator
+from django.utils.safestring import mark_safe
+
+from jobSeeker.db_router import use_primary
+from .models import Skill
+
+VERSION_KEY = 'user_profiles:skills:version'
+CHOICES_TIMEOUT = 60 * 60 * 24
+
+
+def skills_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_skills_version():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+class _Memo:
+    """Last value computed for a version, kept in-process to skip unpickling."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.value = None
+
+
+_choices_memo = _Memo()
+
+
+def skill_choices():
+    """All skills as ``(id, name)`` pairs ordered by name."""
+    version = skills_version()
+    with _choices_memo.lock:
+        if _choices_memo.version == version:
+            return _choices_memo.value
+
+    def load():
+        with use_primary():
+            return list(Skill.objects.order_by('name').values_list('id', 'name'))
+
+    choices = cache.get_or_set(f'user_profiles:skills:choices:{version}', load, CHOICES_TIMEOUT)
+
+    with _choices_memo.lock:
+        _choices_memo.version, _choices_memo.value = version, choices
+    return choices
+
+
+def search_skill_choices(term, limit=20):
+    """Up to ``limit`` cached choices whose name contains ``term``, prefix matches first."""
+    term = term.strip().lower()
+    if not term:
+        return []
+    prefix, contains = [], []
+    for skill_id, name in skill_choices():
+        lowered = name.lower()
+        if lowered.startswith(term):
+            prefix.append((skill_id, name))
+        elif term in lowered:
+            contains.append((skill_id, name))
+    return (prefix + contains)[:limit]
+
+
+class SkillChoices(BaseChoiceIterator):
+    """Lazy iterable over the cached choices, read at render time rather than at form creation."""
+
+    def __init__(self, field=None):
+        self.field = field
+
+    def __iter__(self):
+        return iter(skill_choices())
+
+    def __len__(self):
+        return len(skill_choices())
+
+    def __bool__(self):
+        return bool(skill_choices())
+
+
+class SkillCheckboxSelectMultiple(forms.CheckboxSelectMultiple):
+    """
+    Checkbox grid whose per-option HTML (checked and unchecked) is rendered
+    once per skill-table version and then only joined, or a lazily loaded
+    search picker when there are more than ``SKILL_PICKER_THRESHOLD`` skills.
+    """
+    option_template_name = 'user_profiles/widgets/skill_checkbox_option.html'
+    picker_template_name = 'user_profiles/widgets/skill_picker.html'
+
+    _rendered = {}
+    _rendered_lock = threading.Lock()
+
+    def render(self, name, value, attrs=None, renderer=None):
+        choices = skill_choices() if isinstance(self.choices, SkillChoices) else list(self.choices)
+        selected = {str(v) for v in self.format_value(value)}
+        attrs = self.build_attrs(self.attrs, attrs)
+        threshold = getattr(settings, 'SKILL_PICKER_THRESHOLD', 200)
+
+        if len(choices) > threshold:
+            options = [
+                self._render_option(name, attrs, index, skill_id, label, True, renderer)
+                for index, (skill_id, label) in enumerate(choices)
+                if str(skill_id) in selected
+            ]
+            return self._render(self.picker_template_name, {
+                'name': name,
+                'id': attrs.get('id', name),
+                'search_url': reverse('user_profiles.skill_search'),
+                'selected_options': mark_safe(''.join(options)),
+                'input_class': attrs.get('class', ''),
+            }, renderer)
+
+        options = self._options(name, attrs, choices, renderer)
+        html = ''.join(
+            checked if str(skill_id) in selected else unchecked
+            for skill_id, unchecked, checked in options
+        )
+        return mark_safe(f'<div class="row">{html}</div>')
+
+    def _options(self, name, attrs, choices, renderer):
+        # skill_choices() returns the same list object until the version
+        # changes, so its identity tells whether the rendered HTML is current
+        key = (type(self).__name__, name, tuple(sorted(attrs.items())))
+        with self._rendered_lock:
+            cached = self._rendered.get(key)
+        if cached is not None and cached[0] is choices:
+            return cached[1]
+
+        options = [
+            (
+                skill_id,
+                self._render_option(name, attrs, index, skill_id, label, False, renderer),
+                self._render_option(name, attrs, index, skill_id, label, True, renderer),
+            )
+            for index, (skill_id, label) in enumerate(choices)
+        ]
+        with self._rendered_lock:
+            self._rendered[key] = (choices, options)
+        return options
+
+    def _render_option(self, name, attrs, index, skill_id, label, checked, renderer):
+        option = self.create_option(
+            name, skill_id, label, checked, index, attrs=attrs
+        )
+        return self._render(self.option_template_name, {'widget': option}, renderer)
+
+
+class SkillMultipleChoiceField(forms.ModelMultipleChoiceField):
+    """
+    ``ModelMultipleChoiceField`` over all skills whose choices come from the
+    cache. Submitted values are still validated against the database.
+    """
+    widget = SkillCheckboxSelectMultiple
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('queryset', Skill.objects.all())
+        super().__init__(**kwargs)
+
+    iterator = SkillChoices
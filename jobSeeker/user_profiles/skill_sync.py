@@ -0,0 +1,73 @@
+"""
+Set-based updates of a job seeker's skills from free-text names.
+
+Names are resolved to ``Skill`` rows with one case-insensitive lookup, missing
+skills are bulk-created (ignoring conflicts, so concurrent requests adding the
+same new skill both succeed), and only the through-table rows that actually
+changed are inserted or deleted. The whole sync runs in one transaction with a
+fixed number of queries however many skills are submitted.
+"""
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .models import JobSeekerProfile, Skill
+from .skill_choices import bump_skills_version
+from .snapshot import invalidate_snapshots
+
+
+def parse_skill_names(text):
+    """Comma-separated names, stripped, without case-insensitive repeats, in order."""
+    names = {}
+    for name in text.split(','):
+        name = name.strip()
+        if name:
+            names.setdefault(name.lower(), name)
+    return list(names.values())
+
+
+def _by_lower_name(lower_names):
+    return {
+        skill.lower_name: skill
+        for skill in Skill.objects.annotate(lower_name=Lower('name')).filter(lower_name__in=lower_names)
+    }
+
+
+def resolve_skills(names):
+    """Return ``Skill`` rows for ``names``, creating the missing ones."""
+    wanted = {name.lower(): name for name in names}
+    if not wanted:
+        return []
+
+    found = _by_lower_name(wanted)
+    missing = [name for lower_name, name in wanted.items() if lower_name not in found]
+    if missing:
+        # Another request may create the same skill (in any case) meanwhile;
+        # the case-insensitive unique index turns that into a skipped row
+        Skill.objects.bulk_create([Skill(name=name) for name in missing], ignore_conflicts=True)
+        found.update(_by_lower_name([name.lower() for name in missing]))
+        # bulk_create skips post_save, which normally bumps the version
+        transaction.on_commit(bump_skills_version)
+    return [found[lower_name] for lower_name in wanted if lower_name in found]
+
+
+def sync_profile_skills(profile, names):
+    """Make ``profile``'s skills exactly ``names``, touching only the rows that change."""
+    through = JobSeekerProfile.skills.through
+    with transaction.atomic():
+        desired = {skill.pk for skill in resolve_skills(names)}
+        current = set(through.objects.filter(jobseekerprofile=profile).values_list('skill_id', flat=True))
+
+        added = desired - current
+        removed = current - desired
+        if added:
+            through.objects.bulk_create(
+                [through(jobseekerprofile_id=profile.pk, skill_id=skill_id) for skill_id in added],
+                ignore_conflicts=True,
+            )
+        if removed:
+            through.objects.filter(jobseekerprofile=profile, skill_id__in=removed).delete()
+        if added or removed:
+            # Direct through-table writes skip m2m_changed
+            JobSeekerProfile.bump_version(profile.pk)
+            invalidate_snapshots([profile.user_id])
+    return added, removed
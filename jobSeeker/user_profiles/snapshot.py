@@ -0,0 +1,136 @@
+"""
+Cached, read-only snapshot of everything the profile page shows.
+
+``load_profile_snapshot`` fetches a user's account type, job seeker profile,
+experience, education, skills, links and applications (with their jobs) in a
+fixed number of queries, and caches the result per user. Writes to any of
+those rows call ``invalidate_snapshots`` for the affected users on commit
+(see ``user_profiles.signals`` and ``job_postings.signals``), so the next
+page view rebuilds it.
+"""
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+
+from user_accounts.models import UserProfile
+from job_postings.models import JobApplication
+from .models import JobSeekerProfile, Skill
+
+
+def _cache_key(user_id):
+    return f'user_profiles:snapshot:{user_id}'
+
+
+@dataclass(frozen=True)
+class ProfileSnapshot:
+    user_type: str
+    profile: JobSeekerProfile = None
+    experiences: tuple = ()
+    educations: tuple = ()
+    skills: tuple = ()
+    links: tuple = ()
+    applications: tuple = ()
+
+    def applications_with_status(self, status):
+        if not status:
+            return self.applications
+        return tuple(application for application in self.applications if application.status == status)
+
+
+def _account(user):
+    return (
+        UserProfile.objects
+        .filter(user=user)
+        .select_related('user__jobseekerprofile')
+        .prefetch_related(
+            'user__jobseekerprofile__experience',
+            'user__jobseekerprofile__education',
+            Prefetch('user__jobseekerprofile__skills', queryset=Skill.objects.order_by('name')),
+            'user__jobseekerprofile__links',
+        )
+    )
+
+
+def _applications(user):
+    return (
+        JobApplication.objects
+        .filter(applicant=user)
+        .select_related('job')
+        .only(
+            'id', 'status', 'applied_at', 'status_updated_at', 'cover_note', 'job_id',
+            'job__id', 'job__title', 'job__company', 'job__location',
+        )
+        .order_by('-applied_at')
+    )
+
+
+def _snapshot(account, profile, applications):
+    return ProfileSnapshot(
+        user_type=account.user_type,
+        profile=profile,
+        experiences=tuple(profile.experience.all()),
+        educations=tuple(profile.education.all()),
+        skills=tuple(profile.skills.all()),
+        links=tuple(profile.links.all()),
+        applications=tuple(applications),
+    )
+
+
+def _build(user):
+    account = _account(user).first()
+    if account is None:
+        return None
+    if account.user_type != 'job_seeker':
+        return ProfileSnapshot(user_type=account.user_type)
+
+    profile = getattr(account.user, 'jobseekerprofile', None)
+    if profile is None:
+        # Signup and migration 0008 create the profile; accounts made some
+        # other way (e.g. createsuperuser) show an empty one rather than
+        # having it created while the snapshot is cached
+        return ProfileSnapshot(user_type=account.user_type, applications=tuple(_applications(user)))
+    return _snapshot(account, profile, _applications(user))
+
+
+async def _abuild(user):
+    account = await _account(user).afirst()
+    if account is None:
+        return None
+    if account.user_type != 'job_seeker':
+        return ProfileSnapshot(user_type=account.user_type)
+
+    profile = getattr(account.user, 'jobseekerprofile', None)
+    applications = [application async for application in _applications(user).aiterator()]
+    if profile is None:
+        return ProfileSnapshot(user_type=account.user_type, applications=tuple(applications))
+    return _snapshot(account, profile, applications)
+
+
+def load_profile_snapshot(user):
+    """The user's snapshot from the cache, or freshly built. None if the user has no account profile."""
+    # Single-flight where the cache supports it, so concurrent first loads
+    # build once
+    return cache.get_or_set(
+        _cache_key(user.pk), lambda: _build(user), getattr(settings, 'PROFILE_SNAPSHOT_TIMEOUT', 60 * 60)
+    )
+
+
+async def aload_profile_snapshot(user):
+    """``load_profile_snapshot`` for async views."""
+    key = _cache_key(user.pk)
+    snapshot = await cache.aget(key)
+    if snapshot is None:
+        snapshot = await _abuild(user)
+        if snapshot is not None:
+            await cache.aset(key, snapshot, getattr(settings, 'PROFILE_SNAPSHOT_TIMEOUT', 60 * 60))
+    return snapshot
+
+
+def invalidate_snapshots(user_ids, using=None):
+    """Drop the cached snapshots of ``user_ids`` once the current transaction commits."""
+    keys = [_cache_key(user_id) for user_id in set(user_ids) if user_id is not None]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys), using=using)
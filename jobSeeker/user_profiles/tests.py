@@ -1,3 +1,208 @@
-from django.test import TestCase
+from importlib import import_module
 
-# Create your tests here.
+from django.apps import apps as global_apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .models import JobSeekerProfile, Link, Skill
+from .skill_choices import SkillCheckboxSelectMultiple, SkillChoices, skill_choices, skills_version
+from .skill_sync import parse_skill_names, sync_profile_skills
+from .snapshot import load_profile_snapshot
+from job_postings.forms import JobSearchForm
+from user_accounts.models import UserProfile
+
+
+def make_seeker(username='seeker'):
+    """A job seeker with a ``JobSeekerProfile``."""
+    user = User.objects.create_user(username, password='password')
+    UserProfile.objects.filter(user=user).update(user_type='job_seeker')
+    JobSeekerProfile.objects.create(user=user)
+    return User.objects.get(pk=user.pk)
+
+
+class SkillChoicesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.skills = Skill.objects.bulk_create(
+            Skill(name=name) for name in ['Python', 'Django', 'Jython', 'SQL']
+        )
+
+    def test_choices_are_cached(self):
+        with self.assertNumQueries(1):
+            choices = skill_choices()
+        self.assertEqual([name for _, name in choices], ['Django', 'Jython', 'Python', 'SQL'])
+        with self.assertNumQueries(0):
+            self.assertIs(skill_choices(), choices)
+
+    def test_skill_changes_bump_the_version(self):
+        skill_choices()
+        version = skills_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.create(name='Go')
+        self.assertNotEqual(skills_version(), version)
+        self.assertIn('Go', [name for _, name in skill_choices()])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.get(name='Go').delete()
+        self.assertNotIn('Go', [name for _, name in skill_choices()])
+
+    def test_widget_renders_from_cached_options(self):
+        python = Skill.objects.get(name='Python')
+        form = JobSearchForm(data={'skills': [python.id]})
+        self.assertTrue(form.is_valid())
+        str(form['skills'])
+
+        with self.assertNumQueries(0):
+            html = str(JobSearchForm(initial={'skills': [python.id]})['skills'])
+        self.assertEqual(html.count('type="checkbox"'), 4)
+        self.assertEqual(html.count('checked'), 1)
+        self.assertRegex(html, rf'value="{python.id}"[^>]*checked')
+
+    def test_submitted_ids_are_validated(self):
+        form = JobSearchForm(data={'skills': [max(s.id for s in self.skills) + 1]})
+        self.assertFalse(form.is_valid())
+        self.assertIn('skills', form.errors)
+
+    def test_empty_search_page_runs_no_queries(self):
+        self.client.get(reverse('job_postings.search'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('job_postings.search'))
+        self.assertContains(response, 'Jython')
+
+    @override_settings(SKILL_PICKER_THRESHOLD=2)
+    def test_picker_renders_only_selected_skills(self):
+        sql = Skill.objects.get(name='SQL')
+        widget = SkillCheckboxSelectMultiple()
+        widget.choices = SkillChoices()
+        html = widget.render('skills', [sql.id])
+        self.assertIn(reverse('user_profiles.skill_search'), html)
+        self.assertEqual(html.count('type="checkbox"'), 1)
+        self.assertIn('SQL', html)
+        self.assertNotIn('Django', html)
+
+    def test_skill_search_puts_prefix_matches_first(self):
+        response = self.client.get(reverse('user_profiles.skill_search'), {'q': 'YTH'})
+        self.assertEqual([r['name'] for r in response.json()['results']], ['Jython', 'Python'])
+        response = self.client.get(reverse('user_profiles.skill_search'), {'q': 'py'})
+        self.assertEqual([r['name'] for r in response.json()['results']], ['Python'])
+        response = self.client.get(reverse('user_profiles.skill_search'), {'q': ' '})
+        self.assertEqual(response.json()['results'], [])
+
+
+class SkillSyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_seeker()
+        self.profile = self.user.jobseekerprofile
+
+    def skill_names(self):
+        return sorted(self.profile.skills.values_list('name', flat=True))
+
+    def test_parse_skill_names(self):
+        self.assertEqual(parse_skill_names(' Python, django,,PYTHON , SQL,'), ['Python', 'django', 'SQL'])
+
+    def test_query_count_does_not_grow_with_skills(self):
+        Skill.objects.create(name='Python')
+        for count in (2, 20):
+            profile = make_seeker(f'seeker{count}').jobseekerprofile
+            names = ['python'] + [f'Skill {count}-{i}' for i in range(count)]
+            # resolve, insert missing, re-resolve, read links, insert links,
+            # bump version, inside one savepoint
+            with self.assertNumQueries(8):
+                added, removed = sync_profile_skills(profile, names)
+            self.assertEqual((len(added), removed), (count + 1, set()))
+
+    def test_only_changed_rows_are_written(self):
+        sync_profile_skills(self.profile, ['Python', 'Django'])
+        through = JobSeekerProfile.skills.through
+        kept = through.objects.get(skill__name='Python')
+
+        added, removed = sync_profile_skills(self.profile, ['python', 'SQL'])
+        self.assertEqual(added, {Skill.objects.get(name='SQL').pk})
+        self.assertEqual(removed, {Skill.objects.get(name='Django').pk})
+        self.assertEqual(through.objects.get(skill__name='Python').pk, kept.pk)
+        self.assertEqual(self.skill_names(), ['Python', 'SQL'])
+
+        with self.assertNumQueries(4):
+            self.assertEqual(sync_profile_skills(self.profile, ['SQL', 'Python']), (set(), set()))
+
+    def test_existing_skills_are_reused_case_insensitively(self):
+        Skill.objects.create(name='JavaScript')
+        sync_profile_skills(self.profile, ['javascript'])
+        self.assertEqual(Skill.objects.filter(name__iexact='javascript').count(), 1)
+        self.assertEqual(self.skill_names(), ['JavaScript'])
+
+    def test_changes_bump_versions(self):
+        version = skills_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            sync_profile_skills(self.profile, ['Rust'])
+        self.assertNotEqual(skills_version(), version)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.version, 1)
+
+    def test_saving_a_stale_profile_still_moves_the_version_forward(self):
+        stale = JobSeekerProfile.objects.get(pk=self.profile.pk)
+        sync_profile_skills(self.profile, ['Rust'])
+        sync_profile_skills(self.profile, ['Rust', 'Go'])
+        stale.headline = 'Backend developer'
+        stale.save()
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.version, self.profile.headline), (3, 'Backend developer'))
+
+    def test_manage_skills_view(self):
+        self.client.force_login(self.user)
+        url = reverse('user_profiles.manage_skills')
+        response = self.client.post(url, {'skills': 'Python, SQL'})
+        self.assertRedirects(response, reverse('user_profiles.profile'), fetch_redirect_response=False)
+        self.assertEqual(self.skill_names(), ['Python', 'SQL'])
+        self.assertContains(self.client.get(url), 'value="Python, SQL"')
+
+
+class ProfileSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_seeker()
+        self.client.force_login(self.user)
+
+    def test_snapshot_is_cached(self):
+        url = reverse('user_profiles.profile')
+        self.client.get(url)
+        # Only the user, with its account and profile joined in by the
+        # authentication backend; the session is cached
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertContains(response, 'No work experience has been added yet.')
+
+    def test_snapshot_is_dropped_on_change(self):
+        load_profile_snapshot(self.user)
+        profile = self.user.jobseekerprofile
+        profile.headline = 'Backend developer'
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.save()
+        self.assertEqual(load_profile_snapshot(self.user).profile.headline, 'Backend developer')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Link.objects.create(profile=profile, name='Blog', url='https://example.com')
+        self.assertEqual([link.name for link in load_profile_snapshot(self.user).links], ['Blog'])
+
+    def test_build_does_not_create_a_profile(self):
+        user = User.objects.create_user('admin', password='password')
+        with self.assertNumQueries(2):
+            snapshot = load_profile_snapshot(user)
+        self.assertEqual((snapshot.user_type, snapshot.profile), ('job_seeker', None))
+        self.assertFalse(JobSeekerProfile.objects.filter(user=user).exists())
+
+    def test_backfill_migration(self):
+        user = User.objects.create_user('legacy', 'legacy@example.com', 'password', first_name='Ada')
+        recruiter = User.objects.create_user('recruiter', password='password')
+        UserProfile.objects.filter(user=recruiter).update(user_type='recruiter')
+
+        backfill = import_module('user_profiles.migrations.0008_backfill_job_seeker_profiles')
+        backfill.create_missing_profiles(global_apps, connection.schema_editor())
+        profile = JobSeekerProfile.objects.get(user=user)
+        self.assertEqual((profile.first_name, profile.email), ('Ada', 'legacy@example.com'))
+        self.assertFalse(JobSeekerProfile.objects.filter(user=recruiter).exists())
+        self.assertEqual(JobSeekerProfile.objects.count(), 2)
@@ -1,11 +1,13 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
-from django.contrib import messages
-from django.http import JsonResponse
-from .models import JobSeekerProfile, WorkExperience, Education, Link, Skill
-from user_accounts.models import UserProfile
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from .models import JobSeekerProfile, WorkExperience, Education, Link
 from job_postings.models import JobApplication
 from .forms import HeadlineForm, WorkExperienceForm, EducationForm, SkillsForm, LinkForm
+from .skill_choices import search_skill_choices
+from .skill_sync import parse_skill_names, sync_profile_skills
+from .snapshot import load_profile_snapshot
 
 @login_required
 def profile(request):
@@ -14,46 +16,52 @@ def profile(request):
     - If the user is a 'job_seeker', it displays their detailed professional profile.
     - If the user is a 'recruiter', it shows a placeholder page.
     """
-    user_profile = get_object_or_404(UserProfile, user=request.user)
+    return _render_profile(request, load_profile_snapshot(request.user))
 
-    if user_profile.user_type == 'job_seeker':
-        job_seeker_profile, created = JobSeekerProfile.objects.get_or_create(user=request.user)
-        
-        work_experience = job_seeker_profile.experience.all()
-        education = job_seeker_profile.education.all()
-        skills = job_seeker_profile.skills.all()
-        links = job_seeker_profile.links.all()
+def _render_profile(request, snapshot):
+    if snapshot is None:
+        raise Http404
+
+    if snapshot.user_type == 'job_seeker':
         # Get status filter from request
         status_filter = request.GET.get('status', '')
-        applications = JobApplication.objects.filter(applicant=request.user)
-        
-        if status_filter:
-            applications = applications.filter(status=status_filter)
+        applications = snapshot.applications_with_status(status_filter)
         
-        applications = applications.order_by('-applied_at')
+        applications_total = len(applications)
+        show_all = request.GET.get('all') == '1'
+        if not show_all:
+            applications = applications[:getattr(settings, 'PROFILE_APPLICATIONS_LIMIT', 20)]
 
         template_data = {
-            'profile': job_seeker_profile,
-            'experiences': work_experience,
-            'educations': education,
-            'skills': skills,
-            'links': links,
+            'profile': snapshot.profile,
+            'experiences': snapshot.experiences,
+            'educations': snapshot.educations,
+            'skills': snapshot.skills,
+            'links': snapshot.links,
             'applications': applications,
+            'applications_total': applications_total,
             'status_filter': status_filter,
             'status_choices': JobApplication.STATUS_CHOICES,
         }
 
         return render(request, 'user_profiles/profile.html', {'template_data': template_data})
     
-    elif user_profile.user_type == 'recruiter':
+    elif snapshot.user_type == 'recruiter':
         return render(request, 'user_profiles/recruiter_placeholder.html')
 
+def _own_profile(request):
+    """The user's JobSeekerProfile, as joined in by ProfileBackend, or a 404."""
+    try:
+        return request.user.jobseekerprofile
+    except JobSeekerProfile.DoesNotExist:
+        raise Http404
+
 @login_required
 def edit_headline(request):
     """
     View to edit the user's headline.
     """
-    profile = get_object_or_404(JobSeekerProfile, user=request.user)
+    profile = _own_profile(request)
     if request.method == 'POST':
         form = HeadlineForm(request.POST, instance=profile)
         if form.is_valid():
@@ -68,7 +76,7 @@ def add_experience(request):
     """
     View to add a new work experience entry.
     """
-    profile = get_object_or_404(JobSeekerProfile, user=request.user)
+    profile = _own_profile(request)
     if request.method == 'POST':
         form = WorkExperienceForm(request.POST)
         if form.is_valid():
@@ -93,7 +101,7 @@ def add_education(request):
     """
     View to add a new education entry.
     """
-    profile = get_object_or_404(JobSeekerProfile, user=request.user)
+    profile = _own_profile(request)
     if request.method == 'POST':
         form = EducationForm(request.POST)
         if form.is_valid():
@@ -115,23 +123,16 @@ def delete_education(request, education_id):
 
 @login_required
 def manage_skills(request):
-    profile = get_object_or_404(JobSeekerProfile, user=request.user)
+    profile = _own_profile(request)
     if request.method == 'POST':
         form = SkillsForm(request.POST)
         if form.is_valid():
-            # Clear existing skills first to handle deletions
-            profile.skills.clear()
-            skill_names = [name.strip() for name in form.cleaned_data['skills'].split(',') if name.strip()]
-            
-            for skill_name in skill_names:
-                # Get or create the skill object, case-insensitive, to avoid duplicates
-                skill, created = Skill.objects.get_or_create(name__iexact=skill_name, defaults={'name': skill_name})
-                profile.skills.add(skill)
-    
+            # Only the skills that were added or removed are written
+            sync_profile_skills(profile, parse_skill_names(form.cleaned_data['skills']))
             return redirect('user_profiles.profile')
     else:
         # Pre-populate the form with the user's current skills joined into a string
-        current_skills = ", ".join([skill.name for skill in profile.skills.all()])
+        current_skills = ", ".join(profile.skills.values_list('name', flat=True))
         form = SkillsForm(initial={'skills': current_skills})
         
     return render(request, 'user_profiles/manage_skills.html', {'form': form})
@@ -141,7 +142,7 @@ def add_link(request):
     """
     View to add a new link.
     """
-    profile = get_object_or_404(JobSeekerProfile, user=request.user)
+    profile = _own_profile(request)
     if request.method == 'POST':
         form = LinkForm(request.POST)
         if form.is_valid():
@@ -163,3 +164,7 @@ def delete_link(request, link_id):
         link.delete()
     return redirect('user_profiles.profile')
 
+def skill_search(request):
+    """Skills matching ``?q=`` as JSON, for the lazily loaded skill picker."""
+    results = search_skill_choices(request.GET.get('q', ''))
+    return JsonResponse({'results': [{'id': skill_id, 'name': name} for skill_id, name in results]})